@@ -4,10 +4,14 @@ import re
 import pyttsx3
 from datetime import datetime
 from openai import OpenAI
-from skyfield.api import load, wgs84
 import threading
+from core.commands import locate_object, parse_command
+from core.log import get_logger
+from core.metrics import timed
 
 
+log = get_logger("ai")
+
 _engine = None
 _speech_lock = threading.Lock()
 
@@ -16,7 +20,7 @@ WAKE_WORD_REQUIRED = True
 
 CONTROL_KEYWORDS = {
     "moon", "sun", "mars", "jupiter", "saturn", "venus", "mercury", "uranus", "neptune",
-    "polaris", "north star", "zenith", "straight up",
+    "polaris", "north star", "zenith", "straight up", "asteroid", "comet", "minor planet", "satellite",
     "horizon north", "horizon east", "horizon south", "horizon west",
     "show point", "hide point", "show marker", "hide marker",
     "turn on point", "turn off point", "enable point", "disable point", "remove point",
@@ -78,12 +82,6 @@ def _looks_like_telescope_command(command: str) -> bool:
     return False
 
 
-try:
-    
-    SKYFIELD_AVAILABLE = True
-except ImportError:
-    SKYFIELD_AVAILABLE = False
-
 api_key = os.environ.get("OPENAI_API_KEY", "OPENAI_API_KEY")
 client = OpenAI(api_key=api_key) if api_key != "OPENAI_API_KEY" else None
 
@@ -93,9 +91,10 @@ else:
     print("OpenAI API key not found - AI agent disabled (using keyword matching only)")
 
 
+@timed("ask_ai")
 def ask_ai(question):
     if client is None:
-        print("AI agent not available (no API key)")
+        log.info("AI agent not available (no API key)")
         return None
     
     speech("Consulting AI assistant")
@@ -111,67 +110,28 @@ def ask_ai(question):
             temperature=0.3
         )
         result = response.choices[0].message.content.strip().lower()
-        print(f"AI agent identified: '{result}'")
+        log.info("AI agent identified: '%s'", result)
         return result
     except Exception as e:
         speech("AI assistant unavailable")
         return None
 
 
-def get_celestial_coordinates(object_name, latitude, longitude):
-    if not SKYFIELD_AVAILABLE:
-        return None
-    
-    try:
-        ts = load.timescale()
-        eph = load('de421.bsp') 
-        
-        t = ts.now()
-        
-        observer = wgs84.latlon(latitude, longitude)
-        
-        object_name = object_name.lower().strip()
-        
-        celestial_objects = {
-            'sun': eph['sun'],
-            'moon': eph['moon'],
-            'mercury': eph['mercury'],
-            'venus': eph['venus'],
-            'mars': eph['mars'],
-            'jupiter': eph['jupiter barycenter'],
-            'saturn': eph['saturn barycenter'],
-            'uranus': eph['uranus barycenter'],
-            'neptune': eph['neptune barycenter'],
-        }
-        
-        if object_name not in celestial_objects:
-            print(f"Object '{object_name}' not recognized")
-            return None
-        
-        earth = eph['earth']
-        target = celestial_objects[object_name]
-        
-        astrometric = (earth + observer).at(t).observe(target)
-        alt, az, distance = astrometric.apparent().altaz()
-        
-        azimuth = az.degrees
-        elevation = alt.degrees
-        
-        print(f"{object_name.title()}: Az={azimuth:.2f}°, El={elevation:.2f}°")
-        
-        if elevation < 0:
-            print(f"Warning: {object_name.title()} is below horizon")
-            print(f"Rotating telescope to position - will be visible when it rises")
-            speech(f"Tracking {object_name}. Warning: Currently below horizon at elevation {elevation:.1f} degrees")
-        else:
-            speech(f"Tracking {object_name}. Azimuth {azimuth:.1f} degrees, elevation {elevation:.1f} degrees")
-        
-        return (azimuth, elevation)
-        
-    except Exception as e:
-        print(f"Error calculating coordinates for {object_name}: {str(e)}")
+def get_celestial_coordinates(object_name, latitude, longitude, when=None):
+    coords = locate_object(object_name, latitude, longitude, when)
+    if coords is None:
         return None
 
+    azimuth, elevation = coords
+    object_name = object_name.lower().strip()
+    if elevation < 0:
+        log.info("Warning: %s is below horizon", object_name.title())
+        log.info("Rotating telescope to position - will be visible when it rises")
+        speech(f"Tracking {object_name}. Warning: Currently below horizon at elevation {elevation:.1f} degrees")
+    else:
+        speech(f"Tracking {object_name}. Azimuth {azimuth:.1f} degrees, elevation {elevation:.1f} degrees")
+    return coords
+
 
 def takeCommand():
     r = sr.Recognizer()
@@ -227,60 +187,16 @@ def takeCommand():
         return "None"
 
 
-def parse_telescope_command(command, latitude=0.0, longitude=0.0):
-    command = command.lower()
-    
-    if any(phrase in command for phrase in ["hide point", "hide marker", "turn off point", "disable point", "remove point"]):
-        return ("toggle_point", False, None, None)
-    if any(phrase in command for phrase in ["show point", "show marker", "turn on point", "enable point", "display point"]):
-        return ("toggle_point", True, None, None)
-    
-    # Preset commands
-    presets = {
-        "polaris": (0, 45),
-        "north star": (0, 45),
-        "zenith": (0, 90),
-        "straight up": (0, 90),
-        "horizon north": (0, 0),
-        "horizon east": (90, 0),
-        "horizon south": (180, 0),
-        "horizon west": (270, 0),
-    }
-    
-    for key, (az, el) in presets.items():
-        if key in command:
-            speech(f"Moving to {key}")
-            return ("preset", az, el, key)
+@timed("parse_telescope_command")
+def parse_telescope_command(command, latitude=0.0, longitude=0.0, when=None, resolver=None, use_ai=True):
+    """Interpret a text command as (type, az, el, object_name), with spoken feedback.
 
-    az_match = re.search(r'azimuth\s+(\d+)', command)
-    el_match = re.search(r'elevation\s+(\d+)', command)
-    
-    if az_match or el_match:
-        az = int(az_match.group(1)) if az_match else None
-        el = int(el_match.group(1)) if el_match else None
-        return ("manual", az, el, None)
-    
-    celestial_keywords = ['moon', 'sun', 'mars', 'jupiter', 'saturn', 'venus', 'mercury', 'uranus', 'neptune']
-    
-    for keyword in celestial_keywords:
-        if keyword in command:
-            print(f"Direct match found: {keyword}")
-            coords = get_celestial_coordinates(keyword, latitude, longitude)
-            if coords:
-                return ("celestial", coords[0], coords[1], keyword)
-            return (None, None, None, None)
-    
-    if client:
-        print("No direct match - using AI agent for interpretation...")
-        ai_object = ask_ai(command)
-        if ai_object and ai_object != 'unknown':
-            print(f"AI agent successfully interpreted command as: {ai_object}")
-            coords = get_celestial_coordinates(ai_object, latitude, longitude)
-            if coords:
-                return ("celestial", coords[0], coords[1], ai_object)
-        else:
-            print("AI agent could not interpret command")
-    else:
-        print("AI agent not available - command not recognized")
-    
-    return (None, None, None, None)
\ No newline at end of file
+    See core.commands.parse_command; object lookups default to
+    get_celestial_coordinates and unmatched commands go to the AI agent.
+    """
+    return parse_command(
+        command, latitude, longitude, when,
+        resolver=resolver or get_celestial_coordinates,
+        interpret=ask_ai if client and use_ai else None,
+        announce=speech,
+    )
@@ -0,0 +1,5 @@
+"""Telescope simulator core: state, motion, astronomy and device servers.
+
+Nothing in this package imports PyQt5 or OpenGL, so it runs as a headless
+service (``python -m core``) as well as behind the GUI in main.py.
+"""
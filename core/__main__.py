@@ -0,0 +1,99 @@
+import time
+_STARTED = time.perf_counter()
+
+import os
+import threading
+
+from .engine import TelescopeCore
+from .location import LocationProvider, MANUAL_LOCATION_PATH, default_sources
+from .log import logs, parse_levels
+from .satellites import TLE_PATH
+from .startup import StartupProfiler
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run the telescope simulator core without a window.")
+    parser.add_argument("--lat", type=float, help="site latitude (default: last known, then live sources)")
+    parser.add_argument("--lon", type=float, help="site longitude")
+    parser.add_argument("--location-file", default=MANUAL_LOCATION_PATH, help="text file holding 'lat lon'")
+    parser.add_argument("--nmea", help="GPS serial device, pty or FIFO speaking NMEA 0183")
+    parser.add_argument("--no-ip-location", action="store_true", help="skip the IP geolocation lookup")
+    parser.add_argument("--time", help="start the simulation clock at this ISO 8601 UTC time (default: now)")
+    parser.add_argument("--rate", type=float, default=1.0, help="simulated seconds per real second")
+    parser.add_argument("--bridge-port", type=int, default=10001)
+    parser.add_argument("--no-bridge", action="store_true", help="do not serve Stellarium/LX200 clients")
+    parser.add_argument("--no-telemetry", action="store_true", help="do not publish multicast telemetry")
+    parser.add_argument("--no-alpaca", action="store_true", help="do not serve the ASCOM Alpaca API")
+    parser.add_argument("--no-commands", action="store_true", help="do not open the local command channel")
+    parser.add_argument("--metrics", action="store_true", help="time hot paths and serve them for Prometheus")
+    parser.add_argument("--metrics-port", type=int, default=None, help="metrics endpoint port (default 9108)")
+    parser.add_argument("--tle", default=TLE_PATH, help="TLE file for satellite tracking")
+    parser.add_argument("--record", metavar="PATH", help="record the session to a binary log")
+    parser.add_argument("--replay", metavar="PATH", help="play a recorded session back through the core")
+    parser.add_argument("--replay-speed", type=float, default=1.0, help="replay speed (0 = as fast as possible)")
+    parser.add_argument("--log", type=parse_levels, metavar="SPEC",
+                        help="log levels, e.g. 'info,bridge=debug,console=warning' (console: what is printed)")
+    parser.add_argument("--profile-startup", action="store_true", help="print a per-phase startup time breakdown")
+    args = parser.parse_args()
+    profiler = StartupProfiler(enabled=args.profile_startup, origin=_STARTED)
+    profiler.mark("imports")
+    if args.log:
+        logs.configure(*args.log)
+
+    core = TelescopeCore(announce=print, bridge_port=args.bridge_port, metrics_port=args.metrics_port)
+    if args.time:
+        core.clock.seek(args.time)
+    core.clock.set_rate(args.rate)
+    location = None
+    if args.lat is not None and args.lon is not None:
+        core.set_location(args.lat, args.lon)
+    elif not args.replay:
+        # A replayed session brings its own site.
+        location = LocationProvider(
+            lambda lat, lon, source: core.dispatch(lambda: print_location(core, lat, lon, source)),
+            default_sources(args.location_file, args.nmea, use_ip=not args.no_ip_location),
+        )
+        cached = location.cached()
+        if cached is not None:
+            core.set_location(cached[0], cached[1])
+        location.start()
+    profiler.mark("create core")
+    if os.path.exists(args.tle):
+        threading.Thread(target=core.load_satellites, args=(args.tle,), daemon=True).start()
+    core.start_services(
+        bridge=not args.no_bridge,
+        telemetry=not args.no_telemetry,
+        alpaca=not args.no_alpaca,
+        commands=not args.no_commands,
+        metrics=args.metrics,
+    )
+    profiler.mark("start servers")
+    profiler.report()
+    print(f"Telescope core running at Lat {core.device_lat:.4f}°, Lon {core.device_lon:.4f}° (Ctrl+C to stop)")
+    if not core.clock.realtime:
+        print(f"Simulation clock: {core.clock.describe()}")
+    if args.record:
+        core.start_recording(args.record)
+    if args.replay:
+        core.replay(args.replay, speed=args.replay_speed)
+    try:
+        core.run()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if location is not None:
+            location.stop()
+        core.stop_replay()
+        core.stop_recording()
+        core.stop_services()
+
+
+def print_location(core, lat, lon, source):
+    core.set_location(lat, lon)
+    print(f"Location from {source}: Lat {lat:.6f}°, Lon {lon:.6f}°")
+
+
+if __name__ == "__main__":
+    main()
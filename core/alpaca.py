@@ -0,0 +1,480 @@
+import json
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+from .log import get_logger
+
+
+ALPACA_PORT = 11111
+DISCOVERY_PORT = 32227
+DEVICE_PATH = "/api/v1/telescope/0/"
+
+ERROR_NOT_IMPLEMENTED = 0x400
+ERROR_INVALID_VALUE = 0x401
+ERROR_VALUE_NOT_SET = 0x402
+ERROR_NOT_CONNECTED = 0x407
+ERROR_ACTION_NOT_IMPLEMENTED = 0x40C
+
+# ASCOM GuideDirections: North, South, East, West.
+GUIDE_DIRECTIONS = {0: "n", 1: "s", 2: "e", 3: "w"}
+DRIVE_SIDEREAL = 0
+SLEW_TIMEOUT_S = 60.0             # longest a synchronous slew call blocks
+SLEW_POLL_S = 0.05
+
+log = get_logger("alpaca")
+
+# Every ITelescopeV3 member. Those the device has no method for answer NotImplemented
+# (HTTP 200, ErrorNumber 0x400) as the Alpaca spec requires; other names get HTTP 400.
+TELESCOPE_MEMBERS = frozenset("""
+    action commandblind commandbool commandstring connected description driverinfo driverversion
+    interfaceversion name supportedactions
+    abortslew alignmentmode altitude aperturearea aperturediameter athome atpark axisrates azimuth
+    canfindhome canmoveaxis canpark canpulseguide cansetdeclinationrate cansetguiderates cansetpark
+    cansetpierside cansetrightascensionrate cansettracking canslew canslewaltaz canslewaltazasync
+    canslewasync cansync cansyncaltaz canunpark declination declinationrate destinationsideofpier
+    doesrefraction equatorialsystem findhome focallength guideratedeclination guideraterightascension
+    ispulseguiding moveaxis park pulseguide rightascension rightascensionrate setpark sideofpier
+    siderealtime siteelevation sitelatitude sitelongitude slewing slewsettletime slewtoaltaz
+    slewtoaltazasync slewtocoordinates slewtocoordinatesasync slewtotarget slewtotargetasync
+    synctoaltaz synctocoordinates synctotarget targetdeclination targetrightascension tracking
+    trackingrate trackingrates unpark utcdate
+""".split())
+
+
+class AlpacaError(Exception):
+    def __init__(self, number, message):
+        super().__init__(message)
+        self.number = number
+
+
+class AlpacaTelescope:
+    """ASCOM Alpaca Telescope device (interface version 3) over the simulator's mount.
+
+    Getters only read the mount snapshot and the bridge's shared PositionCache,
+    so clients polling hundreds of times a second cost no extra Skyfield work.
+    Members are ``get_<name>``/``put_<name>`` methods taking the request params.
+    """
+
+    def __init__(self, app_ref, positions, driver, goto, dispatch=None):
+        self.app_ref = app_ref
+        self.positions = positions
+        self.driver = driver
+        self.goto = goto
+        self.dispatch = dispatch or (lambda fn: fn())
+        self.connected = True
+        self.target_ra = None
+        self.target_dec = None
+
+    def _radec(self):
+        return self.positions.radec(self.app_ref.device_lat, self.app_ref.device_lon)
+
+    def _require_connected(self):
+        if not self.connected:
+            raise AlpacaError(ERROR_NOT_CONNECTED, "Telescope is not connected")
+
+    @staticmethod
+    def _number(params, name):
+        try:
+            return float(params[name.lower()])
+        except (KeyError, ValueError):
+            raise AlpacaError(ERROR_INVALID_VALUE, f"Missing or invalid {name}")
+
+    @staticmethod
+    def _check_ra(ra_hours):
+        if not 0.0 <= ra_hours < 24.0:
+            raise AlpacaError(ERROR_INVALID_VALUE, "Right ascension out of range")
+        return ra_hours
+
+    @staticmethod
+    def _check_dec(dec_degrees):
+        if not -90.0 <= dec_degrees <= 90.0:
+            raise AlpacaError(ERROR_INVALID_VALUE, "Declination out of range")
+        return dec_degrees
+
+    @staticmethod
+    def _flag(params, name):
+        value = params.get(name.lower(), "").strip().lower()
+        if value not in ("true", "false"):
+            raise AlpacaError(ERROR_INVALID_VALUE, f"Missing or invalid {name}")
+        return value == "true"
+
+    # Common device members
+
+    def get_connected(self, params):
+        return self.connected
+
+    def put_connected(self, params):
+        self.connected = self._flag(params, "Connected")
+
+    def get_name(self, params):
+        return "Newtonian Telescope Simulator"
+
+    def get_description(self, params):
+        return "Simulated alt-az Newtonian telescope"
+
+    def get_driverinfo(self, params):
+        return "Newtonian simulator Alpaca driver"
+
+    def get_driverversion(self, params):
+        return "1.0"
+
+    def get_interfaceversion(self, params):
+        return 3
+
+    def get_supportedactions(self, params):
+        return []
+
+    def put_action(self, params):
+        raise AlpacaError(ERROR_ACTION_NOT_IMPLEMENTED, f"Action {params.get('action', '')!r} is not implemented")
+
+    # Telescope capabilities
+
+    def get_alignmentmode(self, params):
+        return 0        # algAltAz
+
+    def get_equatorialsystem(self, params):
+        # PositionCache reports, and goto_radec takes, RA/Dec on ICRS (J2000) axes.
+        return 2        # equJ2000
+
+    def get_canslew(self, params):
+        return True
+
+    def get_canslewasync(self, params):
+        return True
+
+    def get_canpulseguide(self, params):
+        return True
+
+    def get_cansettracking(self, params):
+        return True
+
+    def get_cansync(self, params):
+        return False
+
+    def get_canpark(self, params):
+        return False
+
+    def get_atpark(self, params):
+        return False
+
+    def get_athome(self, params):
+        return False
+
+    def get_doesrefraction(self, params):
+        return False
+
+    def _incapable(self, params):
+        return False
+
+    # Capabilities the simulator does not have.
+    get_canfindhome = get_canmoveaxis = get_cansetdeclinationrate = get_cansetguiderates = _incapable
+    get_cansetpark = get_cansetpierside = get_cansetrightascensionrate = _incapable
+    get_canslewaltaz = get_canslewaltazasync = get_cansyncaltaz = get_canunpark = _incapable
+
+    # State
+
+    def get_rightascension(self, params):
+        self._require_connected()
+        return self._radec()[0]
+
+    def get_declination(self, params):
+        self._require_connected()
+        return self._radec()[1]
+
+    def get_altitude(self, params):
+        self._require_connected()
+        return self.app_ref.mount.elevation
+
+    def get_azimuth(self, params):
+        self._require_connected()
+        return self.app_ref.mount.azimuth % 360.0
+
+    def get_sitelatitude(self, params):
+        return self.app_ref.device_lat
+
+    def get_sitelongitude(self, params):
+        return self.app_ref.device_lon
+
+    def get_siteelevation(self, params):
+        return 0.0
+
+    def get_utcdate(self, params):
+        now = self.positions.clock.datetime()
+        return now.strftime("%Y-%m-%dT%H:%M:%S.") + f"{now.microsecond // 1000:03d}Z"
+
+    def get_siderealtime(self, params):
+        """Local apparent sidereal time in hours, at simulation clock time."""
+        t = self.positions.clock.time(self.positions.ts)
+        return (t.gast + self.app_ref.device_lon / 15.0) % 24.0
+
+    def get_slewing(self, params):
+        return bool(getattr(self.app_ref, "animating", False) or self.driver.moving)
+
+    def get_ispulseguiding(self, params):
+        return self.driver.is_pulse_guiding
+
+    def get_tracking(self, params):
+        return bool(getattr(self.app_ref, "sidereal_tracking", False))
+
+    def put_tracking(self, params):
+        self._require_connected()
+        enabled = self._flag(params, "Tracking")
+        if not hasattr(self.app_ref, "set_tracking"):
+            raise AlpacaError(ERROR_NOT_IMPLEMENTED, "Tracking is not available")
+        self.dispatch(lambda: self.app_ref.set_tracking(enabled))
+
+    def get_trackingrate(self, params):
+        return DRIVE_SIDEREAL
+
+    def put_trackingrate(self, params):
+        if int(self._number(params, "TrackingRate")) != DRIVE_SIDEREAL:
+            raise AlpacaError(ERROR_INVALID_VALUE, "Only sidereal tracking is supported")
+
+    def get_trackingrates(self, params):
+        return [DRIVE_SIDEREAL]
+
+    def get_rightascensionrate(self, params):
+        return 0.0
+
+    def get_declinationrate(self, params):
+        return 0.0
+
+    def get_slewsettletime(self, params):
+        return 0
+
+    # Motion
+
+    def get_targetrightascension(self, params):
+        if self.target_ra is None:
+            raise AlpacaError(ERROR_VALUE_NOT_SET, "Target right ascension has not been set")
+        return self.target_ra
+
+    def put_targetrightascension(self, params):
+        self.target_ra = self._check_ra(self._number(params, "TargetRightAscension"))
+
+    def get_targetdeclination(self, params):
+        if self.target_dec is None:
+            raise AlpacaError(ERROR_VALUE_NOT_SET, "Target declination has not been set")
+        return self.target_dec
+
+    def put_targetdeclination(self, params):
+        self.target_dec = self._check_dec(self._number(params, "TargetDeclination"))
+
+    def put_slewtocoordinatesasync(self, params):
+        self._require_connected()
+        self.target_ra = self._check_ra(self._number(params, "RightAscension"))
+        self.target_dec = self._check_dec(self._number(params, "Declination"))
+        self.goto(self.target_ra, self.target_dec)
+
+    def put_slewtocoordinates(self, params):
+        self.put_slewtocoordinatesasync(params)
+        self._wait_for_slew()
+
+    def put_slewtotargetasync(self, params):
+        self._require_connected()
+        ra_hours = self.get_targetrightascension(params)
+        dec_degrees = self.get_targetdeclination(params)
+        self.goto(ra_hours, dec_degrees)
+
+    def put_slewtotarget(self, params):
+        self.put_slewtotargetasync(params)
+        self._wait_for_slew()
+
+    def _wait_for_slew(self):
+        """Block until the dispatched goto has run and the mount has stopped slewing."""
+        started = threading.Event()
+        self.dispatch(started.set)      # dispatch is FIFO, so this runs after the goto's move
+        started.wait(SLEW_TIMEOUT_S)
+        deadline = time.monotonic() + SLEW_TIMEOUT_S
+        while self.get_slewing(None) and time.monotonic() < deadline:
+            time.sleep(SLEW_POLL_S)
+
+    def put_abortslew(self, params):
+        self.driver.stop()
+        if hasattr(self.app_ref, "abort_slew"):
+            self.dispatch(self.app_ref.abort_slew)
+
+    def put_pulseguide(self, params):
+        self._require_connected()
+        direction = GUIDE_DIRECTIONS.get(int(self._number(params, "Direction")))
+        duration = int(self._number(params, "Duration"))
+        if direction is None or duration < 0:
+            raise AlpacaError(ERROR_INVALID_VALUE, "Invalid guide direction or duration")
+        self.driver.pulse_guide(direction, duration)
+
+
+class _AlpacaHandler(BaseHTTPRequestHandler):
+    # HTTP/1.1 keeps connections open between requests, so polling clients skip the TCP handshake.
+    protocol_version = "HTTP/1.1"
+    server_version = "NewtonianAlpaca/1.0"
+    # Headers and body are written separately; without TCP_NODELAY each reply waits on delayed ACK.
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        self._dispatch("get")
+
+    def do_PUT(self):
+        self._dispatch("put")
+
+    def log_message(self, format, *args):
+        pass
+
+    def _params(self, url):
+        params = {key.lower(): value for key, value in parse_qsl(url.query)}
+        length = int(self.headers.get("Content-Length") or 0)
+        if length:
+            body = self.rfile.read(length).decode("utf-8", errors="ignore")
+            params.update({key.lower(): value for key, value in parse_qsl(body)})
+        return params
+
+    def _dispatch(self, verb):
+        url = urlsplit(self.path)
+        params = self._params(url)
+        path = url.path.lower()
+        alpaca = self.server.alpaca
+
+        if path.startswith("/management/"):
+            value = alpaca.management(path)
+            if value is None:
+                self._send_text(404, "Unknown management endpoint")
+            else:
+                self._send_json({"Value": value, "ClientTransactionID": 0, "ServerTransactionID": alpaca.next_transaction()})
+            return
+
+        if not path.startswith(DEVICE_PATH):
+            self._send_text(404, "Unknown device")
+            return
+        name = path[len(DEVICE_PATH):]
+        member = getattr(alpaca.device, f"{verb}_{name}", None)
+        if member is None and name not in TELESCOPE_MEMBERS:
+            self._send_text(400, f"Unknown {verb.upper()} member {name}")
+            return
+
+        try:
+            client_id = int(params.get("clienttransactionid", 0))
+        except ValueError:
+            client_id = 0
+        reply = {
+            "ClientTransactionID": client_id,
+            "ServerTransactionID": alpaca.next_transaction(),
+            "ErrorNumber": 0,
+            "ErrorMessage": "",
+        }
+        try:
+            if member is None:
+                raise AlpacaError(ERROR_NOT_IMPLEMENTED, f"{verb.upper()} {name} is not implemented")
+            value = member(params)
+            if verb == "get":
+                reply["Value"] = value
+        except AlpacaError as exc:
+            reply["ErrorNumber"] = exc.number
+            reply["ErrorMessage"] = str(exc)
+        except Exception as exc:
+            reply["ErrorNumber"] = 0x500
+            reply["ErrorMessage"] = str(exc)
+        self._send_json(reply)
+
+    def _send_json(self, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_text(self, status, text):
+        body = text.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "text/plain")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class AlpacaServer:
+    """Serve one AlpacaTelescope on localhost, with optional UDP discovery."""
+
+    def __init__(self, device, host="127.0.0.1", port=ALPACA_PORT, discovery=False):
+        self.device = device
+        self.host = host
+        self.port = port
+        self.discovery = discovery
+        self._httpd = None
+        self._discovery_sock = None
+        self._transaction = 0
+        self._transaction_lock = threading.Lock()
+
+    def next_transaction(self):
+        with self._transaction_lock:
+            self._transaction += 1
+            return self._transaction
+
+    def management(self, path):
+        if path == "/management/apiversions":
+            return [1]
+        if path == "/management/v1/description":
+            return {
+                "ServerName": "Newtonian Telescope Simulator",
+                "Manufacturer": "Newtonian",
+                "ManufacturerVersion": "1.0",
+                "Location": "localhost",
+            }
+        if path == "/management/v1/configureddevices":
+            return [{
+                "DeviceName": self.device.get_name({}),
+                "DeviceType": "Telescope",
+                "DeviceNumber": 0,
+                "UniqueID": "newtonian-simulator-telescope-0",
+            }]
+        return None
+
+    def start(self):
+        if self._httpd is not None:
+            return
+        try:
+            self._httpd = ThreadingHTTPServer((self.host, self.port), _AlpacaHandler)
+        except OSError as exc:
+            log.warning("Alpaca server disabled: %s", exc)
+            return
+        self._httpd.daemon_threads = True
+        self._httpd.alpaca = self
+        threading.Thread(target=self._httpd.serve_forever, daemon=True).start()
+        log.info("Alpaca telescope API on http://%s:%s%s", self.host, self.port, DEVICE_PATH)
+        if self.discovery:
+            self._start_discovery()
+
+    def stop(self):
+        if self._httpd is not None:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._httpd = None
+        if self._discovery_sock is not None:
+            self._discovery_sock.close()
+            self._discovery_sock = None
+
+    def _start_discovery(self):
+        try:
+            sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            sock.bind(("", DISCOVERY_PORT))
+        except OSError as exc:
+            log.warning("Alpaca discovery disabled: %s", exc)
+            return
+        self._discovery_sock = sock
+        threading.Thread(target=self._answer_discovery, args=(sock,), daemon=True).start()
+
+    def _answer_discovery(self, sock):
+        reply = json.dumps({"AlpacaPort": self.port}).encode("utf-8")
+        while True:
+            try:
+                data, addr = sock.recvfrom(1024)
+            except OSError:
+                return
+            if data.startswith(b"alpacadiscovery1"):
+                try:
+                    sock.sendto(reply, addr)
+                except OSError:
+                    pass
@@ -0,0 +1,43 @@
+import numpy as np
+
+
+def refraction_deg(true_alt_deg, temperature_c=10.0, pressure_hpa=1010.0):
+    """Refraction in degrees for true (airless) altitudes, Saemundsson's formula.
+
+    Works on scalars or arrays. Altitudes below -1 degree are clamped there: the
+    formula diverges further down and such objects stay below the horizon anyway.
+    """
+    h = np.maximum(np.asarray(true_alt_deg, dtype=np.float64), -1.0)
+    arcmin = 1.02 / np.tan(np.radians(h + 10.3 / (h + 5.11)))
+    scale = (pressure_hpa / 1010.0) * (283.0 / (273.0 + temperature_c))
+    return arcmin * scale / 60.0
+
+
+def airmass(apparent_alt_deg):
+    """Relative air mass (Kasten & Young 1989), capped at its horizon value of ~38."""
+    h = np.clip(np.asarray(apparent_alt_deg, dtype=np.float64), 0.0, 90.0)
+    return 1.0 / (np.sin(np.radians(h)) + 0.50572 * (h + 6.07995) ** -1.6364)
+
+
+class Atmosphere:
+    """Local observing conditions applied to whole altitude/magnitude arrays at once."""
+
+    def __init__(self, temperature_c=10.0, pressure_hpa=1010.0, extinction_k=0.2, limiting_mag=6.5):
+        self.temperature_c = temperature_c
+        self.pressure_hpa = pressure_hpa
+        self.extinction_k = extinction_k
+        self.limiting_mag = limiting_mag
+
+    def apparent_altitude(self, true_alt_deg):
+        true_alt_deg = np.asarray(true_alt_deg, dtype=np.float64)
+        return true_alt_deg + refraction_deg(true_alt_deg, self.temperature_c, self.pressure_hpa)
+
+    def extinguish(self, mag, apparent_alt_deg):
+        """Magnitudes as seen through ``extinction_k`` mag per air mass."""
+        return np.asarray(mag, dtype=np.float64) + self.extinction_k * airmass(apparent_alt_deg)
+
+    def apply(self, true_alt_deg, mag):
+        """Return (apparent_alt, observed_mag, visible_mask) for catalog arrays."""
+        alt = self.apparent_altitude(true_alt_deg)
+        observed = self.extinguish(mag, alt)
+        return alt, observed, (alt > 0.0) & (observed <= self.limiting_mag)
@@ -0,0 +1,329 @@
+import contextlib
+import csv
+import datetime
+import json
+import math
+import os
+import time
+
+import numpy as np
+from skyfield.api import load
+from skyfield.nutationlib import iau2000b_radians
+
+from .clock import default_clock, parse_time
+from .commands import PLANETS, parse_command
+from .location import LocationProvider, MANUAL_LOCATION_PATH, parse_coordinates
+from .log import logs
+from .minor_planets import LIGHT_AU_PER_DAY, MinorPlanetCatalog
+from .mount import MountSystem
+from .satellites import SatelliteCatalog
+from .site import ephemeris, site
+from .telemetry import angular_change
+
+
+GRID_MINUTES = 10.0
+
+RESULT_FIELDS = ["line", "id", "command", "time", "latitude", "longitude", "type", "object",
+                 "azimuth", "elevation", "slew_deg", "ok", "error"]
+
+
+class CachedResolver:
+    """Object lookup for ``parse_command`` that reuses earlier work.
+
+    Apparent topocentric directions (ICRS axes, light time and aberration
+    applied) are computed once per object and site on a ``grid_minutes`` time
+    grid and interpolated in between; only the cheap rotation into the horizon
+    frame is done per call. Over a 10 minute grid the error stays under an
+    arcsecond even for the Moon, so a target list that returns to the same
+    object all night pays for a handful of ephemeris evaluations.
+    """
+
+    def __init__(self, eph=None, ts=None, grid_minutes=GRID_MINUTES, minor_planets=None):
+        self.ts = ts or load.timescale()
+        self._eph = eph
+        self._minor_planets = minor_planets
+        self.step_days = grid_minutes / 1440.0
+        self.hits = 0
+        self.misses = 0
+        self._nodes = {}
+
+    @property
+    def eph(self):
+        if self._eph is None:
+            self._eph = ephemeris()[1]
+        return self._eph
+
+    @property
+    def minor_planets(self):
+        if self._minor_planets is None:
+            self._minor_planets = MinorPlanetCatalog(eph=self.eph)
+        return self._minor_planets
+
+    def __call__(self, name, latitude, longitude, when=None):
+        name = name.lower().strip()
+        t = default_clock.time(self.ts) if when is None else when
+        grid = t.tt / self.step_days
+        node = math.floor(grid)
+        fraction = grid - node
+
+        cached = (name, latitude, longitude, node) in self._nodes and (name, latitude, longitude, node + 1) in self._nodes
+        start = self._node(name, latitude, longitude, node)
+        end = self._node(name, latitude, longitude, node + 1)
+        if cached:
+            self.hits += 1
+        else:
+            self.misses += 1
+        if start is None or end is None:
+            return None
+
+        direction = start * (1.0 - fraction) + end * fraction
+        # A private Time so the caller's keeps full-precision nutation; IAU 2000B is ~1 mas here.
+        t = self.ts.tt_jd(t.whole, t.tt_fraction)
+        t._nutation_angles_radians = iau2000b_radians(t)
+        local = site(latitude, longitude, self.eph).topos.rotation_at(t) @ direction
+        elevation = math.degrees(math.atan2(local[2], math.hypot(local[0], local[1])))
+        azimuth = math.degrees(math.atan2(local[1], local[0])) % 360.0
+        return (azimuth, elevation)
+
+    def _node(self, name, latitude, longitude, node):
+        key = (name, latitude, longitude, node)
+        if key not in self._nodes:
+            # Unknown names are remembered too, so a typo in a long script is looked up once.
+            self._nodes[key] = self._direction(name, site(latitude, longitude, self.eph), self.ts.tt_jd(node * self.step_days))
+        return self._nodes[key]
+
+    def _direction(self, name, here, t):
+        observer = here.at(t)
+        if name in PLANETS:
+            vector = observer.observe(self.eph[PLANETS[name]]).apparent().position.au
+            return vector / np.linalg.norm(vector)
+
+        index = self.minor_planets.find(name)
+        if index is None:
+            return None
+        pos = self.minor_planets.positions(t, [index], observer)
+        direction = pos["vectors"][:, 0] / pos["delta_au"][0]
+        direction = direction + observer.velocity.au_per_d / LIGHT_AU_PER_DAY
+        return direction / np.linalg.norm(direction)
+
+
+def read_script(path):
+    """Yield (line number, entry dict) for each command in a script.
+
+    Lines starting with '{' are JSON objects with ``command`` and optional
+    ``time`` (ISO 8601 or unix seconds), ``latitude``, ``longitude`` and ``id``;
+    any other non-blank line not starting with '#' is a plain command.
+    """
+    with open(path, "r", encoding="utf-8") as handle:
+        for number, line in enumerate(handle, 1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            if line.startswith("{"):
+                try:
+                    entry = json.loads(line)
+                except ValueError as exc:
+                    entry = {"command": "", "error": f"invalid JSON: {exc}"}
+            else:
+                entry = {"command": line}
+            yield number, entry
+
+
+class BatchRunner:
+    """Run telescope commands without a window.
+
+    Commands go through ``parse_command`` exactly as typed ones do,
+    and the resulting pointing is applied to a ``MountSystem`` at once instead
+    of being animated, so a script runs as fast as positions can be resolved.
+    Commands without a time are spaced ``step_s`` apart from ``start``.
+    """
+
+    def __init__(self, latitude, longitude, start=None, step_s=0.0, resolver=None, interpret=None,
+                 satellite_path=None):
+        self.latitude = latitude
+        self.longitude = longitude
+        self.start = start or default_clock.datetime()
+        self.step_s = step_s
+        self.resolver = resolver or CachedResolver()
+        self.interpret = interpret
+        self.satellite_path = satellite_path
+        self.mount = MountSystem(azimuth=0.0, elevation=0.0)
+        self.show_point = True
+        self._satellites = None
+
+    @property
+    def satellites(self):
+        if self._satellites is None:
+            self._satellites = SatelliteCatalog(self.satellite_path) if self.satellite_path else SatelliteCatalog()
+        return self._satellites
+
+    def run(self, entries):
+        """Yield one result dict per (line number, entry) pair."""
+        for position, (number, entry) in enumerate(entries):
+            yield self.run_one(number, entry, self.start + datetime.timedelta(seconds=position * self.step_s))
+
+    def run_one(self, number, entry, default_time):
+        command = str(entry.get("command", "")).strip()
+        result = {
+            "line": number,
+            "id": entry.get("id"),
+            "command": command,
+            "time": None,
+            "latitude": float(entry.get("latitude", self.latitude)),
+            "longitude": float(entry.get("longitude", self.longitude)),
+            "type": None,
+            "object": None,
+            "azimuth": None,
+            "elevation": None,
+            "slew_deg": 0.0,
+            "ok": False,
+            "error": entry.get("error"),
+        }
+        try:
+            when = parse_time(entry["time"]) if "time" in entry else default_time
+        except (TypeError, ValueError, OverflowError) as exc:
+            result["error"] = f"invalid time: {exc}"
+            return result
+        result["time"] = when.isoformat().replace("+00:00", "Z")
+        if not command:
+            result["error"] = result["error"] or "empty command"
+            return result
+
+        lat, lon = result["latitude"], result["longitude"]
+        cmd_type, az, el, obj_name = parse_command(
+            command, lat, lon, when=self.resolver.ts.from_datetime(when), resolver=self.resolver, interpret=self.interpret,
+        )
+        result["type"] = cmd_type
+        result["object"] = obj_name
+
+        if cmd_type == "satellite":
+            index = self.satellites.find(obj_name) if self.satellites.ready else None
+            pointing = None if index is None else self.satellites.track_position(index, lat, lon, when.timestamp())
+            if pointing is None:
+                result["error"] = f"satellite '{obj_name}' not found or not propagatable"
+                return result
+            az, el = pointing
+        elif cmd_type == "toggle_point":
+            self.show_point = az
+            result["ok"] = True
+            return result
+        elif cmd_type == "clock":
+            result["error"] = "clock commands do not apply to scripts; use the time field or --start/--step"
+            return result
+        elif cmd_type == "manual":
+            az = self.mount.azimuth if az is None else float(az)
+            el = self.mount.elevation if el is None else float(el)
+        elif cmd_type not in ("preset", "celestial") or az is None or el is None:
+            result["error"] = "could not interpret command"
+            return result
+
+        result["slew_deg"] = angular_change(self.mount.azimuth, self.mount.elevation, az, el)
+        self.mount.set_position(az, el)
+        result["azimuth"] = az
+        result["elevation"] = el
+        result["ok"] = True
+        return result
+
+
+def write_results(results, path):
+    """Stream results to ``path`` as CSV (by extension) or JSON Lines; returns the count."""
+    count = 0
+    with open(path, "w", encoding="utf-8", newline="") as handle:
+        if path.lower().endswith(".csv"):
+            writer = csv.DictWriter(handle, fieldnames=RESULT_FIELDS)
+            writer.writeheader()
+            for result in results:
+                writer.writerow(result)
+                count += 1
+        else:
+            for result in results:
+                handle.write(json.dumps(result) + "\n")
+                count += 1
+    return count
+
+
+def default_site(location_file=MANUAL_LOCATION_PATH):
+    """(lat, lon, source) from the location file, else the last cached fix, else None."""
+    try:
+        with open(location_file, "r", encoding="utf-8") as handle:
+            fix = parse_coordinates(handle.read())
+        if fix is not None:
+            return fix[0], fix[1], location_file
+    except OSError:
+        pass
+    cached = LocationProvider(None, []).cached()
+    if cached is not None:
+        return cached[0], cached[1], f"last {cached[2]} fix"
+    return None
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run a telescope command script without the GUI.")
+    parser.add_argument("script", help="JSON Lines or plain text file, one command per line")
+    parser.add_argument("-o", "--output", help="results file (.csv or .jsonl; default: <script>.results.jsonl)")
+    parser.add_argument("--lat", type=float, help="site latitude (default: --location-file, then the last known fix)")
+    parser.add_argument("--lon", type=float, help="site longitude")
+    parser.add_argument("--location-file", default=MANUAL_LOCATION_PATH, help="text file holding 'lat lon'")
+    parser.add_argument("--start", help="ISO 8601 UTC time of the first command without its own (default: now)")
+    parser.add_argument("--step", type=float, default=0.0, help="seconds between commands without a time")
+    parser.add_argument("--grid", type=float, default=GRID_MINUTES, help="position cache grid in minutes")
+    parser.add_argument("--satellites", help="TLE file for 'satellite <name>' commands")
+    parser.add_argument("--ai", action="store_true", help="ask the AI agent about unrecognized commands")
+    parser.add_argument("--verbose", action="store_true", help="show the parser's own output")
+    args = parser.parse_args()
+
+    if (args.lat is None) != (args.lon is None):
+        parser.error("--lat and --lon go together")
+    if args.lat is None:
+        found = default_site(args.location_file)
+        if found is None:
+            parser.error(f"no site: pass --lat and --lon, or write 'lat lon' to {args.location_file}")
+        args.lat, args.lon, source = found
+    else:
+        source = "command line"
+    # Every az/el depends on the site, so say which one was used.
+    print(f"Site: Lat {args.lat:.4f}°, Lon {args.lon:.4f}° ({source})")
+
+    interpret = None
+    if args.ai:
+        from ai import ask_ai, client
+        interpret = ask_ai if client else None
+
+    output = args.output or os.path.splitext(args.script)[0] + ".results.jsonl"
+    runner = BatchRunner(
+        args.lat, args.lon,
+        start=parse_time(args.start) if args.start else None,
+        step_s=args.step,
+        resolver=CachedResolver(grid_minutes=args.grid),
+        interpret=interpret,
+        satellite_path=args.satellites,
+    )
+
+    summary = {"ok": 0, "failed": 0, "below": 0}
+
+    def counted(results):
+        for result in results:
+            summary["ok" if result["ok"] else "failed"] += 1
+            if result["elevation"] is not None and result["elevation"] < 0:
+                summary["below"] += 1
+            yield result
+
+    started = time.perf_counter()
+    with open(os.devnull, "w") as devnull, contextlib.ExitStack() as stack:
+        if not args.verbose:
+            stack.enter_context(contextlib.redirect_stdout(devnull))
+        count = write_results(counted(runner.run(read_script(args.script))), output)
+        # Log lines are printed by a background writer; let it finish while stdout is still redirected.
+        logs.flush()
+    elapsed = time.perf_counter() - started
+
+    resolver = runner.resolver
+    print(f"{count} commands in {elapsed:.2f}s ({count / max(elapsed, 1e-9):.0f}/s) -> {output}")
+    print(f"  {summary['ok']} resolved, {summary['failed']} failed, {summary['below']} below the horizon")
+    print(f"  Position cache: {resolver.hits} hits, {resolver.misses} misses, {len(resolver._nodes)} grid nodes")
+
+
+if __name__ == "__main__":
+    main()
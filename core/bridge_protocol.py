@@ -0,0 +1,157 @@
+import struct
+
+
+NATIVE_MIN_PACKET = 20
+NATIVE_MAX_PACKET = 256
+_LENGTH = struct.Struct("<h")
+
+
+class _FrameBuffer:
+    """Preallocated receive buffer read and written through memoryview slices.
+
+    Sockets fill ``writable()`` directly (``recv_into``/``sock_recv_into``) and
+    ``commit`` records how much arrived. Consumed bytes are skipped by moving an
+    index; the unread tail is moved to the front only when the free space runs low.
+    """
+
+    def __init__(self, capacity=4096, min_free=512):
+        self._buf = bytearray(capacity)
+        self._view = memoryview(self._buf)
+        self._start = 0
+        self._end = 0
+        self.min_free = min_free
+
+    def __len__(self):
+        return self._end - self._start
+
+    def writable(self):
+        if len(self._buf) - self._end < self.min_free:
+            self._compact()
+        return self._view[self._end:]
+
+    def commit(self, count):
+        self._end += count
+
+    def feed(self, data):
+        """Copy ``data`` in, parsing as it goes; returns everything the parser produced.
+
+        Frames are returned as independent copies, since later chunks of ``data``
+        may reuse the buffer space they were parsed from.
+        """
+        out = []
+        data = memoryview(data)
+        while data:
+            target = self.writable()
+            if not target:
+                # Buffer full of one unterminated frame; let the parser discard it.
+                self._overflow()
+                continue
+            count = min(len(target), len(data))
+            target[:count] = data[:count]
+            self.commit(count)
+            data = data[count:]
+            out.extend(bytes(frame) if isinstance(frame, memoryview) else frame for frame in self.parse())
+        return out
+
+    def _compact(self):
+        pending = self._end - self._start
+        if self._start:
+            self._buf[:pending] = self._view[self._start:self._end]
+        self._start = 0
+        self._end = pending
+
+    def _overflow(self):
+        self._start = self._end = 0
+
+    def parse(self):
+        raise NotImplementedError
+
+
+class NativeFrameParser(_FrameBuffer):
+    """Splits a Stellarium native stream into packets.
+
+    ``parse`` returns memoryviews of whole packets. They stay valid only until
+    the next ``writable``/``feed`` call, so decode them straight away. A length
+    field outside 20..256 resynchronizes byte by byte as before, but runs of bytes
+    that cannot start a header are skipped with one ``find`` and no copying.
+    """
+
+    def __init__(self, capacity=4096):
+        super().__init__(capacity, min_free=NATIVE_MAX_PACKET)
+        self.skipped = 0
+
+    def parse(self):
+        packets = []
+        view = self._view
+        start, end = self._start, self._end
+        while end - start >= 2:
+            packet_len = _LENGTH.unpack_from(view, start)[0]
+            if packet_len < NATIVE_MIN_PACKET or packet_len > NATIVE_MAX_PACKET:
+                resume = self._next_candidate(start + 1, end)
+                self.skipped += resume - start
+                start = resume
+                continue
+            if end - start < packet_len:
+                break
+            packets.append(view[start:start + packet_len])
+            start += packet_len
+        self._start = start
+        return packets
+
+    def _next_candidate(self, start, end):
+        """First offset >= ``start`` whose length field could be valid.
+
+        Lengths 20..256 have a high byte of 0 or 1, so only offsets followed by
+        one of those need checking. With none in range, keep the final byte: it
+        may be the low half of a header still arriving.
+        """
+        found = [i for i in (self._buf.find(b"\x00", start + 1, end), self._buf.find(b"\x01", start + 1, end)) if i >= 0]
+        if not found:
+            return max(start, end - 1)
+        return min(found) - 1
+
+
+class LX200FrameParser(_FrameBuffer):
+    """Splits an LX200 byte stream on '#' into command strings.
+
+    Leading ':' and surrounding whitespace are removed and empty commands
+    dropped. Anything longer than ``max_command`` bytes between two '#' is
+    discarded, however it was split across reads, so a client sending garbage
+    cannot grow the buffer.
+    """
+
+    def __init__(self, capacity=4096, max_command=128):
+        super().__init__(capacity, min_free=max_command)
+        self.max_command = max_command
+        self.discarded = 0
+        self._overlong = False
+
+    def parse(self):
+        commands = []
+        start, end = self._start, self._end
+        last = self._buf.rfind(b"#", start, end)
+        if last >= 0:
+            # One copy of the completed region, split in C, instead of a slice per command.
+            for raw in self._view[start:last].tobytes().split(b"#"):
+                if self._overlong or len(raw) > self.max_command:
+                    self._overlong = False
+                    self.discarded += len(raw)
+                    continue
+                cmd = raw.decode("ascii", "ignore").strip()
+                if cmd.startswith(":"):
+                    cmd = cmd[1:]
+                if cmd:
+                    commands.append(cmd)
+            start = last + 1
+        if end - start > self.max_command:
+            # Drop the head now and the rest of this command when its '#' arrives.
+            self.discarded += end - start
+            start = end
+            self._overlong = True
+        self._start = start
+        return commands
+
+    def _overflow(self):
+        self.discarded += len(self)
+        self._overlong = True
+        super()._overflow()
@@ -0,0 +1,232 @@
+import os
+import csv
+import gzip
+import urllib.request
+import urllib.error
+from collections import OrderedDict
+import numpy as np
+
+from .metrics import timed
+
+
+HYG_URL = "https://codeberg.org/astronexus/hyg/raw/branch/main/data/hyg/CURRENT/hyg_v42.csv.gz"
+HYG_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "hyg_v42.csv.gz")
+
+J2000_JD = 2451545.0                        # HYG positions are epoch and equinox J2000
+MAS_TO_RAD = np.radians(1.0 / 3.6e6)
+KM_S_TO_PC_PER_YEAR = 1.0227121650537077e-6
+UNKNOWN_DISTANCE_PC = 100000.0              # HYG's placeholder for "no parallax"
+
+
+def radec_to_unit(ra_hours, dec_degrees):
+    """ICRS unit vectors shaped (N, 3) for RA/Dec arrays."""
+    ra = np.radians(np.asarray(ra_hours, dtype=np.float64) * 15.0)
+    dec = np.radians(np.asarray(dec_degrees, dtype=np.float64))
+    cos_dec = np.cos(dec)
+    return np.stack([cos_dec * np.cos(ra), cos_dec * np.sin(ra), np.sin(dec)], axis=-1)
+
+
+def chord_length(angle_degrees):
+    """Straight-line distance between unit vectors separated by ``angle_degrees``."""
+    return 2.0 * np.sin(np.radians(angle_degrees) / 2.0)
+
+
+class SkyCatalog:
+    """Star catalog held as columnar numpy arrays sorted by magnitude.
+
+    Alongside ``ra_hours``/``dec_deg``/``mag`` the loader keeps the HYG proper
+    motion (mas/yr), radial velocity (km/s) and distance (pc) columns so
+    positions can be carried to the observation date with ``positions_at``.
+    """
+
+    def __init__(self, url, cache_path, max_stars=5000, allow_download=True, epoch_quantum_days=1.0):
+        self.url = url
+        self.cache_path = cache_path
+        self.max_stars = max_stars
+        self.allow_download = allow_download
+        self.epoch_quantum_days = epoch_quantum_days
+        self.ready = False
+        self._set_columns(*([np.empty(0)] * 7), [])
+        self.load()
+
+    @timed("catalog_load")
+    def load(self):
+        os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+        if not os.path.exists(self.cache_path):
+            if not self.allow_download:
+                return
+            try:
+                print(f"Downloading star catalog from {self.url}...")
+                urllib.request.urlretrieve(self.url, self.cache_path)
+                print("Star catalog downloaded successfully")
+            except (urllib.error.URLError, urllib.error.HTTPError) as exc:
+                print(f"Catalog download failed: {exc}")
+                print("Application will continue without star catalog")
+                return
+
+        try:
+            open_fn = gzip.open if self.cache_path.endswith(".gz") else open
+            with open_fn(self.cache_path, "rt", encoding="utf-8") as handle:
+                reader = csv.DictReader(handle)
+                columns = ([], [], [], [], [], [], [])
+                names = []
+                for row in reader:
+                    ra_raw = row.get("ra")
+                    dec_raw = row.get("dec")
+                    mag_raw = row.get("mag")
+                    if ra_raw is None or dec_raw is None or mag_raw is None:
+                        continue
+                    try:
+                        ra_val = float(ra_raw)
+                        dec_val = float(dec_raw)
+                        mag_val = float(mag_raw)
+                    except ValueError:
+                        continue
+
+                    # HYG lists the Sun as a star at RA 0, Dec 0.
+                    if row.get("proper") == "Sol":
+                        continue
+
+                    ra_hours = ra_val / 15.0 if ra_val > 24 else ra_val
+                    name = row.get("proper") or row.get("bayer") or row.get("gl") or ""
+                    values = (
+                        ra_hours,
+                        dec_val,
+                        mag_val,
+                        _optional_float(row.get("pmra")),
+                        _optional_float(row.get("pmdec")),
+                        _optional_float(row.get("rv")),
+                        _optional_float(row.get("dist"), UNKNOWN_DISTANCE_PC),
+                    )
+                    for column, value in zip(columns, values):
+                        column.append(value)
+                    names.append(name.strip())
+
+                arrays = [np.array(column, dtype=np.float64) for column in columns]
+                order = np.argsort(arrays[2], kind="stable")[: self.max_stars]
+                self._set_columns(*(array[order] for array in arrays), [names[i] for i in order])
+                self.ready = True
+        except OSError as exc:
+            print(f"Catalog load failed: {exc}")
+
+    def _set_columns(self, ra_hours, dec_deg, mag, pmra, pmdec, rv, dist, names):
+        self.ra_hours = ra_hours
+        self.dec_deg = dec_deg
+        self.mag = mag
+        self.pmra = pmra
+        self.pmdec = pmdec
+        self.rv = rv
+        self.dist = dist
+        self.names = names
+        self._stars = None
+        self._index = None
+        self._vectors = None
+        self._epoch_cache = OrderedDict()
+
+    def __len__(self):
+        return len(self.names)
+
+    @property
+    def stars(self):
+        """Row view as (ra_hours, dec_deg, mag, name) tuples, built on first use."""
+        if self._stars is None:
+            self._stars = list(zip(self.ra_hours.tolist(), self.dec_deg.tolist(), self.mag.tolist(), self.names))
+        return self._stars
+
+    def adopt(self, other):
+        """Take over the stars of another loaded catalog (e.g. one fetched in the background)."""
+        self._set_columns(
+            other.ra_hours, other.dec_deg, other.mag, other.pmra, other.pmdec, other.rv, other.dist, other.names,
+        )
+        self.ready = other.ready
+
+    def positions_at(self, t):
+        """Return (ra_hours, dec_deg) arrays propagated to ``t`` (skyfield Time or TT Julian date).
+
+        Results are cached per ``epoch_quantum_days`` bucket, so repeated refreshes
+        during a session reuse one propagation.
+        """
+        ra, dec, _ = self._propagated(t)
+        return ra, dec
+
+    def _propagated(self, t):
+        jd = getattr(t, "tt", t)
+        key = int(np.floor((jd - J2000_JD) / self.epoch_quantum_days))
+        cached = self._epoch_cache.get(key)
+        if cached is not None:
+            self._epoch_cache.move_to_end(key)
+            return cached
+
+        years = ((key + 0.5) * self.epoch_quantum_days) / 365.25
+        vectors = self._propagate_vectors(years)
+        ra = (np.degrees(np.arctan2(vectors[:, 1], vectors[:, 0])) / 15.0) % 24.0
+        dec = np.degrees(np.arcsin(np.clip(vectors[:, 2], -1.0, 1.0)))
+
+        cached = (ra, dec, vectors)
+        self._epoch_cache[key] = cached
+        while len(self._epoch_cache) > 4:
+            self._epoch_cache.popitem(last=False)
+        return cached
+
+    def _propagate_vectors(self, years):
+        """Linear space motion from J2000: tangential proper motion plus radial velocity.
+
+        Renormalizing the moved position vector gives perspective acceleration for
+        free, matching what skyfield's ``Star`` does one star at a time.
+        """
+        ra = np.radians(self.ra_hours * 15.0)
+        dec = np.radians(self.dec_deg)
+        sin_ra, cos_ra = np.sin(ra), np.cos(ra)
+        sin_dec, cos_dec = np.sin(dec), np.cos(dec)
+
+        unit = np.stack([cos_dec * cos_ra, cos_dec * sin_ra, sin_dec], axis=-1)
+        east = np.stack([-sin_ra, cos_ra, np.zeros_like(ra)], axis=-1)
+        north = np.stack([-sin_dec * cos_ra, -sin_dec * sin_ra, cos_dec], axis=-1)
+
+        pm_ra = np.nan_to_num(self.pmra) * MAS_TO_RAD
+        pm_dec = np.nan_to_num(self.pmdec) * MAS_TO_RAD
+        known = (self.dist > 0) & (self.dist < UNKNOWN_DISTANCE_PC)
+        radial = np.where(known, np.nan_to_num(self.rv) * KM_S_TO_PC_PER_YEAR / np.where(known, self.dist, 1.0), 0.0)
+
+        velocity = east * pm_ra[:, None] + north * pm_dec[:, None] + unit * radial[:, None]
+        moved = unit + velocity * years
+        return moved / np.linalg.norm(moved, axis=1, keepdims=True)
+
+    def unit_vectors(self, t=None):
+        """Unit vectors (N, 3) at the catalog epoch, or propagated to ``t`` when given."""
+        if t is not None:
+            return self._propagated(t)[2]
+        self._ensure_index()
+        return self._vectors
+
+    def spatial_index(self):
+        """KD-tree over catalog-epoch unit vectors, rebuilt whenever the columns change."""
+        self._ensure_index()
+        return self._index
+
+    def _ensure_index(self):
+        if self._index is not None:
+            return
+        from scipy.spatial import cKDTree
+
+        self._vectors = radec_to_unit(self.ra_hours, self.dec_deg).reshape(-1, 3)
+        self._index = cKDTree(self._vectors)
+
+    def query_radius(self, ra_hours, dec_degrees, radius_degrees):
+        """Indices of stars within ``radius_degrees`` of each centre.
+
+        Scalars return one index list; arrays return one list per centre.
+        """
+        centres = radec_to_unit(ra_hours, dec_degrees)
+        return self.query_vectors(centres, radius_degrees)
+
+    def query_vectors(self, unit_vectors, radius_degrees):
+        """Like ``query_radius`` but for centres already given as unit vectors."""
+        return self.spatial_index().query_ball_point(unit_vectors, chord_length(radius_degrees))
+
+
+def _optional_float(raw, default=np.nan):
+    try:
+        return float(raw) if raw not in (None, "") else default
+    except ValueError:
+        return default
@@ -0,0 +1,107 @@
+import datetime
+import threading
+import time
+
+
+def parse_time(value):
+    """Return a UTC datetime for an ISO 8601 string or unix seconds."""
+    if isinstance(value, (int, float)):
+        return datetime.datetime.fromtimestamp(value, datetime.timezone.utc)
+    parsed = datetime.datetime.fromisoformat(str(value).strip().replace("Z", "+00:00"))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=datetime.timezone.utc)
+    return parsed.astimezone(datetime.timezone.utc)
+
+
+class SimulationClock:
+    """The instant the simulator treats as "now", with pause, seek and time warp.
+
+    Simulated unix time runs at ``rate`` times wall-clock speed from the last
+    anchor; ``pause``, ``resume``, ``seek`` and ``set_rate`` move the anchor so
+    the reading never jumps except on an explicit seek. Readers call ``now()``
+    (unix seconds) or ``time()`` (skyfield Time) instead of ``time.time()`` or
+    ``ts.now()``, so everything keyed on time follows the simulated clock.
+    """
+
+    def __init__(self, start=None, rate=1.0):
+        self._lock = threading.Lock()
+        self._ts = None
+        self._anchor_wall = time.monotonic()
+        self._anchor_sim = time.time() if start is None else float(start)
+        self.rate = float(rate)
+        self.paused = False
+
+    def now(self):
+        """Simulated unix time in seconds."""
+        with self._lock:
+            if self.paused:
+                return self._anchor_sim
+            return self._anchor_sim + (time.monotonic() - self._anchor_wall) * self.rate
+
+    def time(self, ts=None):
+        """Simulated now as a skyfield Time (on ``ts`` if given)."""
+        if ts is None:
+            if self._ts is None:
+                from skyfield.api import load
+
+                self._ts = load.timescale()
+            ts = self._ts
+        return ts.from_datetime(self.datetime())
+
+    def datetime(self):
+        return datetime.datetime.fromtimestamp(self.now(), datetime.timezone.utc)
+
+    def _reanchor(self, sim):
+        self._anchor_wall = time.monotonic()
+        self._anchor_sim = sim
+
+    def pause(self):
+        sim = self.now()
+        with self._lock:
+            self._reanchor(sim)
+            self.paused = True
+
+    def resume(self):
+        with self._lock:
+            self._anchor_wall = time.monotonic()
+            self.paused = False
+
+    def set_rate(self, rate):
+        """Run ``rate`` simulated seconds per wall-clock second (negative runs backwards)."""
+        sim = self.now()
+        with self._lock:
+            self._reanchor(sim)
+            self.rate = float(rate)
+
+    def seek(self, when):
+        """Jump to ``when``: unix seconds, an ISO 8601 string or a datetime."""
+        if isinstance(when, datetime.datetime):
+            sim = (when if when.tzinfo else when.replace(tzinfo=datetime.timezone.utc)).timestamp()
+        else:
+            sim = parse_time(when).timestamp()
+        with self._lock:
+            self._reanchor(sim)
+
+    def reset(self):
+        """Back to wall-clock time, running at normal speed."""
+        with self._lock:
+            self._reanchor(time.time())
+            self.rate = 1.0
+            self.paused = False
+
+    @property
+    def realtime(self):
+        return not self.paused and self.rate == 1.0 and abs(self.now() - time.time()) < 1.0
+
+    def describe(self):
+        """Short status such as "2026-10-18 21:30:00 UTC x60" for labels and logs."""
+        text = self.datetime().strftime("%Y-%m-%d %H:%M:%S UTC")
+        if self.paused:
+            return text + " (paused)"
+        if self.rate != 1.0:
+            return text + f" x{self.rate:g}"
+        return text
+
+
+# Shared by every subsystem that is not handed its own clock.
+default_clock = SimulationClock()
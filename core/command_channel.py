@@ -0,0 +1,173 @@
+import asyncio
+import collections
+import concurrent.futures
+import json
+import socket
+import threading
+import time
+
+from .log import get_logger
+
+
+COMMAND_PORT = 10003
+DRAIN_BUDGET_S = 0.02           # GUI time spent per drain before yielding back to the event loop
+
+log = get_logger("commands")
+
+
+class CommandChannel:
+    """Local TCP line protocol feeding ``execute`` in arrival order.
+
+    Clients send one UTF-8 command per line and get one JSON line back per
+    command, in order: ``{"id": n, "command": ..., "ok": bool}`` plus
+    ``"error"`` when execution raised. Commands from every connection share one
+    FIFO that is drained on the GUI thread through ``dispatch`` in batches, so
+    bursts are neither dropped nor coalesced and the window stays responsive.
+    """
+
+    def __init__(self, execute, dispatch=None, host="127.0.0.1", port=COMMAND_PORT):
+        self.execute = execute
+        self.dispatch = dispatch or (lambda fn: fn())
+        self.host = host
+        self.port = port
+        self.executed = 0
+        self._pending = collections.deque()
+        self._pending_lock = threading.Lock()
+        self._drain_scheduled = False
+        self._sequence = 0
+        self._loop = None
+        self._server = None
+        self._thread = None
+
+    def start(self):
+        if self._thread is not None:
+            return
+        ready = threading.Event()
+        self._thread = threading.Thread(target=self._run, args=(ready,), daemon=True)
+        self._thread.start()
+        ready.wait(2.0)
+
+    def stop(self):
+        loop = self._loop
+        if loop is not None:
+            loop.call_soon_threadsafe(loop.stop)
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+            self._thread = None
+
+    def submit(self, command):
+        """Queue a command from any thread; returns a Future resolved with its ack dict."""
+        future = concurrent.futures.Future()
+        with self._pending_lock:
+            self._sequence += 1
+            self._pending.append((self._sequence, command, future))
+            schedule = not self._drain_scheduled
+            self._drain_scheduled = True
+        if schedule:
+            self.dispatch(self._drain)
+        return future
+
+    def _drain(self):
+        """Run queued commands on the GUI thread for up to DRAIN_BUDGET_S, then reschedule."""
+        deadline = time.perf_counter() + DRAIN_BUDGET_S
+        while True:
+            with self._pending_lock:
+                if not self._pending:
+                    self._drain_scheduled = False
+                    return
+                if time.perf_counter() > deadline:
+                    break
+                sequence, command, future = self._pending.popleft()
+
+            ack = {"id": sequence, "command": command}
+            try:
+                ack["ok"] = bool(self.execute(command))
+            except Exception as exc:
+                ack["ok"] = False
+                ack["error"] = str(exc)
+            self.executed += 1
+            future.set_result(ack)
+        self.dispatch(self._drain)
+
+    def _run(self, ready):
+        loop = asyncio.new_event_loop()
+        self._loop = loop
+        try:
+            self._server = loop.run_until_complete(
+                asyncio.start_server(self._handle_client, self.host, self.port)
+            )
+            log.info("Command channel listening on %s:%s", self.host, self.port)
+        except OSError as exc:
+            log.warning("Command channel disabled: %s", exc)
+            loop.close()
+            self._loop = None
+            ready.set()
+            return
+        ready.set()
+        try:
+            loop.run_forever()
+        finally:
+            self._server.close()
+            tasks = asyncio.all_tasks(loop)
+            for task in tasks:
+                task.cancel()
+            if tasks:
+                loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+            loop.close()
+            self._loop = None
+
+    async def _handle_client(self, reader, writer):
+        acks = asyncio.Queue()
+        sender = asyncio.ensure_future(self._send_acks(writer, acks))
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                command = line.decode("utf-8", errors="ignore").strip()
+                if command:
+                    # Acks are written in submission order even while later lines are still arriving.
+                    await acks.put(asyncio.wrap_future(self.submit(command)))
+        except (OSError, asyncio.IncompleteReadError, asyncio.CancelledError):
+            # Cancelled on shutdown; finish normally so the stream callback stays quiet.
+            sender.cancel()
+        finally:
+            await acks.put(None)
+            await asyncio.gather(sender, return_exceptions=True)
+            writer.close()
+
+    @staticmethod
+    async def _send_acks(writer, acks):
+        while True:
+            pending = await acks.get()
+            if pending is None:
+                return
+            ack = await pending
+            writer.write((json.dumps(ack) + "\n").encode("utf-8"))
+            if acks.empty():
+                await writer.drain()
+
+
+def send_commands(commands, host="127.0.0.1", port=COMMAND_PORT, timeout=30.0):
+    """Send commands to a running app and return their acks (handy from notebooks)."""
+    if isinstance(commands, str):
+        commands = [commands]
+    with socket.create_connection((host, port), timeout=timeout) as conn:
+        conn.sendall("".join(f"{command.strip()}\n" for command in commands).encode("utf-8"))
+        reader = conn.makefile("r", encoding="utf-8")
+        return [json.loads(reader.readline()) for command in commands if command.strip()]
+
+
+if __name__ == "__main__":
+    import argparse
+    import sys
+
+    parser = argparse.ArgumentParser(description="Send text commands to the running telescope app.")
+    parser.add_argument("commands", nargs="*", help="commands; read from stdin, one per line, when omitted")
+    parser.add_argument("--port", type=int, default=COMMAND_PORT)
+    args = parser.parse_args()
+
+    commands = args.commands or [line for line in sys.stdin if line.strip()]
+    for ack in send_commands(commands, port=args.port):
+        status = "ok" if ack["ok"] else f"failed {ack.get('error', '')}".rstrip()
+        print(f"#{ack['id']} {status}: {ack['command']}")
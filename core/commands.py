@@ -0,0 +1,158 @@
+import re
+import threading
+
+from .clock import default_clock
+from .log import get_logger
+from .metrics import timed
+from .minor_planets import MinorPlanetCatalog
+from .site import ephemeris, site
+
+
+PRESETS = {
+    "polaris": (0, 45),
+    "north star": (0, 45),
+    "zenith": (0, 90),
+    "straight up": (0, 90),
+    "horizon north": (0, 0),
+    "horizon east": (90, 0),
+    "horizon south": (180, 0),
+    "horizon west": (270, 0),
+}
+
+log = get_logger("commands")
+
+CELESTIAL_KEYWORDS = ['moon', 'sun', 'mars', 'jupiter', 'saturn', 'venus', 'mercury', 'uranus', 'neptune']
+
+PLANETS = {
+    "sun": "sun",
+    "moon": "moon",
+    "mercury": "mercury",
+    "venus": "venus",
+    "mars": "mars",
+    "jupiter": "jupiter barycenter",
+    "saturn": "saturn barycenter",
+    "uranus": "uranus barycenter",
+    "neptune": "neptune barycenter",
+}
+
+
+_minor_planets = None
+_lock = threading.Lock()
+
+
+def minor_planet_catalog(eph=None):
+    global _minor_planets
+    with _lock:
+        if _minor_planets is None:
+            _minor_planets = MinorPlanetCatalog(eph=eph)
+    return _minor_planets
+
+
+def locate_object(object_name, latitude, longitude, when=None):
+    """Topocentric (azimuth, elevation) of a planet, the Sun/Moon or a minor planet, or None."""
+    try:
+        ts, eph = ephemeris()
+        t = default_clock.time(ts) if when is None else when
+        object_name = object_name.lower().strip()
+
+        if object_name in PLANETS:
+            astrometric = site(latitude, longitude, eph).at(t).observe(eph[PLANETS[object_name]])
+            alt, az, distance = astrometric.apparent().altaz()
+            azimuth = az.degrees
+            elevation = alt.degrees
+        else:
+            located = minor_planet_catalog(eph).locate(object_name, latitude, longitude, t)
+            if located is None:
+                log.info("Object '%s' not recognized", object_name)
+                return None
+            azimuth, elevation, magnitude = located
+            log.info("%s: estimated magnitude %.1f", object_name.title(), magnitude)
+
+        log.info("%s: Az=%.2f°, El=%.2f°", object_name.title(), azimuth, elevation)
+        return (azimuth, elevation)
+
+    except Exception as e:
+        log.warning("Error calculating coordinates for %s: %s", object_name, e)
+        return None
+
+
+@timed("parse_command")
+def parse_command(command, latitude=0.0, longitude=0.0, when=None, resolver=None, interpret=None, announce=None):
+    """Interpret a text command as (type, az, el, object_name).
+
+    ``when`` (skyfield Time) evaluates object positions at that instant instead
+    of now. ``resolver(name, latitude, longitude, when)`` replaces
+    locate_object for object lookups, e.g. with a caching one. ``interpret``
+    maps an unrecognized command to an object name (the AI agent) and
+    ``announce`` receives spoken feedback; both are optional.
+    """
+    command = command.lower()
+    resolver = resolver or locate_object
+    announce = announce or (lambda text: None)
+
+    if any(phrase in command for phrase in ["hide point", "hide marker", "turn off point", "disable point", "remove point"]):
+        return ("toggle_point", False, None, None)
+    if any(phrase in command for phrase in ["show point", "show marker", "turn on point", "enable point", "display point"]):
+        return ("toggle_point", True, None, None)
+
+    # Simulation clock: ("clock", value, None, action); value is the rate or seek time.
+    rate_match = re.search(r'\b(?:time warp|warp|time speed|clock speed)\s*(?:to\s+|x\s*)?(-?\d+(?:\.\d+)?)', command)
+    if rate_match:
+        return ("clock", float(rate_match.group(1)), None, "rate")
+    seek_match = re.search(r'\b(?:set time|set clock|jump to time)\s+(?:to\s+)?(\d{4}-\d{2}-\d{2}(?:[ t]\d{1,2}:\d{2}(?::\d{2})?)?z?)', command)
+    if seek_match:
+        return ("clock", seek_match.group(1).upper(), None, "seek")
+    if any(phrase in command for phrase in ["pause time", "freeze time", "stop time", "pause clock"]):
+        return ("clock", None, None, "pause")
+    if any(phrase in command for phrase in ["resume time", "unpause time", "resume clock"]):
+        return ("clock", None, None, "resume")
+    if any(phrase in command for phrase in ["real time", "reset time", "reset clock"]):
+        return ("clock", None, None, "reset")
+
+    satellite_match = re.search(r'\bsatellite\s+(.+)', command)
+    if satellite_match:
+        return ("satellite", None, None, satellite_match.group(1).strip())
+
+    for key, (az, el) in PRESETS.items():
+        if key in command:
+            announce(f"Moving to {key}")
+            return ("preset", az, el, key)
+
+    az_match = re.search(r'azimuth\s+(\d+)', command)
+    el_match = re.search(r'elevation\s+(\d+)', command)
+
+    if az_match or el_match:
+        az = int(az_match.group(1)) if az_match else None
+        el = int(el_match.group(1)) if el_match else None
+        return ("manual", az, el, None)
+
+    for keyword in CELESTIAL_KEYWORDS:
+        if keyword in command:
+            log.debug("Direct match found: %s", keyword)
+            coords = resolver(keyword, latitude, longitude, when)
+            if coords:
+                return ("celestial", coords[0], coords[1], keyword)
+            return (None, None, None, None)
+
+    minor_match = re.search(r'\b(?:asteroid|comet|minor planet)\s+([\w/() -]+)', command)
+    if minor_match:
+        name = minor_match.group(1).strip()
+        coords = resolver(name, latitude, longitude, when)
+        if coords:
+            return ("celestial", coords[0], coords[1], name)
+        return (None, None, None, None)
+
+    if interpret is not None:
+        log.info("No direct match - using AI agent for interpretation...")
+        ai_object = interpret(command)
+        if ai_object and ai_object != 'unknown':
+            log.info("AI agent successfully interpreted command as: %s", ai_object)
+            coords = resolver(ai_object, latitude, longitude, when)
+            if coords:
+                return ("celestial", coords[0], coords[1], ai_object)
+        else:
+            log.info("AI agent could not interpret command")
+    else:
+        log.info("AI agent not available - command not recognized")
+
+    return (None, None, None, None)
@@ -0,0 +1,436 @@
+import queue
+import threading
+import time
+
+from .clock import default_clock
+from .commands import parse_command
+from .log import get_logger
+from .mount import MountSystem, PositionCache
+from .state import TelescopeState
+
+
+TICK_S = 0.02                   # motion update period
+SLEW_S = 0.6                    # duration of an animated slew
+SIDEREAL_UPDATE_S = 1.0         # re-pointing period while tracking RA/Dec
+SATELLITE_UPDATE_S = 0.05       # re-pointing period while following a satellite
+SLEW_EPSILON = 1e-3
+
+log = get_logger("engine")
+
+
+class TelescopeCore:
+    """Telescope state, motion, command execution and device servers, without a GUI.
+
+    State changes happen on one owner thread: the GUI thread when a window is
+    attached (``dispatch`` then marshals calls onto it), otherwise the thread
+    running ``run``. Servers hand their moves to ``dispatch`` too, so nothing
+    else needs locking. Call ``tick`` every ``TICK_S`` to advance slews and
+    tracking; it ends by flushing ``state``, so subscribers (see
+    ``TelescopeState.subscribe``) hear about everything that changed during
+    the frame once.
+
+    Sky positions are evaluated at ``clock`` time (the shared simulation
+    clock unless one is passed), so pausing, seeking or warping it moves
+    tracking, the servers and lookups together. Slews stay in wall-clock time.
+
+    The attributes the servers read (``device_lat``/``device_lon``,
+    ``mount``, ``animating``, ``sidereal_tracking``; the first and last are
+    views of ``state``) and the methods they call (``set_orientation``,
+    ``plot_telescope``, ``abort_slew``, ``set_tracking``) are the same ones
+    the GUI used to provide.
+
+    Servers (and their imports) are only created when first started or
+    accessed, so a core used for commands alone starts quickly.
+
+    ``start_recording`` logs every mount move, target, command, location and
+    clock change to a session file; ``replay`` drives the core from one.
+    """
+
+    def __init__(self, latitude=0.0, longitude=0.0, dispatch=None, resolver=None, interpret=None,
+                 announce=None, bridge_port=10001, alpaca_port=None, command_port=None, clock=None,
+                 metrics_port=None):
+        self.clock = clock or default_clock
+        self.mount = MountSystem()
+        self.state = TelescopeState(self.mount, latitude, longitude)
+        self.animating = False
+        self.slew_s = SLEW_S
+        self.satellite_catalog = None
+        self.resolver = resolver
+        self.interpret = interpret
+        self.announce = announce or (lambda text: None)
+
+        self._calls = queue.SimpleQueue()
+        self.dispatch = dispatch or self._calls.put
+        self._slew_from = None
+        self._slew_started = 0.0
+        self._settled_version = None
+        self._tracked_index = None
+        self._last_satellite_step = None
+        self._tracking_radec = None
+        self._tracking_version = None
+        self._last_sidereal_step = None
+
+        self.positions = PositionCache(self.mount, clock=self.clock)
+        self.bridge_port = bridge_port
+        self.alpaca_port = alpaca_port
+        self.command_port = command_port
+        self.metrics_port = metrics_port
+        self._bridge = None
+        self._telemetry = None
+        self._alpaca = None
+        self._command_channel = None
+        self._metrics_server = None
+        self.recorder = None
+        self.player = None
+
+    # Services
+
+    @property
+    def bridge(self):
+        if self._bridge is None:
+            from .stellarium_bridge import StellariumLX200Bridge
+
+            self._bridge = StellariumLX200Bridge(
+                self, host="127.0.0.1", port=self.bridge_port, dispatch=self.dispatch, positions=self.positions,
+            )
+        return self._bridge
+
+    @property
+    def telemetry(self):
+        if self._telemetry is None:
+            from .telemetry import TelemetryPublisher
+
+            self._telemetry = TelemetryPublisher(self.mount, self.positions, lambda: (self.device_lat, self.device_lon))
+        return self._telemetry
+
+    @property
+    def alpaca(self):
+        if self._alpaca is None:
+            from .alpaca import AlpacaServer, AlpacaTelescope
+
+            device = AlpacaTelescope(self, self.positions, self.bridge.driver, self.bridge.goto_radec, dispatch=self.dispatch)
+            self._alpaca = AlpacaServer(device) if self.alpaca_port is None else AlpacaServer(device, port=self.alpaca_port)
+        return self._alpaca
+
+    @property
+    def command_channel(self):
+        if self._command_channel is None:
+            from .command_channel import CommandChannel
+
+            execute = self.execute_external_command
+            self._command_channel = (
+                CommandChannel(execute, dispatch=self.dispatch) if self.command_port is None
+                else CommandChannel(execute, dispatch=self.dispatch, port=self.command_port)
+            )
+        return self._command_channel
+
+    @property
+    def metrics_server(self):
+        if self._metrics_server is None:
+            from .metrics import MetricsServer
+
+            self._metrics_server = MetricsServer() if self.metrics_port is None else MetricsServer(port=self.metrics_port)
+        return self._metrics_server
+
+    def start_services(self, bridge=True, telemetry=True, alpaca=True, commands=True, metrics=False):
+        if metrics:
+            self.metrics_server.start()
+        if bridge:
+            self.bridge.start()
+        if telemetry:
+            self.telemetry.start()
+        if alpaca:
+            self.alpaca.start()
+        if commands:
+            self.command_channel.start()
+
+    def stop_services(self):
+        for service in (self._bridge, self._telemetry, self._alpaca, self._command_channel, self._metrics_server):
+            if service is not None:
+                service.stop()
+
+    def run(self, stop=None, tick_s=TICK_S):
+        """Headless main loop: run dispatched calls and ``tick`` until ``stop`` is set."""
+        stop = stop or threading.Event()
+        while not stop.is_set():
+            deadline = time.monotonic() + tick_s
+            self.process_pending(deadline)
+            self.tick()
+            remaining = deadline - time.monotonic()
+            if remaining > 0:
+                stop.wait(remaining)
+
+    def process_pending(self, deadline=None):
+        """Run calls queued through the default ``dispatch`` (headless mode only)."""
+        while deadline is None or time.monotonic() < deadline:
+            try:
+                fn = self._calls.get_nowait()
+            except queue.Empty:
+                return
+            try:
+                fn()
+            except Exception as exc:
+                log.error("Core call failed: %s", exc)
+
+    # State
+
+    device_lat = property(lambda self: self.state.latitude)
+    device_lon = property(lambda self: self.state.longitude)
+    target_az = property(lambda self: self.state.target_az)
+    target_el = property(lambda self: self.state.target_el)
+    show_point = property(lambda self: self.state.show_point)
+    sidereal_tracking = property(lambda self: self.state.tracking)
+    tracked_satellite = property(lambda self: self.state.satellite)
+
+    def set_location(self, latitude, longitude):
+        self.state.latitude, self.state.longitude = latitude, longitude
+
+    def set_show_point(self, show):
+        self.state.show_point = bool(show)
+
+    def set_orientation(self, az, el):
+        """Set the slew target; ``plot_telescope`` starts moving towards it."""
+        self.state.target_az = az
+        self.state.target_el = el
+
+    def plot_telescope(self):
+        if (
+            abs(self.mount.azimuth - self.target_az) <= SLEW_EPSILON
+            and abs(self.mount.elevation - self.target_el) <= SLEW_EPSILON
+        ):
+            self.animating = False
+            self.mount.set_position(self.target_az, self.target_el)
+            return
+        self._slew_from = (self.mount.azimuth, self.mount.elevation)
+        self._slew_started = time.monotonic()
+        self.animating = True
+
+    def slew_to(self, az, el):
+        self.set_orientation(az, el)
+        self.plot_telescope()
+
+    def abort_slew(self):
+        self.animating = False
+        self.stop_satellite_tracking()
+
+    def set_tracking(self, enabled):
+        """Hold the current RA/Dec by re-pointing the alt-az mount every second."""
+        self.state.tracking = bool(enabled)
+        self._tracking_version = None
+        self._last_sidereal_step = None
+
+    # Clock
+
+    def set_time_rate(self, rate):
+        self.clock.set_rate(rate)
+        self.state.touch("clock")
+
+    def pause_time(self):
+        self.clock.pause()
+        self.state.touch("clock")
+
+    def resume_time(self):
+        self.clock.resume()
+        self.state.touch("clock")
+
+    def seek_time(self, when):
+        self.clock.seek(when)
+        self.state.touch("clock")
+
+    def reset_time(self):
+        self.clock.reset()
+        self.state.touch("clock")
+
+    # Recording
+
+    def start_recording(self, path):
+        from .recorder import SessionRecorder
+
+        self.stop_recording()
+        self.recorder = SessionRecorder(path, self.clock)
+        self.recorder.start(self)
+        return self.recorder
+
+    def stop_recording(self):
+        if self.recorder is not None:
+            self.recorder.stop()
+            self.recorder = None
+
+    def replay(self, path, speed=1.0, start=None, on_finished=None):
+        """Play a recorded session back through this core; ``start`` is seconds into it."""
+        from .recorder import SessionLog, SessionPlayer
+
+        self.stop_replay()
+        self.abort_slew()
+        self.set_tracking(False)
+        session = SessionLog(path)
+        start = None if start is None or session.start is None else session.start + start
+        self.player = SessionPlayer(session, self, speed=speed, start=start, on_finished=on_finished)
+        self.player.start()
+        return self.player
+
+    def stop_replay(self):
+        if self.player is not None:
+            self.player.stop()
+            self.player = None
+
+    # Satellites
+
+    def load_satellites(self, path=None):
+        from .satellites import SatelliteCatalog
+
+        catalog = SatelliteCatalog(path, clock=self.clock) if path else SatelliteCatalog(clock=self.clock)
+        if catalog.ready:
+            self.satellite_catalog = catalog
+        return catalog.ready
+
+    def track_satellite(self, name):
+        """Follow a satellite by writing mount angles directly at 20 Hz, bypassing the slew animation."""
+        if self.satellite_catalog is None:
+            self.announce("Satellite data not loaded")
+            return False
+        index = self.satellite_catalog.find(name)
+        if index is None:
+            self.announce(f"Satellite {name} not found")
+            return False
+
+        self.state.satellite = self.satellite_catalog.names[index]
+        self._tracked_index = index
+        self._last_satellite_step = None
+        self.animating = False
+        self.announce(f"Tracking satellite {self.tracked_satellite}")
+        return True
+
+    def stop_satellite_tracking(self):
+        if self.tracked_satellite is None:
+            return
+        self.state.satellite = None
+        self._tracked_index = None
+
+    # Motion
+
+    def tick(self, now=None):
+        now = time.monotonic() if now is None else now
+        if self.animating:
+            self._slew_step(now)
+        elif self.tracked_satellite is not None:
+            sky_now = self.clock.now()
+            if _due(self._last_satellite_step, sky_now, SATELLITE_UPDATE_S):
+                self._last_satellite_step = sky_now
+                self._satellite_step(sky_now)
+        elif self.sidereal_tracking:
+            sky_now = self.clock.now()
+            if _due(self._last_sidereal_step, sky_now, SIDEREAL_UPDATE_S):
+                self._last_sidereal_step = sky_now
+                self._sidereal_step()
+
+        if not self.animating and self.mount.version != self._settled_version:
+            # Moved by guiding, sync or tracking: later slews start from (and aim at) where it is.
+            self._settled_version = self.mount.version
+            self.state.target_az, self.state.target_el = self.mount.azimuth, self.mount.elevation
+        self.state.flush()
+
+    def _slew_step(self, now):
+        progress = (now - self._slew_started) / self.slew_s if self.slew_s > 0 else 1.0
+        if progress >= 1.0:
+            self.animating = False
+            self.mount.set_position(self.target_az, self.target_el)
+            return
+        s = progress * progress * (3 - 2 * progress)
+        start_az, start_el = self._slew_from
+        self.mount.set_position(
+            start_az + (self.target_az - start_az) * s,
+            start_el + (self.target_el - start_el) * s,
+        )
+
+    def _satellite_step(self, when=None):
+        position = self.satellite_catalog.track_position(self._tracked_index, self.device_lat, self.device_lon, when)
+        if position is None:
+            self.stop_satellite_tracking()
+            return
+        az, el = position
+        self.mount.set_position(az, max(0.0, min(90.0, el)))
+
+    def _sidereal_step(self):
+        if self.mount.version != self._tracking_version:
+            # Moved by someone else (slew, guiding, sync): hold the new pointing from here on.
+            self._tracking_radec = self.positions.radec(self.device_lat, self.device_lon)
+        else:
+            az, el = self.bridge.radec_to_altaz(*self._tracking_radec)
+            self.mount.set_position(az, el)
+        self._tracking_version = self.mount.version
+
+    # Commands
+
+    def execute_command(self, command):
+        """Execute a natural language command and apply telescope updates."""
+        ok = self._execute_command(command)
+        if self.recorder is not None:
+            self.recorder.command(command, ok)
+        return ok
+
+    def _execute_command(self, command):
+        cmd_type, az, el, obj_name = parse_command(
+            command, self.device_lat, self.device_lon, when=self.clock.time(self.positions.ts),
+            resolver=self.resolver, interpret=self.interpret, announce=self.announce,
+        )
+
+        if cmd_type == "satellite":
+            return self.track_satellite(obj_name)
+        if cmd_type == "clock":
+            return self._execute_clock_command(obj_name, az)
+        if cmd_type is not None:
+            self.stop_satellite_tracking()
+
+        if cmd_type == "toggle_point":
+            # az carries the requested point visibility for toggle commands.
+            self.set_show_point(az)
+            self.announce("Point marker enabled" if az else "Point marker disabled")
+            return True
+
+        if cmd_type in ["preset", "celestial"] and az is not None and el is not None:
+            self.slew_to(az, el)
+            if cmd_type == "celestial" and obj_name:
+                log.info("Pointing to %s at Az=%.2f°, El=%.2f°", obj_name, az, el)
+            return True
+
+        if cmd_type == "manual":
+            self.slew_to(
+                self.target_az if az is None else float(az),
+                self.target_el if el is None else float(el),
+            )
+            self.announce(f"Telescope positioned at azimuth {az} degrees, elevation {el} degrees")
+            return True
+
+        log.info("Could not interpret command: %s", command)
+        self.announce("Could not interpret command. Please try again.")
+        return False
+
+    def _execute_clock_command(self, action, value):
+        # az carries the rate or seek time for clock commands.
+        try:
+            if action == "rate":
+                self.set_time_rate(value)
+            elif action == "seek":
+                self.seek_time(value)
+            elif action == "pause":
+                self.pause_time()
+            elif action == "resume":
+                self.resume_time()
+            else:
+                self.reset_time()
+        except (ValueError, OverflowError) as exc:
+            self.announce(f"Could not set the clock: {exc}")
+            return False
+        log.info("Simulation clock: %s", self.clock.describe())
+        self.announce("Clock paused" if self.clock.paused else f"Clock running at {self.clock.rate:g} times real time")
+        return True
+
+    def execute_external_command(self, command):
+        log.info("External command received: %s", command)
+        return self.execute_command(command)
+
+
+def _due(last, now, period):
+    """True when ``period`` has passed since ``last``, or the clock was moved back before it."""
+    return last is None or now >= last + period or now < last
@@ -0,0 +1,269 @@
+import json
+import os
+import re
+import threading
+import time
+
+try:
+    import serial
+except ImportError:
+    serial = None
+
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+LOCATION_CACHE_PATH = os.path.join(DATA_DIR, "location.json")
+MANUAL_LOCATION_PATH = os.path.join(DATA_DIR, "location.txt")
+
+MIN_CHANGE_DEG = 1e-4           # ~10 m; smaller GPS jitter is not worth a sky redraw
+RETRY_S = 5.0
+
+
+def parse_coordinates(text):
+    """(lat, lon) from "52.23 21.01", "52.23, 21.01" or a JSON object, or None."""
+    text = text.strip()
+    if text.startswith("{"):
+        try:
+            data = json.loads(text)
+            return _valid(float(data["latitude"]), float(data["longitude"]))
+        except (ValueError, KeyError, TypeError):
+            return None
+    for line in text.splitlines():
+        line = line.split("#", 1)[0].strip()
+        if not line:
+            continue
+        parts = [part for part in re.split(r"[,\s]+", line) if part]
+        if len(parts) >= 2:
+            try:
+                return _valid(float(parts[0]), float(parts[1]))
+            except ValueError:
+                return None
+    return None
+
+
+def _valid(lat, lon):
+    if -90.0 <= lat <= 90.0 and -180.0 <= lon <= 180.0:
+        return lat, lon
+    return None
+
+
+def _nmea_angle(value, hemisphere, degree_digits):
+    if not value or hemisphere not in "NSEW":
+        return None
+    degrees = float(value[:degree_digits]) + float(value[degree_digits:]) / 60.0
+    return -degrees if hemisphere in "SW" else degrees
+
+
+def parse_nmea(sentence):
+    """(lat, lon) from a GGA or RMC sentence with a valid checksum and fix, else None."""
+    sentence = sentence.strip()
+    if not sentence.startswith("$") or "*" not in sentence:
+        return None
+    body, _, checksum = sentence[1:].partition("*")
+    computed = 0
+    for char in body:
+        computed ^= ord(char)
+    try:
+        if computed != int(checksum[:2], 16):
+            return None
+    except ValueError:
+        return None
+
+    fields = body.split(",")
+    kind = fields[0][2:]
+    try:
+        if kind == "GGA" and len(fields) > 6 and fields[6] not in ("", "0"):
+            lat = _nmea_angle(fields[2], fields[3], 2)
+            lon = _nmea_angle(fields[4], fields[5], 3)
+        elif kind == "RMC" and len(fields) > 6 and fields[2] == "A":
+            lat = _nmea_angle(fields[3], fields[4], 2)
+            lon = _nmea_angle(fields[5], fields[6], 3)
+        else:
+            return None
+    except ValueError:
+        return None
+    if lat is None or lon is None:
+        return None
+    return _valid(lat, lon)
+
+
+class ManualFileSource:
+    """Coordinates typed into a text file; re-read whenever the file changes."""
+
+    name = "manual"
+
+    def __init__(self, path=MANUAL_LOCATION_PATH, poll_s=2.0):
+        self.path = path
+        self.poll_s = poll_s
+
+    def run(self, report, stop):
+        stamp = None
+        while not stop.is_set():
+            try:
+                info = os.stat(self.path)
+                if (info.st_mtime, info.st_size) != stamp:
+                    stamp = (info.st_mtime, info.st_size)
+                    with open(self.path, "r", encoding="utf-8") as handle:
+                        fix = parse_coordinates(handle.read())
+                    if fix is None:
+                        print(f"Location file {self.path}: no valid 'lat lon' found")
+                    else:
+                        report(self, *fix)
+            except OSError:
+                stamp = None
+            stop.wait(self.poll_s)
+
+
+class NmeaSource:
+    """GPS fixes from NMEA 0183 sentences on a serial device, pty or FIFO.
+
+    Serial ports are opened through pyserial when it is installed; anything
+    else (a pty from a GPS bridge, a FIFO, a recorded log) is read as a file.
+    The device is reopened every ``RETRY_S`` seconds if it goes away.
+    """
+
+    name = "nmea"
+
+    def __init__(self, device, baudrate=4800):
+        self.device = device
+        self.baudrate = baudrate
+
+    def _open(self):
+        if serial is not None and not os.path.isfile(self.device):
+            try:
+                return serial.Serial(self.device, self.baudrate, timeout=1.0)
+            except (serial.SerialException, ValueError):
+                pass
+        return open(self.device, "rb", buffering=0)
+
+    def run(self, report, stop):
+        while not stop.is_set():
+            try:
+                with self._open() as stream:
+                    # pyserial returns nothing on its read timeout; files, ptys and FIFOs only at EOF.
+                    timed = serial is not None and isinstance(stream, serial.Serial)
+                    buffer = b""
+                    while not stop.is_set():
+                        chunk = stream.read(256)
+                        if not chunk:
+                            if timed:
+                                continue
+                            break
+                        buffer += chunk
+                        *lines, buffer = buffer.split(b"\n")
+                        for line in lines:
+                            fix = parse_nmea(line.decode("ascii", "ignore"))
+                            if fix is not None:
+                                report(self, *fix)
+                        if len(buffer) > 1024:
+                            buffer = b""
+            except OSError as exc:
+                print(f"NMEA device {self.device} unavailable: {exc}")
+            stop.wait(RETRY_S)
+
+
+class IpSource:
+    """One coarse lookup from the public IP address (needs network access)."""
+
+    name = "ip"
+
+    def __init__(self, timeout=2.0):
+        self.timeout = timeout
+
+    def run(self, report, stop):
+        try:
+            import geocoder
+
+            g = geocoder.ip('me', timeout=self.timeout)
+            if g.ok and g.latlng and len(g.latlng) == 2:
+                fix = _valid(float(g.latlng[0]), float(g.latlng[1]))
+                if fix is not None:
+                    report(self, *fix)
+        except Exception as exc:
+            print(f"Geolocation lookup failed: {exc}")
+
+
+class LocationProvider:
+    """Site coordinates from prioritized sources, each read on its own thread.
+
+    ``sources`` are listed best first; a fix is taken from a source unless a
+    better one has already reported. ``on_update(lat, lon, source_name)`` is
+    called from the reporting thread, so GUI callers should marshal it. The
+    last accepted fix is saved to ``cache_path`` and available immediately
+    through ``cached()`` on the next start.
+    """
+
+    def __init__(self, on_update, sources, cache_path=LOCATION_CACHE_PATH, min_change_deg=MIN_CHANGE_DEG):
+        self.on_update = on_update
+        self.sources = list(sources)
+        self.cache_path = cache_path
+        self.min_change_deg = min_change_deg
+        self.location = None
+        self.source = None
+        self._rank = len(self.sources)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._threads = []
+
+    def cached(self):
+        """(lat, lon, source_name) from the cache file, or None."""
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as handle:
+                data = json.load(handle)
+            fix = _valid(float(data["latitude"]), float(data["longitude"]))
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+        if fix is None:
+            return None
+        return fix[0], fix[1], data.get("source", "cache")
+
+    def start(self):
+        self._stop.clear()
+        for source in self.sources:
+            thread = threading.Thread(target=source.run, args=(self.report, self._stop),
+                                      name=f"location-{source.name}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self):
+        self._stop.set()
+        self._threads = []
+
+    def report(self, source, lat, lon):
+        rank = self.sources.index(source) if source in self.sources else len(self.sources)
+        with self._lock:
+            if rank > self._rank:
+                return
+            if (
+                self.location is not None
+                and abs(lat - self.location[0]) < self.min_change_deg
+                and abs(lon - self.location[1]) < self.min_change_deg
+            ):
+                self._rank = rank
+                return
+            self._rank = rank
+            self.location = (lat, lon)
+            self.source = source.name
+        self._save(lat, lon, source.name)
+        self.on_update(lat, lon, source.name)
+
+    def _save(self, lat, lon, source_name):
+        payload = {"latitude": lat, "longitude": lon, "source": source_name, "time": time.time()}
+        tmp_path = self.cache_path + ".tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as handle:
+                json.dump(payload, handle)
+            os.replace(tmp_path, self.cache_path)
+        except OSError as exc:
+            print(f"Could not save location cache: {exc}")
+
+
+def default_sources(manual_path=MANUAL_LOCATION_PATH, nmea_device=None, use_ip=True):
+    """Manual file (polled, so it may be created later), then the GPS device (if given), then IP lookup."""
+    sources = []
+    if manual_path:
+        sources.append(ManualFileSource(manual_path))
+    if nmea_device:
+        sources.append(NmeaSource(nmea_device))
+    if use_ip:
+        sources.append(IpSource())
+    return sources
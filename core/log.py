@@ -0,0 +1,212 @@
+import atexit
+import collections
+import queue
+import threading
+import time
+
+
+DEBUG, INFO, WARNING, ERROR = 10, 20, 30, 40
+LEVEL_NAMES = {DEBUG: "DEBUG", INFO: "INFO", WARNING: "WARNING", ERROR: "ERROR"}
+RING_CAPACITY = 5000            # entries kept in memory for ``recent``
+RATE_BURST = 5                  # identical messages let through per window...
+RATE_PERIOD = 10.0              # ...of this many seconds; the rest are counted and dropped
+RATE_KEYS = 4096                # distinct messages tracked before the table is reset
+
+
+def level_value(level):
+    """Numeric level for 10/"debug"/"INFO"/...; raises ValueError for unknown names."""
+    if isinstance(level, int):
+        return level
+    for value, name in LEVEL_NAMES.items():
+        if name == str(level).strip().upper():
+            return value
+    raise ValueError(f"unknown log level: {level}")
+
+
+class Logger:
+    """One subsystem's logger. Calls below its level return after one comparison."""
+
+    __slots__ = ("name", "level", "_system")
+
+    def __init__(self, name, level, system):
+        self.name = name
+        self.level = level
+        self._system = system
+
+    def debug(self, msg, *args):
+        if self.level <= DEBUG:
+            self._system.emit(self.name, DEBUG, msg, args)
+
+    def info(self, msg, *args):
+        if self.level <= INFO:
+            self._system.emit(self.name, INFO, msg, args)
+
+    def warning(self, msg, *args):
+        if self.level <= WARNING:
+            self._system.emit(self.name, WARNING, msg, args)
+
+    def error(self, msg, *args):
+        if self.level <= ERROR:
+            self._system.emit(self.name, ERROR, msg, args)
+
+
+class LogSystem:
+    """Non-blocking logging in place of print on hot paths.
+
+    A call that passes its subsystem's level and the rate limit only puts a
+    tuple on a queue; a background writer formats it, appends
+    (time, level, subsystem, text) to an in-memory ring buffer and prints
+    it when it reaches the ``console`` level. A slow or blocked console thus
+    stalls the writer, never the bridge or the GUI. Pass ``%`` arguments
+    (``log.debug("LX200 cmd: %s", cmd)``) so nothing is formatted on the
+    caller's thread.
+
+    The rate limit lets ``burst`` copies of one message (same subsystem,
+    format and arguments) through per ``period`` seconds, so a client
+    polling ":GR#" cannot flood the buffer; the next copy after the window
+    notes how many were dropped.
+    """
+
+    def __init__(self, level=INFO, console=INFO, capacity=RING_CAPACITY, burst=RATE_BURST, period=RATE_PERIOD):
+        self.level = level
+        self.console = console
+        self.burst = burst
+        self.period = period
+        self.levels = {}
+        self.loggers = {}
+        self.ring = collections.deque(maxlen=capacity)
+        self.suppressed = 0
+        self._seen = {}
+        self._queue = queue.SimpleQueue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def get_logger(self, subsystem):
+        with self._lock:
+            logger = self.loggers.get(subsystem)
+            if logger is None:
+                logger = Logger(subsystem, self.levels.get(subsystem, self.level), self)
+                self.loggers[subsystem] = logger
+        return logger
+
+    def configure(self, levels=None, console=None, burst=None, period=None):
+        """Set levels per subsystem ({"bridge": "debug", "*": "info"}), the console level and rate limit."""
+        with self._lock:
+            for subsystem, level in (levels or {}).items():
+                if subsystem in ("*", ""):
+                    self.level = level_value(level)
+                else:
+                    self.levels[subsystem] = level_value(level)
+            for name, logger in self.loggers.items():
+                logger.level = self.levels.get(name, self.level)
+        if console is not None:
+            self.console = level_value(console)
+        if burst is not None:
+            self.burst = burst
+        if period is not None:
+            self.period = period
+
+    def emit(self, subsystem, level, msg, args):
+        now = time.time()
+        key = (subsystem, msg, args)
+        note = 0
+        with self._lock:
+            try:
+                entry = self._seen.get(key)
+            except TypeError:           # unhashable arguments are not rate limited
+                entry = key = None
+            if key is not None:
+                if entry is None or now - entry[0] >= self.period:
+                    if len(self._seen) >= RATE_KEYS:
+                        self._seen.clear()
+                    self._seen[key] = [now, 1, 0]
+                    note = entry[2] if entry is not None else 0
+                elif entry[1] < self.burst:
+                    entry[1] += 1
+                else:
+                    entry[2] += 1
+                    self.suppressed += 1
+                    return
+            if self._thread is None:
+                self._start()
+        self._queue.put((now, level, subsystem, msg, args, note))
+
+    def _start(self):
+        self._thread = threading.Thread(target=self._write, name="log-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.stop)
+
+    def _write(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            if isinstance(item, threading.Event):
+                item.set()
+                continue
+            when, level, subsystem, msg, args, note = item
+            try:
+                text = msg % args if args else msg
+            except (TypeError, ValueError):
+                text = f"{msg} {args!r}"
+            if note:
+                text = f"{text} [{note} similar suppressed]"
+            self.ring.append((when, level, subsystem, text))
+            if level >= self.console:
+                try:
+                    print(text)
+                except Exception:
+                    pass
+
+    def flush(self, timeout=1.0):
+        """Wait until everything logged so far has been written."""
+        if self._thread is not None:
+            done = threading.Event()
+            self._queue.put(done)
+            done.wait(timeout)
+
+    def stop(self, timeout=1.0):
+        """Write out what is queued and end the writer thread."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(None)
+            thread.join(timeout)
+
+    def recent(self, count=None, level=DEBUG):
+        """Formatted lines of the newest ring buffer entries at ``level`` or above, oldest first."""
+        level = level_value(level)
+        entries = [entry for entry in list(self.ring) if entry[1] >= level]
+        if count is not None:
+            entries = entries[-count:]
+        return [
+            f"{time.strftime('%H:%M:%S', time.localtime(when))}.{int(when % 1 * 1000):03d} "
+            f"{LEVEL_NAMES.get(level, level):<7} {subsystem:<8} {text}"
+            for when, level, subsystem, text in entries
+        ]
+
+
+def parse_levels(spec):
+    """Parse "info,bridge=debug,console=warning" into (levels, console level).
+
+    A bare level applies to every subsystem; "console" sets what is printed
+    rather than what is recorded in the ring buffer.
+    """
+    levels = {}
+    console = None
+    for part in spec.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        subsystem, _, level = part.rpartition("=")
+        level_value(level)
+        if subsystem == "console":
+            console = level
+        else:
+            levels[subsystem or "*"] = level
+    return levels, console
+
+
+# Shared by every subsystem.
+logs = LogSystem()
+get_logger = logs.get_logger
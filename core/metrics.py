@@ -0,0 +1,193 @@
+import bisect
+import functools
+import threading
+import time
+from contextlib import contextmanager
+
+from .log import get_logger
+
+
+METRICS_PORT = 9108
+METRIC_NAME = "telescope_section_duration_seconds"
+# Upper bounds in seconds, from 50 us (a cached RA/Dec lookup) to 10 s (a catalog download).
+BUCKETS = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+           0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+log = get_logger("metrics")
+
+
+class Histogram:
+    """Fixed-bucket latency histogram (non-cumulative counts; the last slot is +Inf)."""
+
+    def __init__(self, bounds=BUCKETS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds):
+        slot = bisect.bisect_left(self.bounds, seconds)
+        with self._lock:
+            self.counts[slot] += 1
+            self.count += 1
+            self.sum += seconds
+            if seconds > self.max:
+                self.max = seconds
+
+    def snapshot(self):
+        with self._lock:
+            return list(self.counts), self.count, self.sum, self.max
+
+    def quantile(self, q):
+        """Estimate from the buckets by linear interpolation, like Prometheus' histogram_quantile."""
+        counts, count, _, largest = self.snapshot()
+        if not count:
+            return 0.0
+        rank = q * count
+        seen = 0
+        lower = 0.0
+        for slot, number in enumerate(counts):
+            upper = self.bounds[slot] if slot < len(self.bounds) else largest
+            if number and seen + number >= rank:
+                return min(lower + (upper - lower) * (rank - seen) / number, largest)
+            seen += number
+            lower = upper
+        return largest
+
+
+class Metrics:
+    """Per-section timing histograms for the app's hot paths.
+
+    Disabled by default: ``timed`` wrappers then cost one attribute check and
+    ``timer`` blocks a no-op context manager. Enable before (or while) the
+    work runs with ``enable()``; sections appear as they are first timed.
+    """
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.sections = {}
+        self._lock = threading.Lock()
+
+    def enable(self, enabled=True):
+        self.enabled = enabled
+
+    def histogram(self, section):
+        histogram = self.sections.get(section)
+        if histogram is None:
+            with self._lock:
+                histogram = self.sections.setdefault(section, Histogram())
+        return histogram
+
+    def observe(self, section, seconds):
+        self.histogram(section).observe(seconds)
+
+    @contextmanager
+    def timer(self, section):
+        if not self.enabled:
+            yield
+            return
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(section, time.perf_counter() - started)
+
+    def timed(self, section):
+        """Decorator recording every call of the function under ``section``."""
+        def decorate(fn):
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return fn(*args, **kwargs)
+                started = time.perf_counter()
+                try:
+                    return fn(*args, **kwargs)
+                finally:
+                    self.observe(section, time.perf_counter() - started)
+            return wrapper
+        return decorate
+
+    def summary(self):
+        """(section, count, p50, p95, max) rows in seconds, busiest first."""
+        rows = []
+        for section, histogram in sorted(self.sections.items()):
+            rows.append((section, histogram.count, histogram.quantile(0.5), histogram.quantile(0.95), histogram.max))
+        rows.sort(key=lambda row: -row[1])
+        return rows
+
+    def render_prometheus(self):
+        lines = [
+            f"# HELP {METRIC_NAME} Wall time spent in instrumented sections.",
+            f"# TYPE {METRIC_NAME} histogram",
+        ]
+        for section, histogram in sorted(self.sections.items()):
+            counts, count, total, _ = histogram.snapshot()
+            cumulative = 0
+            for bound, number in zip(histogram.bounds, counts):
+                cumulative += number
+                lines.append(f'{METRIC_NAME}_bucket{{section="{section}",le="{bound:g}"}} {cumulative}')
+            lines.append(f'{METRIC_NAME}_bucket{{section="{section}",le="+Inf"}} {count}')
+            lines.append(f'{METRIC_NAME}_sum{{section="{section}"}} {total:.9f}')
+            lines.append(f'{METRIC_NAME}_count{{section="{section}"}} {count}')
+        return "\n".join(lines) + "\n"
+
+
+# Shared by every instrumented module.
+metrics = Metrics()
+timed = metrics.timed
+
+
+def _handler_class():
+    # http.server is imported here, not at module level, so instrumented modules load fast.
+    from http.server import BaseHTTPRequestHandler
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?", 1)[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = self.server.metrics.render_prometheus().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return MetricsHandler
+
+
+class MetricsServer:
+    """Serve ``metrics`` as Prometheus text at http://host:port/metrics (localhost only by default)."""
+
+    def __init__(self, registry=None, host="127.0.0.1", port=METRICS_PORT):
+        self.registry = registry or metrics
+        self.host = host
+        self.port = port
+        self._httpd = None
+
+    def start(self):
+        if self._httpd is not None:
+            return
+        from http.server import ThreadingHTTPServer
+
+        try:
+            self._httpd = ThreadingHTTPServer((self.host, self.port), _handler_class())
+        except OSError as exc:
+            log.warning("Metrics endpoint disabled: %s", exc)
+            return
+        self._httpd.daemon_threads = True
+        self._httpd.metrics = self.registry
+        self.registry.enable()
+        threading.Thread(target=self._httpd.serve_forever, daemon=True).start()
+        log.info("Metrics on http://%s:%s/metrics", self.host, self.port)
+
+    def stop(self):
+        if self._httpd is not None:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._httpd = None
@@ -0,0 +1,465 @@
+import os
+import re
+import numpy as np
+from skyfield.api import load
+
+from .clock import default_clock
+from .site import ephemeris, site
+
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+MPCORB_PATH = os.path.join(DATA_DIR, "MPCORB.DAT")
+COMET_PATH = os.path.join(DATA_DIR, "CometEls.txt")
+
+GAUSS_K = 0.01720209895             # Gaussian gravitational constant, rad/day
+LIGHT_AU_PER_DAY = 173.1446326846693
+OBLIQUITY_J2000 = np.radians(23.4392911)
+
+KIND_ASTEROID = 0
+KIND_COMET = 1
+
+CACHE_VERSION = 2
+NAME_WIDTH = 40
+
+
+def _julian_date(year, month, day):
+    """Julian date (TT) of a Gregorian calendar date; ``day`` may be fractional."""
+    if month <= 2:
+        year -= 1
+        month += 12
+    a = year // 100
+    b = 2 - a + a // 4
+    return int(365.25 * (year + 4716)) + int(30.6001 * (month + 1)) + day + b - 1524.5
+
+
+def _unpack_digit(char):
+    if char.isdigit():
+        return int(char)
+    return ord(char) - ord("A") + 10
+
+
+def _unpack_epoch(packed):
+    """Decode an MPC packed epoch such as ``K2555`` into a Julian date."""
+    century = {"I": 1800, "J": 1900, "K": 2000}[packed[0]]
+    year = century + int(packed[1:3])
+    month = _unpack_digit(packed[3])
+    day = _unpack_digit(packed[4])
+    return _julian_date(year, month, day)
+
+
+def _orientation_vectors(peri_deg, node_deg, incl_deg):
+    """Return the P and Q perifocal unit vectors in the ICRS equatorial frame."""
+    w = np.radians(peri_deg)
+    node = np.radians(node_deg)
+    inc = np.radians(incl_deg)
+
+    cw, sw = np.cos(w), np.sin(w)
+    cn, sn = np.cos(node), np.sin(node)
+    ci, si = np.cos(inc), np.sin(inc)
+
+    px = cw * cn - sw * sn * ci
+    py = cw * sn + sw * cn * ci
+    pz = sw * si
+    qx = -sw * cn - cw * sn * ci
+    qy = -sw * sn + cw * cn * ci
+    qz = cw * si
+
+    ce, se = np.cos(OBLIQUITY_J2000), np.sin(OBLIQUITY_J2000)
+    p = np.array([px, py * ce - pz * se, py * se + pz * ce])
+    q = np.array([qx, qy * ce - qz * se, qy * se + qz * ce])
+    return p, q
+
+
+def _solve_orbits(q, e, tp, jd):
+    """Perifocal coordinates (x, y) in AU for every orbit at Julian date ``jd``.
+
+    Elliptic, parabolic and hyperbolic orbits are solved in separate vectorized
+    passes so a mixed asteroid/comet set costs a handful of numpy calls.
+    """
+    dt = jd - tp
+    x = np.empty_like(q)
+    y = np.empty_like(q)
+
+    parabolic = np.abs(e - 1.0) < 1e-6
+    elliptic = (e < 1.0) & ~parabolic
+    hyperbolic = (e > 1.0) & ~parabolic
+
+    if elliptic.any():
+        ee = e[elliptic]
+        a = q[elliptic] / (1.0 - ee)
+        n = GAUSS_K / a ** 1.5
+        m = np.remainder(n * dt[elliptic] + np.pi, 2.0 * np.pi) - np.pi
+        big_e = m + 0.85 * ee * np.sign(np.sin(m))
+        for _ in range(30):
+            f = big_e - ee * np.sin(big_e) - m
+            big_e = big_e - f / (1.0 - ee * np.cos(big_e))
+        x[elliptic] = a * (np.cos(big_e) - ee)
+        y[elliptic] = a * np.sqrt(1.0 - ee * ee) * np.sin(big_e)
+
+    if hyperbolic.any():
+        ee = e[hyperbolic]
+        a = q[hyperbolic] / (ee - 1.0)
+        n = GAUSS_K / a ** 1.5
+        m = n * dt[hyperbolic]
+        big_f = np.arcsinh(m / ee)
+        for _ in range(30):
+            f = ee * np.sinh(big_f) - big_f - m
+            big_f = big_f - f / (ee * np.cosh(big_f) - 1.0)
+        x[hyperbolic] = a * (ee - np.cosh(big_f))
+        y[hyperbolic] = a * np.sqrt(ee * ee - 1.0) * np.sinh(big_f)
+
+    if parabolic.any():
+        qq = q[parabolic]
+        w = 1.5 * GAUSS_K * dt[parabolic] / np.sqrt(2.0 * qq ** 3)
+        big_y = np.cbrt(w + np.sqrt(w * w + 1.0))
+        s = big_y - 1.0 / big_y
+        x[parabolic] = qq * (1.0 - s * s)
+        y[parabolic] = 2.0 * qq * s
+
+    return x, y
+
+
+def _parse_mpcorb(path):
+    names, h_mag, g_slope = [], [], []
+    q, e, tp, peri, node, incl = [], [], [], [], [], []
+    with open(path, "r", encoding="ascii", errors="ignore") as handle:
+        for line in handle:
+            if len(line) < 103:
+                continue
+            try:
+                epoch = _unpack_epoch(line[20:25])
+                mean_anomaly = float(line[26:35])
+                ecc = float(line[70:79])
+                motion = float(line[80:91])
+                semi_major = float(line[92:103])
+                w = float(line[37:46])
+                om = float(line[48:57])
+                inc = float(line[59:68])
+            except (ValueError, KeyError, IndexError):
+                continue
+            if motion <= 0.0 or semi_major <= 0.0 or ecc >= 1.0:
+                continue
+
+            try:
+                h_val = float(line[8:13])
+            except ValueError:
+                h_val = np.nan
+            try:
+                g_val = float(line[14:19])
+            except ValueError:
+                g_val = 0.15
+
+            name = line[166:194].strip() if len(line) > 166 else ""
+            names.append(name or line[0:7].strip())
+            h_mag.append(h_val)
+            g_slope.append(g_val)
+            q.append(semi_major * (1.0 - ecc))
+            e.append(ecc)
+            tp.append(epoch - mean_anomaly / motion)
+            peri.append(w)
+            node.append(om)
+            incl.append(inc)
+
+    kind = [KIND_ASTEROID] * len(names)
+    return names, kind, h_mag, g_slope, q, e, tp, peri, node, incl
+
+
+def _parse_comets(path):
+    names, h_mag, k_slope = [], [], []
+    q, e, tp, peri, node, incl = [], [], [], [], [], []
+    with open(path, "r", encoding="ascii", errors="ignore") as handle:
+        for line in handle:
+            if len(line) < 80:
+                continue
+            try:
+                year = int(line[14:18])
+                month = int(line[19:21])
+                day = float(line[22:29])
+                perihelion = float(line[30:39])
+                ecc = float(line[41:49])
+                w = float(line[51:59])
+                om = float(line[61:69])
+                inc = float(line[71:79])
+            except ValueError:
+                continue
+            if perihelion <= 0.0:
+                continue
+
+            try:
+                h_val = float(line[91:95])
+            except ValueError:
+                h_val = np.nan
+            try:
+                k_val = float(line[96:100])
+            except ValueError:
+                k_val = 4.0
+
+            name = line[102:158].strip() or line[0:12].strip()
+            names.append(name)
+            h_mag.append(h_val)
+            k_slope.append(k_val)
+            q.append(perihelion)
+            e.append(ecc)
+            tp.append(_julian_date(year, month, day))
+            peri.append(w)
+            node.append(om)
+            incl.append(inc)
+
+    kind = [KIND_COMET] * len(names)
+    return names, kind, h_mag, k_slope, q, e, tp, peri, node, incl
+
+
+def _name_keys(name):
+    """Lookup keys for a designation: '(1) Ceres' -> '(1) ceres', 'ceres', '1'."""
+    text = name.lower().strip()
+    keys = {text}
+    for token in re.split(r"[\s/()]+", text):
+        if token:
+            keys.add(token)
+    return keys
+
+
+class MinorPlanetCatalog:
+    """Asteroid and comet orbital elements held as columnar arrays.
+
+    Elements come from an MPC ``MPCORB.DAT`` and/or ``CometEls.txt`` file and are
+    cached next to the source as ``.npz`` so later starts skip the text parse.
+    """
+
+    def __init__(self, path=MPCORB_PATH, comet_path=COMET_PATH, cache_path=None, eph=None, clock=None):
+        self.path = path
+        self.comet_path = comet_path
+        self.cache_path = cache_path or os.path.join(DATA_DIR, "minor_planets.npz")
+        self.ts = load.timescale()
+        self.clock = clock or default_clock
+        self._eph = eph
+        self._name_index = None
+        self.ready = False
+        self.load()
+
+    @property
+    def eph(self):
+        if self._eph is None:
+            self._eph = ephemeris()[1]
+        return self._eph
+
+    def __len__(self):
+        return len(self.names) if self.ready else 0
+
+    def _source_stamp(self):
+        stamp = []
+        for path in (self.path, self.comet_path):
+            if path and os.path.exists(path):
+                info = os.stat(path)
+                stamp.extend([info.st_size, int(info.st_mtime)])
+            else:
+                stamp.extend([0, 0])
+        return np.array([CACHE_VERSION] + stamp, dtype=np.int64)
+
+    def load(self):
+        stamp = self._source_stamp()
+        if not stamp[1:].any():
+            return
+
+        if os.path.exists(self.cache_path):
+            try:
+                with np.load(self.cache_path) as cached:
+                    if np.array_equal(cached["stamp"], stamp):
+                        self._adopt({key: cached[key] for key in cached.files})
+                        return
+            except (OSError, KeyError, ValueError) as exc:
+                print(f"Minor planet cache unreadable, rebuilding: {exc}")
+
+        columns = [[] for _ in range(10)]
+        for path, parser in ((self.path, _parse_mpcorb), (self.comet_path, _parse_comets)):
+            if not path or not os.path.exists(path):
+                continue
+            try:
+                parsed = parser(path)
+            except OSError as exc:
+                print(f"Orbital elements load failed for {path}: {exc}")
+                continue
+            for column, values in zip(columns, parsed):
+                column.extend(values)
+
+        names, kind, h_mag, slope, q, e, tp, peri, node, incl = columns
+        if not names:
+            return
+
+        p_vec, q_vec = _orientation_vectors(np.array(peri), np.array(node), np.array(incl))
+        arrays = {
+            "stamp": stamp,
+            "names": np.array([n.encode("ascii", "ignore")[:NAME_WIDTH] for n in names], dtype=f"S{NAME_WIDTH}"),
+            "kind": np.array(kind, dtype=np.int8),
+            "h_mag": np.array(h_mag, dtype=np.float32),
+            "slope": np.array(slope, dtype=np.float32),
+            "q": np.array(q, dtype=np.float64),
+            "e": np.array(e, dtype=np.float64),
+            "tp": np.array(tp, dtype=np.float64),
+            "p_vec": p_vec.astype(np.float32),
+            "q_vec": q_vec.astype(np.float32),
+        }
+        self._adopt(arrays)
+
+        try:
+            np.savez(self.cache_path, **arrays)
+        except OSError as exc:
+            print(f"Could not write minor planet cache: {exc}")
+
+    def _adopt(self, arrays):
+        self.names = arrays["names"]
+        self.kind = arrays["kind"]
+        self.h_mag = arrays["h_mag"].astype(np.float64)
+        self.slope = arrays["slope"].astype(np.float64)
+        self.q = arrays["q"]
+        self.e = arrays["e"]
+        self.tp = arrays["tp"]
+        self.p_vec = arrays["p_vec"].astype(np.float64)
+        self.q_vec = arrays["q_vec"].astype(np.float64)
+        self._name_index = None
+        self.ready = True
+        print(f"Minor planet catalog ready: {len(self.names)} objects")
+
+    def name(self, index):
+        return self.names[index].decode("ascii")
+
+    def find(self, name):
+        """Return the catalog index for a name or number such as 'ceres' or '1P', or None."""
+        if not self.ready:
+            return None
+        if self._name_index is None:
+            index = {}
+            for i, raw in enumerate(self.names):
+                for key in _name_keys(raw.decode("ascii")):
+                    index.setdefault(key, i)
+            self._name_index = index
+        key = name.lower().strip()
+        return self._name_index.get(key)
+
+    def _heliocentric(self, jd, indices):
+        x, y = _solve_orbits(self.q[indices], self.e[indices], self.tp[indices], jd)
+        return self.p_vec[:, indices] * x + self.q_vec[:, indices] * y
+
+    def positions(self, t, indices=None, observer=None):
+        """Light-time corrected positions and magnitudes for the selected objects.
+
+        ``observer`` is a skyfield barycentric position (defaults to the geocenter).
+        Returns a dict of arrays: ``vectors`` (3, N) from the observer in AU (ICRS),
+        astrometric ra_hours/dec_degrees, r_au, delta_au and visual magnitude.
+        """
+        if indices is None:
+            indices = np.arange(len(self.names))
+        indices = np.atleast_1d(indices)
+        if observer is None:
+            observer = self.eph["earth"].at(t)
+
+        sun = self.eph["sun"].at(t).position.au.reshape(3, 1)
+        origin = observer.position.au.reshape(3, 1) - sun
+
+        helio = self._heliocentric(t.tt, indices)
+        delta = np.linalg.norm(helio - origin, axis=0)
+        # One light-time iteration is plenty for solar system distances.
+        helio = self._heliocentric(t.tt - delta / LIGHT_AU_PER_DAY, indices)
+
+        vectors = helio - origin
+        delta = np.linalg.norm(vectors, axis=0)
+        r = np.linalg.norm(helio, axis=0)
+        big_r = np.linalg.norm(origin)
+
+        return {
+            "indices": indices,
+            "vectors": vectors,
+            "ra_hours": (np.degrees(np.arctan2(vectors[1], vectors[0])) / 15.0) % 24.0,
+            "dec_degrees": np.degrees(np.arcsin(vectors[2] / delta)),
+            "r_au": r,
+            "delta_au": delta,
+            "mag": self._magnitudes(indices, r, delta, big_r),
+        }
+
+    def _magnitudes(self, indices, r, delta, big_r):
+        kind = self.kind[indices]
+        h_mag = self.h_mag[indices]
+        slope = self.slope[indices]
+
+        cos_phase = np.clip((r * r + delta * delta - big_r * big_r) / (2.0 * r * delta), -1.0, 1.0)
+        tan_half = np.tan(np.arccos(cos_phase) / 2.0)
+        phi1 = np.exp(-3.33 * tan_half ** 0.63)
+        phi2 = np.exp(-1.87 * tan_half ** 1.22)
+        phase_term = np.maximum((1.0 - slope) * phi1 + slope * phi2, 1e-12)
+
+        asteroid = h_mag + 5.0 * np.log10(r * delta) - 2.5 * np.log10(phase_term)
+        comet = h_mag + 5.0 * np.log10(delta) + 2.5 * slope * np.log10(r)
+        return np.where(kind == KIND_COMET, comet, asteroid)
+
+    def altaz(self, latitude, longitude, t=None, indices=None):
+        """Topocentric (az_deg, alt_deg, mag, indices) arrays for the selected objects."""
+        if t is None:
+            t = self.clock.time(self.ts)
+        here = site(latitude, longitude, self.eph)
+        topos = here.topos
+        observer = here.at(t)
+        pos = self.positions(t, indices, observer)
+
+        # Annual + diurnal aberration to first order, then rotate into the horizon frame.
+        direction = pos["vectors"] / pos["delta_au"]
+        direction = direction + observer.velocity.au_per_d.reshape(3, 1) / LIGHT_AU_PER_DAY
+        local = topos.rotation_at(t) @ direction
+        alt = np.degrees(np.arctan2(local[2], np.hypot(local[0], local[1])))
+        az = np.degrees(np.arctan2(local[1], local[0])) % 360.0
+        return az, alt, pos["mag"], pos["indices"]
+
+    def locate(self, name, latitude, longitude, t=None):
+        """Return (azimuth, elevation, magnitude) for one named object, or None."""
+        index = self.find(name)
+        if index is None:
+            return None
+        az, alt, mag, _ = self.altaz(latitude, longitude, t, indices=[index])
+        return float(az[0]), float(alt[0]), float(mag[0])
+
+    def visible(self, latitude, longitude, t=None, mag_limit=12.0, min_altitude=0.0, kind=None):
+        """List (name, az, alt, mag) for objects brighter than ``mag_limit`` above ``min_altitude``."""
+        if not self.ready:
+            return []
+        if t is None:
+            t = self.clock.time(self.ts)
+        indices = np.arange(len(self.names))
+        if kind is not None:
+            indices = indices[self.kind == kind]
+
+        # Cheap geocentric magnitude cut first so only candidates get a topocentric pass.
+        pos = self.positions(t, indices)
+        bright = pos["mag"] <= mag_limit
+        if not bright.any():
+            return []
+
+        az, alt, mag, picked = self.altaz(latitude, longitude, t, indices=pos["indices"][bright])
+        above = alt > min_altitude
+        order = np.argsort(mag[above])
+        return [
+            (self.name(i), float(a), float(h), float(m))
+            for i, a, h, m in zip(picked[above][order], az[above][order], alt[above][order], mag[above][order])
+        ]
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="List bright minor planets above the horizon.")
+    parser.add_argument("--lat", type=float, default=0.0)
+    parser.add_argument("--lon", type=float, default=0.0)
+    parser.add_argument("--mag", type=float, default=12.0, help="faintest magnitude to list")
+    parser.add_argument("--name", help="locate a single object instead of listing")
+    args = parser.parse_args()
+
+    catalog = MinorPlanetCatalog()
+    if not catalog.ready:
+        print(f"No orbital elements found (expected {MPCORB_PATH} or {COMET_PATH})")
+    elif args.name:
+        located = catalog.locate(args.name, args.lat, args.lon)
+        if located is None:
+            print(f"Object '{args.name}' not found")
+        else:
+            print(f"{args.name}: Az={located[0]:.2f}°, El={located[1]:.2f}°, mag {located[2]:.1f}")
+    else:
+        for name, az, alt, mag in catalog.visible(args.lat, args.lon, mag_limit=args.mag):
+            print(f"{name:<30} Az={az:7.2f}°  El={alt:6.2f}°  mag {mag:5.1f}")
@@ -0,0 +1,230 @@
+import datetime
+import math
+import threading
+import time
+import numpy as np
+from skyfield.api import load
+
+from .clock import default_clock
+from .site import site
+
+
+SIDEREAL_DEG_PER_S = 360.0 / 86164.0905
+SIDEREAL_HOURS_PER_S = SIDEREAL_DEG_PER_S / 15.0
+C_AU_PER_DAY = 173.1446326846693
+
+# LX200 :RG# :RC# :RM# :RS# rates in degrees per second.
+MOVE_RATES = {
+    "G": 0.5 * SIDEREAL_DEG_PER_S,      # guide
+    "C": 8.0 * SIDEREAL_DEG_PER_S,      # centering
+    "M": 0.5,                           # find
+    "S": 3.0,                           # slew
+}
+
+# Unit steps (d_az, d_alt) for LX200 directions on an alt-az mount.
+DIRECTIONS = {"n": (0, 1), "s": (0, -1), "e": (1, 0), "w": (-1, 0)}
+
+
+class MountSystem:
+    """Alt-az mount pointing.
+
+    Every change to azimuth or elevation bumps ``version``, which lets derived
+    values (RA/Dec for the bridge, telemetry) be cached until the mount moves.
+    ``on_change(azimuth, elevation)``, if set, is called after every change on
+    the thread that made it (the session recorder uses it).
+    """
+
+    def __init__(self, azimuth=0, elevation=5, length=5):
+        self._lock = threading.Lock()
+        self._azimuth = azimuth
+        self._elevation = elevation
+        self._version = 0
+        self.length = length
+        self.on_change = None
+
+    @property
+    def azimuth(self):
+        return self._azimuth
+
+    @azimuth.setter
+    def azimuth(self, value):
+        with self._lock:
+            self._azimuth = value
+            self._version += 1
+        if self.on_change is not None:
+            self.on_change(self._azimuth, self._elevation)
+
+    @property
+    def elevation(self):
+        return self._elevation
+
+    @elevation.setter
+    def elevation(self, value):
+        with self._lock:
+            self._elevation = value
+            self._version += 1
+        if self.on_change is not None:
+            self.on_change(self._azimuth, self._elevation)
+
+    @property
+    def version(self):
+        return self._version
+
+    def set_position(self, azimuth, elevation):
+        """Move both axes as one change (a single version bump)."""
+        with self._lock:
+            self._azimuth = azimuth
+            self._elevation = elevation
+            self._version += 1
+        if self.on_change is not None:
+            self.on_change(azimuth, elevation)
+
+    def snapshot(self):
+        """Consistent (version, azimuth, elevation) for readers on other threads."""
+        with self._lock:
+            return self._version, self._azimuth, self._elevation
+
+    def get_orientation_vector(self):
+        alt_rad = np.radians(self.elevation)
+        az_rad = np.radians(self.azimuth)
+        dx = self.length * np.cos(alt_rad) * np.cos(az_rad)
+        dy = self.length * np.cos(alt_rad) * np.sin(az_rad)
+        dz = self.length * np.sin(alt_rad)
+        return dx, dy, dz
+
+
+class MountDriver:
+    """Guide pulses and manual moves applied straight to a ``MountSystem``.
+
+    Calls come from the bridge thread and change the mount immediately, without
+    a round trip through the GUI event loop. Pulses apply their whole offset
+    (rate x duration) at once; continuous moves run until stopped and are
+    integrated whenever ``advance`` is called.
+    """
+
+    def __init__(self, mount, guide_rate=MOVE_RATES["G"], move_rate=MOVE_RATES["M"]):
+        self.mount = mount
+        self.guide_rate = guide_rate
+        self.move_rate = move_rate
+        self.pulse_until = 0.0
+        self._moving = set()
+        self._last_advance = None
+        self._lock = threading.Lock()
+
+    @property
+    def moving(self):
+        return bool(self._moving)
+
+    @property
+    def is_pulse_guiding(self):
+        return time.monotonic() < self.pulse_until
+
+    def set_rate(self, letter):
+        rate = MOVE_RATES.get(letter)
+        if rate is not None:
+            self.move_rate = rate
+
+    def pulse_guide(self, direction, duration_ms):
+        if direction not in DIRECTIONS or duration_ms <= 0:
+            return False
+        with self._lock:
+            self._nudge(direction, self.guide_rate * duration_ms / 1000.0)
+            self.pulse_until = max(self.pulse_until, time.monotonic() + duration_ms / 1000.0)
+        return True
+
+    def start_move(self, direction):
+        if direction not in DIRECTIONS:
+            return False
+        self.advance()
+        with self._lock:
+            self._moving.add(direction)
+            if self._last_advance is None:
+                self._last_advance = time.monotonic()
+        return True
+
+    def stop(self, direction=None):
+        self.advance()
+        with self._lock:
+            if direction is None:
+                self._moving.clear()
+            else:
+                self._moving.discard(direction)
+            if not self._moving:
+                self._last_advance = None
+
+    def advance(self):
+        """Integrate continuous moves up to now."""
+        with self._lock:
+            if not self._moving or self._last_advance is None:
+                return
+            now = time.monotonic()
+            degrees = self.move_rate * (now - self._last_advance)
+            self._last_advance = now
+            for direction in self._moving:
+                self._nudge(direction, degrees)
+
+    def sync(self, azimuth, elevation):
+        with self._lock:
+            self.mount.set_position(azimuth % 360.0, max(0.0, min(90.0, elevation)))
+
+    def _nudge(self, direction, degrees):
+        d_az, d_alt = DIRECTIONS[direction]
+        _, azimuth, elevation = self.mount.snapshot()
+        if d_az:
+            # Keep the on-sky step size constant: azimuth steps widen towards the zenith.
+            cos_alt = max(math.cos(math.radians(elevation)), 0.01)
+            azimuth = (azimuth + d_az * degrees / cos_alt) % 360.0
+        if d_alt:
+            elevation = max(0.0, min(90.0, elevation + d_alt * degrees))
+        self.mount.set_position(azimuth, elevation)
+
+
+class PositionCache:
+    """RA/Dec of the mount's pointing, computed once per mount state and time quantum.
+
+    RA/Dec are astrometric ICRS (J2000), the frame ``goto_radec`` takes, so a
+    goto read back through :GR#/:GD# returns the coordinates sent. A fixed
+    alt/az drifts in RA with the sky: entries expire every ``quantum_s``
+    seconds of simulated time (see ``clock``), and in between the cached RA
+    is advanced at the sidereal rate. Any number of callers (LX200 :GR#/:GD#,
+    native packets for every client) within one tick share a single transform.
+    """
+
+    def __init__(self, mount, ts=None, quantum_s=0.25, clock=None):
+        self.mount = mount
+        self.ts = ts or load.timescale()
+        self.clock = clock or default_clock
+        self.quantum_s = quantum_s
+        self._lock = threading.Lock()
+        self._key = None
+        self._value = None
+        self.hits = 0
+        self.misses = 0
+
+    def radec(self, lat, lon):
+        """Return (ra_hours, dec_degrees) for the current mount pointing seen from lat/lon."""
+        version, azimuth, elevation = self.mount.snapshot()
+        now = self.clock.now()
+        tick = int(now // self.quantum_s) if self.quantum_s > 0 else now
+        key = (version, lat, lon, tick)
+        with self._lock:
+            if key == self._key:
+                self.hits += 1
+            else:
+                self.misses += 1
+                self._key = key
+                self._value = (now,) + self._astrometric(lat, lon, azimuth, elevation, now)
+            then, ra_hours, dec_degrees = self._value
+        return (ra_hours + (now - then) * SIDEREAL_HOURS_PER_S) % 24.0, dec_degrees
+
+    def _astrometric(self, lat, lon, azimuth, elevation, now):
+        t = self.ts.from_datetime(datetime.datetime.fromtimestamp(now, datetime.timezone.utc))
+        place = site(lat, lon)
+        apparent = place.topos.at(t).from_altaz(alt_degrees=elevation, az_degrees=azimuth).position.au
+        # from_altaz gives the apparent direction; take out annual and diurnal
+        # aberration (first order, under a milliarcsecond off) to get the astrometric one.
+        u = apparent / np.linalg.norm(apparent)
+        beta = place.at(t).velocity.au_per_d / C_AU_PER_DAY
+        u = u - beta + np.dot(u, beta) * u
+        x, y, z = u / np.linalg.norm(u)
+        return math.degrees(math.atan2(y, x)) / 15.0 % 24.0, math.degrees(math.asin(z))
@@ -0,0 +1,210 @@
+from collections import namedtuple
+import numpy as np
+from skyfield.api import load
+from skyfield.nutationlib import iau2000b_radians
+
+from .catalog import SkyCatalog, HYG_URL, HYG_PATH
+from .clock import default_clock
+from .site import ephemeris, site
+
+
+MOON_RADIUS_KM = 1737.4
+AU_KM = 149597870.7
+
+Occultation = namedtuple(
+    "Occultation",
+    ["star_index", "name", "mag", "disappear", "reappear", "min_separation_deg", "moon_alt"],
+)
+
+
+class OccultationPredictor:
+    """Find catalog stars hidden by the Moon as seen from one site.
+
+    The Moon's topocentric path is sampled on a coarse grid and every sample is
+    used as a cone query against the catalog KD-tree, so only stars near the
+    path are ever examined. Candidate windows are then resampled at one-minute
+    resolution and the limb crossings refined with a final secant pass.
+    """
+
+    def __init__(self, catalog, eph=None, ts=None, clock=None):
+        self.catalog = catalog
+        self.eph = eph or ephemeris()[1]
+        self.ts = ts or load.timescale()
+        self.clock = clock or default_clock
+        self.moon = self.eph["moon"]
+        self.earth = self.eph["earth"]
+
+    def _moon_track(self, observer, jd):
+        """Unit vectors (T, 3), semidiameters (deg) and altitudes for the topocentric Moon."""
+        t = self.ts.tt_jd(jd)
+        # The truncated IAU 2000B series is ~1 mas and several times cheaper than 2000A.
+        t._nutation_angles_radians = iau2000b_radians(t)
+        astrometric = observer.at(t).observe(self.moon)
+        position = astrometric.position.au
+        distance = np.linalg.norm(position, axis=0)
+        unit = (position / distance).T
+        semidiameter = np.degrees(np.arcsin(MOON_RADIUS_KM / (distance * AU_KM)))
+        alt, _, _ = astrometric.apparent().altaz()
+        return unit, semidiameter, alt.degrees
+
+    def predict(self, latitude, longitude, start=None, days=30.0, step_minutes=10.0,
+                mag_limit=None, min_moon_alt=0.0, elevation_m=0.0):
+        """Return occultations between ``start`` (skyfield Time, default now) and ``start + days``."""
+        if not self.catalog.ready:
+            return []
+        if start is None:
+            start = self.clock.time(self.ts)
+        observer = site(latitude, longitude, self.eph, elevation_m).observer
+
+        step = step_minutes / 1440.0
+        grid = start.tt + np.arange(0.0, days + step, step)
+        moon_unit, moon_sd, _ = self._moon_track(observer, grid)
+
+        # Stars are compared at the middle of the range; the index holds J2000
+        # positions, so widen the cone by the largest proper-motion offset.
+        star_vectors = self.catalog.unit_vectors(start.tt + days / 2.0)
+        drift = np.degrees(np.arccos(np.clip(np.sum(star_vectors * self.catalog.unit_vectors(), axis=1), -1.0, 1.0)))
+
+        # Any star the limb crosses lies within half a step of some grid sample.
+        motion = np.degrees(np.arccos(np.clip(np.sum(moon_unit[1:] * moon_unit[:-1], axis=1), -1.0, 1.0)))
+        radius = float(moon_sd.max() + 0.5 * motion.max() + drift.max() + 0.01)
+        hits = self.catalog.query_vectors(moon_unit, radius)
+
+        mags = self.catalog.mag
+        # Contiguous runs of grid samples per star; a star can be passed again a month later.
+        windows = []
+        open_window = {}
+        for k, candidates in enumerate(hits):
+            for star in candidates:
+                if mag_limit is not None and mags[star] > mag_limit:
+                    continue
+                current = open_window.get(star)
+                if current is not None and k - windows[current][2] <= 1:
+                    windows[current][2] = k
+                else:
+                    open_window[star] = len(windows)
+                    windows.append([star, k, k])
+        if not windows:
+            return []
+
+        # Resample every candidate window at one-minute resolution in one skyfield call.
+        fine_step = 1.0 / 1440.0
+        segments = []
+        for star, lo, hi in windows:
+            t0 = grid[max(lo - 1, 0)]
+            t1 = grid[min(hi + 1, len(grid) - 1)]
+            segments.append((star, np.arange(t0, t1 + fine_step, fine_step)))
+        fine_jd = np.concatenate([times for _, times in segments])
+        fine_unit, fine_sd, fine_alt = self._moon_track(observer, fine_jd)
+
+        events = []
+        offset = 0
+        for star, times in segments:
+            count = len(times)
+            unit = fine_unit[offset:offset + count]
+            sd = fine_sd[offset:offset + count]
+            alt = fine_alt[offset:offset + count]
+            offset += count
+
+            separation = np.degrees(np.arccos(np.clip(unit @ star_vectors[star], -1.0, 1.0)))
+            inside = separation < sd
+            if not inside.any():
+                continue
+
+            edges = np.diff(inside.astype(np.int8))
+            ins = list(np.nonzero(edges == 1)[0])
+            outs = list(np.nonzero(edges == -1)[0])
+            if inside[0]:
+                ins.insert(0, None)
+            if inside[-1]:
+                outs.append(None)
+
+            for i_in, i_out in zip(ins, outs):
+                lo = 0 if i_in is None else i_in
+                hi = count - 1 if i_out is None else i_out + 1
+                deepest = lo + int(np.argmin(separation[lo:hi + 1] - sd[lo:hi + 1]))
+                events.append({
+                    "star": star,
+                    "in": None if i_in is None else self._interpolate(times, separation - sd, i_in),
+                    "out": None if i_out is None else self._interpolate(times, separation - sd, i_out),
+                    "min_sep": float(separation[deepest]),
+                    "alt": float(alt[deepest]),
+                })
+
+        self._refine(observer, star_vectors, events)
+
+        results = []
+        for event in events:
+            if event["alt"] < min_moon_alt:
+                continue
+            name = self.catalog.names[event["star"]]
+            results.append(Occultation(
+                star_index=event["star"],
+                name=name or f"HYG {event['star']}",
+                mag=float(mags[event["star"]]),
+                disappear=None if event["in"] is None else self.ts.tt_jd(event["in"]),
+                reappear=None if event["out"] is None else self.ts.tt_jd(event["out"]),
+                min_separation_deg=event["min_sep"],
+                moon_alt=event["alt"],
+            ))
+        results.sort(key=lambda o: (o.disappear if o.disappear is not None else o.reappear).tt)
+        return results
+
+    @staticmethod
+    def _interpolate(times, f, i):
+        """Linear root of ``f`` between samples i and i + 1."""
+        f0, f1 = f[i], f[i + 1]
+        if f1 == f0:
+            return float(times[i])
+        return float(times[i] + (times[i + 1] - times[i]) * f0 / (f0 - f1))
+
+    def _refine(self, observer, star_vectors, events):
+        """One batched secant step on every limb crossing, seeded 30 s either side of the guess."""
+        guesses = []
+        for event in events:
+            for key in ("in", "out"):
+                if event[key] is not None:
+                    guesses.append((event, key, event[key]))
+        if not guesses:
+            return
+
+        delta = 30.0 / 86400.0
+        jd = np.array([g[2] for g in guesses])
+        unit, sd, _ = self._moon_track(observer, np.concatenate([jd - delta, jd + delta]))
+        n = len(guesses)
+        stars = star_vectors[[g[0]["star"] for g in guesses]]
+        separation = np.degrees(np.arccos(np.clip(np.sum(unit * np.vstack([stars, stars]), axis=1), -1.0, 1.0)))
+        f = separation - sd
+        f0, f1 = f[:n], f[n:]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            refined = (jd - delta) + 2.0 * delta * f0 / (f0 - f1)
+        usable = np.isfinite(refined) & (np.abs(refined - jd) < 2.0 * delta)
+        for (event, key, _), value, ok in zip(guesses, refined, usable):
+            if ok:
+                event[key] = float(value)
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Predict lunar occultations of catalog stars.")
+    parser.add_argument("--lat", type=float, default=0.0)
+    parser.add_argument("--lon", type=float, default=0.0)
+    parser.add_argument("--days", type=float, default=30.0)
+    parser.add_argument("--mag", type=float, default=None, help="faintest star magnitude to include")
+    args = parser.parse_args()
+
+    catalog = SkyCatalog(HYG_URL, HYG_PATH, max_stars=None, allow_download=False)
+    if not catalog.ready:
+        print(f"Star catalog not available at {HYG_PATH}")
+    else:
+        started = time.perf_counter()
+        predictor = OccultationPredictor(catalog)
+        found = predictor.predict(args.lat, args.lon, days=args.days, mag_limit=args.mag)
+        elapsed = time.perf_counter() - started
+        for occ in found:
+            when_in = occ.disappear.utc_strftime("%Y-%m-%d %H:%M:%S") if occ.disappear is not None else "(in progress)"
+            when_out = occ.reappear.utc_strftime("%H:%M:%S") if occ.reappear is not None else "(after range)"
+            print(f"{when_in} -> {when_out} UTC  {occ.name:<20} mag {occ.mag:5.2f}  Moon alt {occ.moon_alt:5.1f}°")
+        print(f"{len(found)} occultations over {args.days:g} days in {elapsed:.2f}s")
@@ -0,0 +1,463 @@
+import bisect
+import os
+import queue
+import struct
+import threading
+import time
+
+import numpy as np
+
+from .clock import default_clock
+from .log import get_logger, logs
+
+
+SESSION_MAGIC = b"NTSESS01"
+SESSION_VERSION = 1
+CHUNK_MAGIC = b"CHNK"
+CHUNK_RECORDS = 4096            # records per chunk written to disk
+FLUSH_S = 1.0                   # a partial chunk is written after this long
+REPLAY_TICK_S = 0.02            # how often a replay hands due records to the core
+NO_TEXT = 0xFFFFFFFF
+
+# Record kinds. LOCATION records carry latitude/longitude in the azimuth and
+# elevation fields; CLOCK records carry the clock rate in azimuth.
+MOUNT = 1
+TARGET = 2
+COMMAND = 3
+LOCATION = 4
+CLOCK = 5
+KIND_NAMES = {MOUNT: "mount", TARGET: "target", COMMAND: "command", LOCATION: "location", CLOCK: "clock"}
+
+FLAG_ANIMATING = 0x01
+FLAG_TRACKING = 0x02
+FLAG_SATELLITE = 0x04
+FLAG_OK = 0x08                  # command succeeded
+FLAG_PAUSED = 0x10              # simulation clock paused
+
+log = get_logger("recorder")
+
+# 40-byte fixed-width record; times are unix seconds (wall clock and simulation clock).
+RECORD = np.dtype([
+    ("time", "<f8"),
+    ("sky_time", "<f8"),
+    ("azimuth", "<f4"),
+    ("elevation", "<f4"),
+    ("target_az", "<f4"),
+    ("target_el", "<f4"),
+    ("text", "<u4"),
+    ("kind", "u1"),
+    ("flags", "u1"),
+    ("reserved", "<u2"),
+])
+
+# magic, version, record size, created (unix time)
+FILE_HEADER = struct.Struct("<8sHHd")
+# magic, record count, string table bytes, first and last record time
+CHUNK_HEADER = struct.Struct("<4sIIdd")
+STRING_LENGTH = struct.Struct("<H")
+
+
+class SessionRecorder:
+    """Append mount, target, command, location and clock events to a session log.
+
+    ``record`` only appends a tuple to an in-memory list, so it is cheap enough
+    for every mount update even at kHz rates. Full chunks (and partial ones
+    every ``flush_s``) are packed into fixed-width ``RECORD`` arrays and written
+    by a background thread, one ``CHUNK_HEADER`` + records + strings block at a
+    time. Command text lives in a per-chunk string table.
+    """
+
+    def __init__(self, path, clock=None, chunk_records=CHUNK_RECORDS, flush_s=FLUSH_S):
+        self.path = path
+        self.clock = clock or default_clock
+        self.chunk_records = chunk_records
+        self.flush_s = flush_s
+        self.core = None
+        self.recorded = 0
+        self.written_bytes = 0
+        self._lock = threading.Lock()
+        self._records = []
+        self._strings = []
+        self._queue = queue.SimpleQueue()
+        self._file = None
+        self._thread = None
+
+    def start(self, core=None):
+        """Open the log, start the writer and (with ``core``) hook into its mount and listeners."""
+        if self._thread is not None:
+            return
+        self._file = open(self.path, "wb")
+        self._file.write(FILE_HEADER.pack(SESSION_MAGIC, SESSION_VERSION, RECORD.itemsize, time.time()))
+        self.written_bytes = FILE_HEADER.size
+        self._thread = threading.Thread(target=self._run, name="session-recorder", daemon=True)
+        self._thread.start()
+        if core is not None:
+            self.attach(core)
+        log.info("Recording session to %s", self.path)
+
+    def stop(self):
+        self.detach()
+        if self._thread is None:
+            return
+        with self._lock:
+            self._queue.put(self._swap())
+        self._queue.put(None)
+        self._thread.join()
+        self._thread = None
+        self._file.close()
+        self._file = None
+        log.info("Session recorded: %d events, %d bytes in %s", self.recorded, self.written_bytes, self.path)
+
+    def attach(self, core):
+        self.core = core
+        core.mount.on_change = self.mount_moved
+        core.state.subscribe(self.changed, ("target", "location", "clock"))
+        self.changed({"location", "clock"})
+        self.mount_moved(core.mount.azimuth, core.mount.elevation)
+
+    def detach(self):
+        core, self.core = self.core, None
+        if core is None:
+            return
+        if core.mount.on_change == self.mount_moved:
+            core.mount.on_change = None
+        core.state.unsubscribe(self.changed)
+
+    def record(self, kind, azimuth, elevation, target_az=0.0, target_el=0.0, flags=0, text=None):
+        sky_time = self.clock.now()
+        with self._lock:
+            index = NO_TEXT
+            if text is not None:
+                index = len(self._strings)
+                self._strings.append(text)
+            self._records.append((time.time(), sky_time, azimuth, elevation, target_az, target_el, index, kind, flags, 0))
+            self.recorded += 1
+            if len(self._records) >= self.chunk_records:
+                self._queue.put(self._swap())
+
+    # Hooks
+
+    def mount_moved(self, azimuth, elevation):
+        core = self.core
+        if core is not None:
+            self.record(MOUNT, azimuth, elevation, core.target_az, core.target_el, self._flags(core))
+
+    def changed(self, topics):
+        core = self.core
+        if core is None:
+            return
+        if "target" in topics:
+            self.record(TARGET, core.mount.azimuth, core.mount.elevation, core.target_az, core.target_el, self._flags(core))
+        if "location" in topics:
+            self.record(LOCATION, core.device_lat, core.device_lon)
+        if "clock" in topics:
+            self.record(CLOCK, core.clock.rate, 0.0, flags=FLAG_PAUSED if core.clock.paused else 0)
+
+    def command(self, text, ok):
+        core = self.core
+        if core is not None:
+            flags = self._flags(core) | (FLAG_OK if ok else 0)
+            self.record(COMMAND, core.mount.azimuth, core.mount.elevation, core.target_az, core.target_el, flags, text)
+
+    @staticmethod
+    def _flags(core):
+        return (
+            (FLAG_ANIMATING if core.animating else 0)
+            | (FLAG_TRACKING if core.sidereal_tracking else 0)
+            | (FLAG_SATELLITE if core.tracked_satellite is not None else 0)
+        )
+
+    # Writer
+
+    def _swap(self):
+        chunk = (self._records, self._strings)
+        self._records, self._strings = [], []
+        return chunk
+
+    def _run(self):
+        while True:
+            try:
+                chunk = self._queue.get(timeout=self.flush_s)
+            except queue.Empty:
+                with self._lock:
+                    chunk = self._swap()
+            if chunk is None:
+                return
+            try:
+                self._write_chunk(*chunk)
+            except (OSError, ValueError) as exc:
+                log.error("Session recording failed: %s", exc)
+
+    def _write_chunk(self, records, strings):
+        if not records:
+            return
+        array = np.array(records, dtype=RECORD)
+        blob = b"".join(STRING_LENGTH.pack(len(data)) + data for data in (text.encode("utf-8")[:65535] for text in strings))
+        header = CHUNK_HEADER.pack(CHUNK_MAGIC, len(array), len(blob), array["time"][0], array["time"][-1])
+        self._file.write(header + array.tobytes() + blob)
+        self._file.flush()
+        self.written_bytes += CHUNK_HEADER.size + array.nbytes + len(blob)
+
+
+class SessionLog:
+    """Read access to a recorded session.
+
+    Opening only walks the chunk headers, building an index of (first time,
+    last time, offset) per chunk; records are read a chunk at a time, so
+    seeking to any moment of a long session costs one binary search and one
+    read. A chunk cut short by a crash is ignored.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.created = None
+        self.chunks = []
+        size = os.path.getsize(path)
+        with open(path, "rb") as handle:
+            raw = handle.read(FILE_HEADER.size)
+            if len(raw) < FILE_HEADER.size:
+                raise ValueError(f"{path} is not a session log")
+            magic, version, record_size, self.created = FILE_HEADER.unpack(raw)
+            if magic != SESSION_MAGIC or record_size != RECORD.itemsize:
+                raise ValueError(f"{path} is not a version {SESSION_VERSION} session log")
+            while True:
+                raw = handle.read(CHUNK_HEADER.size)
+                if len(raw) < CHUNK_HEADER.size:
+                    break
+                magic, count, strings_bytes, first, last = CHUNK_HEADER.unpack(raw)
+                offset = handle.tell()
+                end = offset + count * RECORD.itemsize + strings_bytes
+                if magic != CHUNK_MAGIC or end > size:
+                    break
+                self.chunks.append((first, last, offset, count, strings_bytes))
+                handle.seek(end)
+        self._firsts = [chunk[0] for chunk in self.chunks]
+
+    def __len__(self):
+        return sum(chunk[3] for chunk in self.chunks)
+
+    @property
+    def start(self):
+        return self.chunks[0][0] if self.chunks else None
+
+    @property
+    def end(self):
+        return self.chunks[-1][1] if self.chunks else None
+
+    def read_chunk(self, index, handle=None):
+        """(records, texts) of one chunk; ``records["text"]`` indexes ``texts``."""
+        _, _, offset, count, strings_bytes = self.chunks[index]
+        if handle is None:
+            with open(self.path, "rb") as handle:
+                return self.read_chunk(index, handle)
+        handle.seek(offset)
+        records = np.frombuffer(handle.read(count * RECORD.itemsize), dtype=RECORD)
+        blob = handle.read(strings_bytes)
+        texts = []
+        position = 0
+        while position < len(blob):
+            (length,) = STRING_LENGTH.unpack_from(blob, position)
+            position += STRING_LENGTH.size
+            texts.append(blob[position:position + length].decode("utf-8", "replace"))
+            position += length
+        return records, texts
+
+    def chunk_index(self, when):
+        """Index of the chunk holding time ``when`` (clamped to the session)."""
+        return max(0, bisect.bisect_right(self._firsts, when) - 1)
+
+    def iter_chunks(self, start=None):
+        """Yield (records, texts) from time ``start`` (default: the beginning) to the end."""
+        if not self.chunks:
+            return
+        first = 0 if start is None else self.chunk_index(start)
+        with open(self.path, "rb") as handle:
+            for index in range(first, len(self.chunks)):
+                records, texts = self.read_chunk(index, handle)
+                if start is not None and index == first:
+                    records = records[np.searchsorted(records["time"], start):]
+                yield records, texts
+
+    def read(self, start=None, end=None):
+        """All records between ``start`` and ``end`` as one array, plus the texts they refer to."""
+        parts = []
+        texts = []
+        for records, chunk_texts in self.iter_chunks(start):
+            if end is not None:
+                records = records[:np.searchsorted(records["time"], end, side="right")]
+            if len(records):
+                records = records.copy()
+                has_text = records["text"] != NO_TEXT
+                records["text"][has_text] += len(texts)
+                parts.append(records)
+            texts.extend(chunk_texts)
+            if end is not None and (not len(records) or records["time"][-1] >= end):
+                break
+        return (np.concatenate(parts) if parts else np.zeros(0, dtype=RECORD)), texts
+
+
+class SessionPlayer:
+    """Drive a ``TelescopeCore`` (headless or behind the GUI) through a recorded session.
+
+    Records due at ``speed`` times the recorded pace are handed to the core in
+    batches through its ``dispatch``; within a batch only the last mount state
+    is applied, so replays at any speed cost one update per ``REPLAY_TICK_S``.
+    ``speed=0`` replays as fast as possible. ``seek`` jumps to any time of the
+    session through the chunk index while playing.
+    """
+
+    def __init__(self, log, core, speed=1.0, start=None, on_finished=None):
+        self.log = log
+        self.core = core
+        self.speed = speed
+        self.position = log.start if start is None else start
+        self.on_finished = on_finished
+        self.applied = 0
+        self._seek = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is not None or not self.log.chunks:
+            return
+        self._thread = threading.Thread(target=self._run, name="session-replay", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout=1.0)
+        self._thread = None
+
+    def seek(self, when):
+        """Continue playing from session time ``when`` (unix seconds)."""
+        self._seek = when
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def _run(self):
+        position = self.position
+        while not self._play_from(position):
+            position, self._seek = self._seek, None
+        if not self._stop.is_set():
+            log.info("Replay finished: %d events from %s", self.applied, self.log.path)
+            if self.on_finished is not None:
+                self.on_finished()
+
+    def _play_from(self, position):
+        """Play until the end (True), a stop (True) or a seek (False)."""
+        origin = time.monotonic()
+        for records, texts in self.log.iter_chunks(position):
+            times = records["time"]
+            i = 0
+            while i < len(records):
+                if self._stop.is_set():
+                    return True
+                if self._seek is not None:
+                    return False
+                if self.speed > 0:
+                    due = position + (time.monotonic() - origin) * self.speed
+                    j = int(np.searchsorted(times, due, side="right"))
+                    if j == i:
+                        self._stop.wait(min(REPLAY_TICK_S, (times[i] - due) / self.speed))
+                        continue
+                else:
+                    j = len(records)
+                batch = records[i:j]
+                self.core.dispatch(lambda batch=batch, texts=texts: self._apply(batch, texts))
+                self.applied += len(batch)
+                self.position = float(times[j - 1])
+                i = j
+        return True
+
+    def _apply(self, batch, texts):
+        core = self.core
+        for record in batch[batch["kind"] != MOUNT]:
+            kind = record["kind"]
+            if kind == LOCATION:
+                core.set_location(float(record["azimuth"]), float(record["elevation"]))
+            elif kind == CLOCK:
+                core.clock.set_rate(float(record["azimuth"]))
+                if record["flags"] & FLAG_PAUSED:
+                    core.clock.pause()
+                else:
+                    core.clock.resume()
+                core.seek_time(float(record["sky_time"]))
+            elif kind == COMMAND and record["text"] != NO_TEXT:
+                status = "ok" if record["flags"] & FLAG_OK else "failed"
+                log.info("Replay command (%s): %s", status, texts[record["text"]])
+
+        last = batch[-1]
+        core.animating = False
+        if not core.clock.paused:
+            core.clock.seek(float(last["sky_time"]))
+        target = (float(last["target_az"]), float(last["target_el"]))
+        if target != (core.target_az, core.target_el):
+            core.set_orientation(*target)
+        core.mount.set_position(float(last["azimuth"]), float(last["elevation"]))
+
+
+def describe(log):
+    """Summary lines for ``python -m core.recorder info``."""
+    if not log.chunks:
+        return [f"{log.path}: empty session"]
+    counts = {}
+    commands = []
+    for records, texts in log.iter_chunks():
+        kinds, numbers = np.unique(records["kind"], return_counts=True)
+        for kind, number in zip(kinds, numbers):
+            counts[int(kind)] = counts.get(int(kind), 0) + int(number)
+        commands.extend(texts)
+    size = os.path.getsize(log.path)
+    lines = [
+        f"{log.path}: {len(log)} events in {len(log.chunks)} chunks, {size} bytes "
+        f"({size / max(len(log), 1):.1f} bytes/event)",
+        f"  recorded {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(log.start))}, "
+        f"{log.end - log.start:.1f} s long",
+        "  " + ", ".join(f"{KIND_NAMES.get(kind, kind)}: {number}" for kind, number in sorted(counts.items())),
+    ]
+    lines.extend(f"  command: {text}" for text in commands)
+    return lines
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Inspect or replay a recorded telescope session.")
+    parser.add_argument("action", choices=["info", "replay"])
+    parser.add_argument("path", help="session log written with --record")
+    parser.add_argument("--speed", type=float, default=1.0, help="replay speed (0 = as fast as possible)")
+    parser.add_argument("--start", type=float, default=0.0, help="seconds into the session to start from")
+    parser.add_argument("--no-servers", action="store_true", help="replay without the bridge, telemetry and Alpaca")
+    args = parser.parse_args()
+
+    session = SessionLog(args.path)
+    if args.action == "info":
+        for line in describe(session):
+            print(line)
+        return
+
+    from .engine import TelescopeCore
+
+    core = TelescopeCore(announce=print)
+    stop = threading.Event()
+    player = SessionPlayer(session, core, speed=args.speed, start=session.start + args.start, on_finished=stop.set)
+    if not args.no_servers:
+        core.start_services()
+    player.start()
+    try:
+        core.run(stop)
+        core.process_pending()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        player.stop()
+        core.stop_services()
+    logs.flush()
+    print(f"Mount at Az {core.mount.azimuth:.3f}°, El {core.mount.elevation:.3f}°")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,305 @@
+import functools
+import os
+import time
+from collections import namedtuple
+import numpy as np
+from sgp4.api import Satrec, SatrecArray
+
+from .clock import default_clock
+
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+TLE_PATH = os.path.join(DATA_DIR, "satellites.tle")
+
+WGS84_A_KM = 6378.137
+WGS84_F = 1.0 / 298.257223563
+UNIX_EPOCH_JD = 2440587.5
+
+SatellitePass = namedtuple(
+    "SatellitePass",
+    ["name", "rise_time", "rise_az", "culmination_time", "max_alt", "set_time", "set_az"],
+)
+
+
+def _split_jd(unix_times):
+    """Split unix timestamps into (whole, fraction) Julian dates as sgp4 expects."""
+    days = np.asarray(unix_times, dtype=np.float64) / 86400.0
+    whole = np.floor(days)
+    return whole + UNIX_EPOCH_JD, days - whole
+
+
+def _gmst_radians(jd, fr):
+    """IAU-82 Greenwich mean sidereal time, the angle between TEME and the Earth-fixed frame."""
+    tut1 = ((jd - 2451545.0) + fr) / 36525.0
+    seconds = (
+        67310.54841
+        + (876600.0 * 3600.0 + 8640184.812866) * tut1
+        + 0.093104 * tut1 * tut1
+        - 6.2e-6 * tut1 * tut1 * tut1
+    )
+    return np.radians(np.remainder(seconds / 240.0, 360.0))
+
+
+@functools.lru_cache(maxsize=16)
+def _observer_frame(latitude, longitude, elevation_m=0.0):
+    """Observer ECEF position (km) and the east/north/up unit vectors, computed once per site."""
+    lat = np.radians(latitude)
+    lon = np.radians(longitude)
+    e2 = WGS84_F * (2.0 - WGS84_F)
+    n = WGS84_A_KM / np.sqrt(1.0 - e2 * np.sin(lat) ** 2)
+    h = elevation_m / 1000.0
+    position = np.array([
+        (n + h) * np.cos(lat) * np.cos(lon),
+        (n + h) * np.cos(lat) * np.sin(lon),
+        (n * (1.0 - e2) + h) * np.sin(lat),
+    ])
+    east = np.array([-np.sin(lon), np.cos(lon), 0.0])
+    north = np.array([-np.sin(lat) * np.cos(lon), -np.sin(lat) * np.sin(lon), np.cos(lat)])
+    up = np.array([np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)])
+    return position, east, north, up
+
+
+def _teme_to_altaz(r_teme, jd, fr, latitude, longitude, elevation_m=0.0):
+    """Convert TEME positions shaped (..., T, 3) to azimuth, altitude and range arrays."""
+    theta = _gmst_radians(jd, fr)
+    cos_t = np.cos(theta)
+    sin_t = np.sin(theta)
+    x = cos_t * r_teme[..., 0] + sin_t * r_teme[..., 1]
+    y = -sin_t * r_teme[..., 0] + cos_t * r_teme[..., 1]
+    z = r_teme[..., 2]
+
+    position, east, north, up = _observer_frame(latitude, longitude, elevation_m)
+    dx = x - position[0]
+    dy = y - position[1]
+    dz = z - position[2]
+
+    e = east[0] * dx + east[1] * dy
+    n = north[0] * dx + north[1] * dy + north[2] * dz
+    u = up[0] * dx + up[1] * dy + up[2] * dz
+
+    alt = np.degrees(np.arctan2(u, np.hypot(e, n)))
+    az = np.degrees(np.arctan2(e, n)) % 360.0
+    rng = np.sqrt(e * e + n * n + u * u)
+    return az, alt, rng
+
+
+class SatelliteCatalog:
+    """Two-line element sets propagated together with the vectorized SGP4 backend."""
+
+    def __init__(self, path=TLE_PATH, clock=None):
+        self.path = path
+        self.clock = clock or default_clock
+        self.names = []
+        self.satrecs = []
+        self._array = None
+        self._name_index = {}
+        self.ready = False
+        self.load()
+
+    def __len__(self):
+        return len(self.satrecs)
+
+    def load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+
+        try:
+            with open(self.path, "r", encoding="ascii", errors="ignore") as handle:
+                lines = [line.rstrip() for line in handle if line.strip()]
+        except OSError as exc:
+            print(f"TLE load failed: {exc}")
+            return
+
+        names, satrecs = [], []
+        pending_name = ""
+        i = 0
+        while i < len(lines):
+            line = lines[i]
+            if line.startswith("1 ") and i + 1 < len(lines) and lines[i + 1].startswith("2 "):
+                try:
+                    satrec = Satrec.twoline2rv(line, lines[i + 1])
+                except ValueError:
+                    i += 2
+                    pending_name = ""
+                    continue
+                name = pending_name or line[2:7].strip()
+                names.append(name)
+                satrecs.append(satrec)
+                pending_name = ""
+                i += 2
+                continue
+            pending_name = line[2:].strip() if line.startswith("0 ") else line.strip()
+            i += 1
+
+        if not satrecs:
+            return
+
+        self.names = names
+        self.satrecs = satrecs
+        self._array = SatrecArray(satrecs)
+        self._name_index = {}
+        for index, name in enumerate(names):
+            self._name_index.setdefault(name.lower(), index)
+            self._name_index.setdefault(str(satrecs[index].satnum), index)
+        self.ready = True
+        print(f"Satellite catalog ready: {len(satrecs)} objects")
+
+    def find(self, name):
+        """Return the index for an exact name or NORAD number, falling back to a prefix match."""
+        key = name.lower().strip()
+        if key in self._name_index:
+            return self._name_index[key]
+        for index, candidate in enumerate(self.names):
+            if candidate.lower().startswith(key):
+                return index
+        return None
+
+    def propagate(self, unix_times, indices=None):
+        """TEME positions (n_sats, n_times, 3) in km; failed propagations come back as NaN."""
+        jd, fr = _split_jd(np.atleast_1d(unix_times))
+        if indices is None:
+            array = self._array
+        else:
+            array = SatrecArray([self.satrecs[i] for i in np.atleast_1d(indices)])
+        errors, r, _ = array.sgp4(jd, fr)
+        r[errors != 0] = np.nan
+        return r, jd, fr
+
+    def altaz(self, latitude, longitude, unix_times, indices=None, elevation_m=0.0):
+        """Azimuth, altitude and range arrays shaped (n_sats, n_times)."""
+        r, jd, fr = self.propagate(unix_times, indices)
+        return _teme_to_altaz(r, jd, fr, latitude, longitude, elevation_m)
+
+    def track_position(self, index, latitude, longitude, when=None, elevation_m=0.0):
+        """Single-satellite (az, alt) for high-rate tracking, skipping the batch machinery."""
+        when = self.clock.now() if when is None else when
+        jd, fr = _split_jd(when)
+        error, r, _ = self.satrecs[index].sgp4(float(jd), float(fr))
+        if error != 0:
+            return None
+        az, alt, _ = _teme_to_altaz(np.array(r), jd, fr, latitude, longitude, elevation_m)
+        return float(az), float(alt)
+
+    def visible(self, latitude, longitude, when=None, min_altitude=0.0, elevation_m=0.0):
+        """List (name, az, alt, range_km) for every satellite above ``min_altitude`` right now."""
+        if not self.ready:
+            return []
+        when = self.clock.now() if when is None else when
+        az, alt, rng = self.altaz(latitude, longitude, [when], elevation_m=elevation_m)
+        az, alt, rng = az[:, 0], alt[:, 0], rng[:, 0]
+        above = np.nonzero(alt > min_altitude)[0]
+        return [(self.names[i], float(az[i]), float(alt[i]), float(rng[i])) for i in above]
+
+    def predict_passes(self, latitude, longitude, start=None, hours=24.0, step_s=60.0,
+                       min_altitude=0.0, elevation_m=0.0, indices=None, chunk_size=500):
+        """Predict every pass above ``min_altitude`` for the selected satellites.
+
+        The whole window is sampled on a coarse grid in satellite chunks so memory
+        stays bounded; each horizon crossing is then refined with one regula falsi
+        step against a single-satellite propagation.
+        """
+        if not self.ready:
+            return []
+        start = self.clock.now() if start is None else start
+        times = start + np.arange(0.0, hours * 3600.0 + step_s, step_s)
+        if indices is None:
+            indices = np.arange(len(self.satrecs))
+        indices = np.atleast_1d(indices)
+        last = len(times) - 1
+
+        passes = []
+        for offset in range(0, len(indices), chunk_size):
+            chunk = indices[offset:offset + chunk_size]
+            az, alt, _ = self.altaz(latitude, longitude, times, chunk, elevation_m)
+            alt = np.nan_to_num(alt, nan=-90.0)
+            above = alt > min_altitude
+
+            edges = np.diff(above.astype(np.int8), axis=1)
+            for row in np.nonzero(above.any(axis=1))[0]:
+                rises = np.nonzero(edges[row] == 1)[0] + 1
+                sets = np.nonzero(edges[row] == -1)[0] + 1
+                if above[row, 0]:
+                    rises = np.concatenate(([0], rises))
+                if above[row, -1]:
+                    sets = np.concatenate((sets, [last + 1]))
+
+                crossings = np.concatenate((rises, sets))
+                inner = crossings[(crossings > 0) & (crossings <= last)]
+                refined = dict(zip(inner.tolist(), self._refine_crossings(
+                    chunk[row], times, alt[row], inner, min_altitude, latitude, longitude, elevation_m,
+                ).tolist()))
+
+                for rise_i, set_i in zip(rises.tolist(), sets.tolist()):
+                    peak = rise_i + int(np.argmax(alt[row, rise_i:set_i]))
+                    peak_time, peak_alt = self._culmination(times, alt[row], peak)
+                    passes.append(SatellitePass(
+                        name=self.names[chunk[row]],
+                        rise_time=refined.get(rise_i, float(times[min(rise_i, last)])),
+                        rise_az=float(az[row, rise_i]),
+                        culmination_time=peak_time,
+                        max_alt=peak_alt,
+                        set_time=refined.get(set_i, float(times[min(set_i, last)])),
+                        set_az=float(az[row, set_i - 1]),
+                    ))
+
+        passes.sort(key=lambda p: p.rise_time)
+        return passes
+
+    @staticmethod
+    def _culmination(times, alt, peak):
+        """Parabolic interpolation of the highest sample and its two neighbours."""
+        if peak <= 0 or peak >= len(times) - 1:
+            return float(times[peak]), float(alt[peak])
+        a0, a1, a2 = alt[peak - 1], alt[peak], alt[peak + 1]
+        curvature = a0 - 2.0 * a1 + a2
+        if curvature >= 0.0:
+            return float(times[peak]), float(a1)
+        shift = 0.5 * (a0 - a2) / curvature
+        step = times[peak + 1] - times[peak]
+        return float(times[peak] + shift * step), float(a1 - 0.25 * (a0 - a2) * shift)
+
+    def _refine_crossings(self, index, times, alt, crossings, min_altitude, latitude, longitude, elevation_m):
+        """Refine horizon crossings bracketed by samples ``crossings - 1`` and ``crossings``."""
+        if len(crossings) == 0:
+            return np.empty(0)
+        t0, t1 = times[crossings - 1], times[crossings]
+        a0, a1 = alt[crossings - 1], alt[crossings]
+        guess = t0 + (min_altitude - a0) / (a1 - a0) * (t1 - t0)
+
+        jd, fr = _split_jd(guess)
+        errors, r, _ = self.satrecs[index].sgp4_array(jd, fr)
+        _, a_guess, _ = _teme_to_altaz(r, jd, fr, latitude, longitude, elevation_m)
+        valid = (errors == 0) & np.isfinite(a_guess)
+
+        left = (a_guess - min_altitude) * (a0 - min_altitude) < 0
+        tl = np.where(left, t0, guess)
+        al = np.where(left, a0, a_guess)
+        tr = np.where(left, guess, t1)
+        ar = np.where(left, a_guess, a1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            better = tl + (min_altitude - al) / (ar - al) * (tr - tl)
+        return np.where(valid & np.isfinite(better), better, guess)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Predict satellite passes from a local TLE file.")
+    parser.add_argument("--lat", type=float, default=0.0)
+    parser.add_argument("--lon", type=float, default=0.0)
+    parser.add_argument("--hours", type=float, default=24.0)
+    parser.add_argument("--min-alt", type=float, default=10.0)
+    parser.add_argument("--tle", default=TLE_PATH)
+    args = parser.parse_args()
+
+    catalog = SatelliteCatalog(args.tle)
+    if not catalog.ready:
+        print(f"No TLE data found at {args.tle}")
+    else:
+        started = time.perf_counter()
+        found = catalog.predict_passes(args.lat, args.lon, hours=args.hours, min_altitude=args.min_alt)
+        elapsed = time.perf_counter() - started
+        for p in found:
+            rise = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(p.rise_time))
+            print(f"{rise}  {p.name:<24} max {p.max_alt:5.1f}°  az {p.rise_az:5.1f}° -> {p.set_az:5.1f}°")
+        print(f"{len(found)} passes for {len(catalog)} satellites in {elapsed:.2f}s")
@@ -0,0 +1,97 @@
+import threading
+from collections import OrderedDict
+
+from skyfield.api import load, wgs84
+
+
+SITE_CACHE = 16                 # sites kept; the app rarely has more than one or two
+AT_CACHE = 4                    # observer positions kept per site, newest instants
+
+_ephemeris = None
+_lock = threading.Lock()
+_sites = OrderedDict()
+
+
+def ephemeris():
+    """Shared (timescale, de421) pair, loaded on first use."""
+    global _ephemeris
+    with _lock:
+        if _ephemeris is None:
+            _ephemeris = (load.timescale(), load('de421.bsp'))
+    return _ephemeris
+
+
+def _time_key(t):
+    """Hashable key for a scalar skyfield Time, or None for arrays of times."""
+    whole = t.whole
+    if getattr(whole, "shape", ()):
+        return None
+    return (float(whole), float(t.tt_fraction))
+
+
+class Site:
+    """One observing location's skyfield objects, built once and shared.
+
+    ``topos`` is the ``wgs84.latlon`` position and ``observer`` the
+    ``earth + topos`` vector sum, created on first use so topos-only callers
+    never load the ephemeris. ``at(t)`` keeps the observer's barycentric
+    position for the last ``AT_CACHE`` instants, so callers converting
+    several targets at the same moment share one evaluation. Safe to use
+    from any thread; get instances through ``site()``.
+    """
+
+    def __init__(self, latitude, longitude, elevation_m=0.0, eph=None):
+        self.latitude = latitude
+        self.longitude = longitude
+        self.elevation_m = elevation_m
+        self.topos = wgs84.latlon(latitude, longitude, elevation_m=elevation_m)
+        self._eph = eph
+        self._observer = None
+        self._positions = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def observer(self):
+        if self._observer is None:
+            eph = self._eph if self._eph is not None else ephemeris()[1]
+            self._observer = eph["earth"] + self.topos
+        return self._observer
+
+    def at(self, t):
+        """Barycentric position of the site at ``t``, memoized per instant."""
+        key = _time_key(t)
+        if key is None:
+            return self.observer.at(t)
+        with self._lock:
+            position = self._positions.get(key)
+            if position is not None:
+                self._positions.move_to_end(key)
+                self.hits += 1
+                return position
+        position = self.observer.at(t)
+        with self._lock:
+            self.misses += 1
+            self._positions[key] = position
+            while len(self._positions) > AT_CACHE:
+                self._positions.popitem(last=False)
+        return position
+
+
+def site(latitude, longitude, eph=None, elevation_m=0.0):
+    """The shared ``Site`` for a location (and ephemeris; default the shared de421)."""
+    shared = _ephemeris is not None and eph is _ephemeris[1]
+    key = (float(latitude), float(longitude), float(elevation_m), None if eph is None or shared else id(eph))
+    with _lock:
+        found = _sites.get(key)
+        if found is not None:
+            _sites.move_to_end(key)
+            return found
+    created = Site(float(latitude), float(longitude), float(elevation_m), eph)
+    with _lock:
+        found = _sites.setdefault(key, created)
+        _sites.move_to_end(key)
+        while len(_sites) > SITE_CACHE:
+            _sites.popitem(last=False)
+    return found
@@ -0,0 +1,76 @@
+_MISSING = object()
+
+# Field -> topic reported to subscribers when it changes.
+TOPICS = {
+    "target_az": "target",
+    "target_el": "target",
+    "latitude": "location",
+    "longitude": "location",
+    "show_point": "point",
+    "show_axes": "axes",
+    "tracking": "tracking",
+    "satellite": "satellite",
+}
+
+
+class TelescopeState:
+    """Observable telescope state with change notification batched per frame.
+
+    Assigning a field records its topic ("target", "location", "point",
+    "axes", "tracking", "satellite"); ``touch`` records one without a field
+    ("clock"). The mount pointing stays in ``MountSystem``, which servers
+    write at high rates from their own threads, and is reported as "mount"
+    whenever its version moved. Nothing is delivered until ``flush``, which
+    the core calls once per tick: each subscriber then gets the set of
+    topics that changed since the previous flush, once, however many
+    assignments happened in between.
+
+    Fields are written and flushed on the core's owner thread only.
+    """
+
+    def __init__(self, mount, latitude=0.0, longitude=0.0):
+        object.__setattr__(self, "_changed", set())
+        object.__setattr__(self, "_subscribers", [])
+        self.mount = mount
+        self.latitude = latitude
+        self.longitude = longitude
+        self.target_az = mount.azimuth
+        self.target_el = mount.elevation
+        self.show_point = True
+        self.show_axes = True
+        self.tracking = False
+        self.satellite = None
+        self.flushes = 0
+        self._flushed_version = mount.version
+        self._changed.clear()
+
+    def __setattr__(self, name, value):
+        topic = TOPICS.get(name)
+        if topic is not None and getattr(self, name, _MISSING) != value:
+            self._changed.add(topic)
+        object.__setattr__(self, name, value)
+
+    def touch(self, topic):
+        self._changed.add(topic)
+
+    def subscribe(self, callback, topics=None):
+        """Call ``callback(changed_topics)`` on flushes that touch ``topics`` (default: any)."""
+        self._subscribers.append((callback, frozenset(topics) if topics else None))
+
+    def unsubscribe(self, callback):
+        self._subscribers[:] = [entry for entry in self._subscribers if entry[0] != callback]
+
+    def flush(self):
+        version = self.mount.version
+        if version != self._flushed_version:
+            self._flushed_version = version
+            self._changed.add("mount")
+        if not self._changed:
+            return
+        changed = frozenset(self._changed)
+        self._changed.clear()
+        self.flushes += 1
+        # Changes made by subscribers go out with the next flush.
+        for callback, topics in list(self._subscribers):
+            if topics is None or topics & changed:
+                callback(changed)
@@ -0,0 +1,487 @@
+import asyncio
+import socket
+import struct
+import threading
+from skyfield.api import Star
+
+from .log import get_logger
+from .metrics import timed
+from .mount import MountDriver, PositionCache
+from .site import ephemeris, site
+from .bridge_protocol import LX200FrameParser, NativeFrameParser
+
+
+NATIVE_PACKET_INTERVAL = 0.3    # seconds between position packets to native clients
+DETECT_TIMEOUT = 1.5            # seconds to wait for a client's first bytes
+LISTEN_BACKLOG = 128
+ACCEPT_RETRY_S = 0.1            # pause after a failed accept (EMFILE, ENOBUFS) before trying again
+MOTION_TICK = 0.01              # seconds between integration steps of :Mn/:Ms/:Me/:Mw moves
+SYNC_REPLY = " Coordinates     matched.        #"
+
+log = get_logger("bridge")
+
+
+def classify_protocol(buffer, final=False):
+    """Decide whether ``buffer`` opens an LX200 ASCII or a Stellarium native stream.
+
+    Returns "lx200", "native", or None when more bytes are needed. With
+    ``final`` set (timeout or nothing more coming) a decision is always made.
+    """
+    if buffer:
+        # LX200 commands are plain ASCII and usually include ':' prefixes and '#' suffixes.
+        is_ascii = all((32 <= b <= 126) or b in (9, 10, 13) for b in buffer)
+        if is_ascii and (b":" in buffer or b"#" in buffer):
+            return "lx200"
+
+        # Native Stellarium packets begin with little-endian packet length.
+        if len(buffer) >= 2:
+            packet_len = struct.unpack_from("<h", buffer, 0)[0]
+            if 20 <= packet_len <= 256:
+                return "native"
+
+        # Binary-looking payload is very likely native protocol.
+        if not is_ascii:
+            return "native"
+
+    if final:
+        return "native"
+    return None
+
+
+class StellariumLX200Bridge:
+    """Expose telescope state through a minimal LX200 TCP server for Stellarium.
+
+    All clients are served from one asyncio event loop on a background thread,
+    so any number of planetarium, guiding or scripting connections can be open
+    at once. ``dispatch`` is called with a zero-argument callable whenever a
+    client asks the GUI to move; it must run it on the GUI thread.
+    """
+
+    def __init__(self, app_ref, host="127.0.0.1", port=10001, dispatch=None, quantum_s=0.25, positions=None,
+                 clock=None):
+        self.app_ref = app_ref
+        self.host = host
+        self.port = port
+        self.dispatch = dispatch or (lambda fn: fn())
+        self.ts, self.eph = ephemeris()
+        self.earth = self.eph["earth"]
+        # Shared by every connection, so RA/Dec is computed once per tick however many clients poll.
+        self.positions = positions or PositionCache(app_ref.mount, self.ts, quantum_s=quantum_s, clock=clock)
+        self.clock = self.positions.clock
+        # Guiding and manual moves bypass the GUI thread entirely.
+        self.driver = MountDriver(app_ref.mount)
+        self._motion_task = None
+        self._running = False
+        self._thread = None
+        self._loop = None
+        self._stopped = None
+        self._sock = None
+        self._clients = set()
+
+    def start(self):
+        if self._running:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._running = False
+        loop = self._loop
+        if loop is not None and self._stopped is not None:
+            try:
+                loop.call_soon_threadsafe(self._stopped.set)
+            except RuntimeError:
+                pass
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout=2.0)
+
+    @property
+    def client_count(self):
+        return len(self._clients)
+
+    def _run(self):
+        loop = asyncio.new_event_loop()
+        self._loop = loop
+        try:
+            loop.run_until_complete(self._serve())
+        finally:
+            loop.close()
+            self._loop = None
+
+    @staticmethod
+    def _format_ra(ra_hours):
+        total_seconds = int(round((ra_hours % 24.0) * 3600))
+        total_seconds %= 24 * 3600
+        hh = total_seconds // 3600
+        mm = (total_seconds % 3600) // 60
+        ss = total_seconds % 60
+        return f"{hh:02d}:{mm:02d}:{ss:02d}"
+
+    @staticmethod
+    def _format_dec(dec_degrees):
+        sign = "+" if dec_degrees >= 0 else "-"
+        abs_deg = abs(dec_degrees)
+        total_seconds = int(round(abs_deg * 3600))
+        dd = total_seconds // 3600
+        mm = (total_seconds % 3600) // 60
+        ss = total_seconds % 60
+        return f"{sign}{dd:02d}*{mm:02d}:{ss:02d}"
+
+    @staticmethod
+    def _format_dms(degrees, signed, width):
+        sign = ""
+        if signed:
+            sign = "+" if degrees >= 0 else "-"
+        total_seconds = int(round(abs(degrees) * 3600))
+        dd = total_seconds // 3600
+        mm = (total_seconds % 3600) // 60
+        ss = total_seconds % 60
+        return f"{sign}{dd:0{width}d}*{mm:02d}'{ss:02d}"
+
+    @staticmethod
+    def _parse_ra(text):
+        clean = text.strip()
+        parts = clean.split(":")
+        if len(parts) < 2:
+            raise ValueError("Invalid RA format")
+
+        hh = int(parts[0]) % 24
+        mm = float(parts[1])
+        ss = 0.0
+        if len(parts) >= 3 and parts[2] != "":
+            ss = float(parts[2])
+
+        return hh + (mm / 60.0) + (ss / 3600.0)
+
+    @staticmethod
+    def _parse_dec(text):
+        clean = text.strip()
+        sign = -1.0 if clean.startswith("-") else 1.0
+        clean = clean.lstrip("+-")
+        clean = clean.replace("*", ":")
+
+        parts = clean.split(":")
+        if len(parts) < 2:
+            raise ValueError("Invalid DEC format")
+
+        dd = int(parts[0])
+        mm = float(parts[1])
+        ss = 0.0
+        if len(parts) >= 3 and parts[2] != "":
+            ss = float(parts[2])
+
+        value = dd + (mm / 60.0) + (ss / 3600.0)
+        return sign * value
+
+    @timed("bridge_radec")
+    def _current_radec(self):
+        return self.positions.radec(self.app_ref.device_lat, self.app_ref.device_lon)
+
+    def radec_to_altaz(self, ra_hours, dec_degrees):
+        t = self.clock.time(self.ts)
+        observer = site(self.app_ref.device_lat, self.app_ref.device_lon, self.eph).at(t)
+        target = Star(ra_hours=ra_hours, dec_degrees=dec_degrees)
+        alt, az, _ = observer.observe(target).apparent().altaz()
+        return az.degrees % 360.0, max(0.0, min(90.0, alt.degrees))
+
+    def goto_radec(self, ra_hours, dec_degrees):
+        az_deg, alt_deg = self.radec_to_altaz(ra_hours, dec_degrees)
+
+        def apply_move():
+            self.app_ref.set_orientation(az_deg, alt_deg)
+            self.app_ref.plot_telescope()
+
+        self.dispatch(apply_move)
+
+    @timed("lx200_command")
+    def _handle_command(self, command, session):
+        """Answer one LX200 command; ``session`` holds the connection's pending goto target."""
+        if command == "GR":
+            ra_hours, _ = self._current_radec()
+            return self._format_ra(ra_hours) + "#"
+
+        if command == "GD":
+            _, dec_degrees = self._current_radec()
+            return self._format_dec(dec_degrees) + "#"
+
+        if command.startswith("Sr"):
+            try:
+                session["ra"] = self._parse_ra(command[2:])
+                return "1"
+            except Exception:
+                session["ra"] = None
+                return "0"
+
+        if command.startswith("Sd"):
+            try:
+                session["dec"] = self._parse_dec(command[2:])
+                return "1"
+            except Exception:
+                session["dec"] = None
+                return "0"
+
+        if command == "MS":
+            if session["ra"] is None or session["dec"] is None:
+                return "1"
+            self.goto_radec(session["ra"], session["dec"])
+            return "0"
+
+        if command in {"GVP", "GVN", "GVD"}:
+            return "NewtonianLX200#"
+
+        if command == "GA":
+            return self._format_dms(self.app_ref.mount.elevation, True, 2) + "#"
+
+        if command == "GZ":
+            return self._format_dms(self.app_ref.mount.azimuth % 360.0, False, 3) + "#"
+
+        if command.startswith("Mg") and len(command) >= 4:
+            try:
+                self.driver.pulse_guide(command[2], int(command[3:]))
+            except ValueError:
+                pass
+            return ""
+
+        if command in {"Mn", "Ms", "Me", "Mw"}:
+            if self.driver.start_move(command[1]):
+                self._ensure_motion_task()
+            return ""
+
+        if command == "Q" or command in {"Qn", "Qs", "Qe", "Qw"}:
+            self.driver.stop(command[1] if len(command) == 2 else None)
+            if command == "Q" and hasattr(self.app_ref, "abort_slew"):
+                self.dispatch(self.app_ref.abort_slew)
+            return ""
+
+        if command in {"RG", "RC", "RM", "RS"}:
+            self.driver.set_rate(command[1])
+            return ""
+
+        if command == "CM":
+            if session["ra"] is not None and session["dec"] is not None:
+                self.driver.sync(*self.radec_to_altaz(session["ra"], session["dec"]))
+            return SYNC_REPLY
+
+        return "#"
+
+    def _ensure_motion_task(self):
+        if self._motion_task is None or self._motion_task.done():
+            self._motion_task = asyncio.ensure_future(self._drive_motion())
+
+    async def _drive_motion(self):
+        while self._running and self.driver.moving:
+            self.driver.advance()
+            await asyncio.sleep(MOTION_TICK)
+
+    def _encode_stellarium_packet(self):
+        """Build a Stellarium native telescope packet (24 bytes)."""
+        ra_hours, dec_degrees = self._current_radec()
+        ra_raw = int((ra_hours / 24.0) * 4294967296.0) & 0xFFFFFFFF
+        dec_raw = int((dec_degrees / 360.0) * 4294967296.0)
+        if dec_raw > 2147483647:
+            dec_raw -= 4294967296
+        if dec_raw < -2147483648:
+            dec_raw += 4294967296
+
+        return struct.pack(
+            "<hhqIii",
+            24,
+            0,
+            int(self.clock.now() * 1_000_000),
+            ra_raw,
+            dec_raw,
+            0,
+        )
+
+    @staticmethod
+    def _decode_stellarium_goto_packet(packet):
+        """Decode Stellarium native packet and return (ra_hours, dec_degrees) for goto packets."""
+        if len(packet) < 20:
+            return None
+
+        packet_len, packet_type = struct.unpack_from("<hh", packet, 0)
+        if packet_type != 0 or packet_len < 20:
+            return None
+
+        if len(packet) < packet_len:
+            return None
+
+        _, _, _, ra_raw, dec_raw = struct.unpack_from("<hhqIi", packet, 0)
+        ra_hours = ((ra_raw & 0xFFFFFFFF) / 4294967296.0) * 24.0
+        dec_degrees = (dec_raw / 4294967296.0) * 360.0
+
+        # Declination outside physical sky bounds indicates a malformed packet.
+        if dec_degrees < -90.0 or dec_degrees > 90.0:
+            return None
+
+        return ra_hours, dec_degrees
+
+    async def _serve_lx200_client(self, conn, initial_bytes=b""):
+        loop = asyncio.get_running_loop()
+        parser = LX200FrameParser()
+        session = {"ra": None, "dec": None}
+        commands = parser.feed(initial_bytes)
+        while self._running:
+            responses = []
+            for cmd in commands:
+                log.debug("LX200 cmd: %s", cmd)
+                response = self._handle_command(cmd, session)
+                if response:
+                    responses.append(response)
+            if responses:
+                # Pipelined commands are answered with one send.
+                await loop.sock_sendall(conn, "".join(responses).encode("ascii"))
+
+            count = await loop.sock_recv_into(conn, parser.writable())
+            if not count:
+                break
+            parser.commit(count)
+            commands = parser.parse()
+
+    async def _send_native_positions(self, conn):
+        loop = asyncio.get_running_loop()
+        while self._running:
+            await loop.sock_sendall(conn, self._encode_stellarium_packet())
+            await asyncio.sleep(NATIVE_PACKET_INTERVAL)
+
+    def _consume_native_packets(self, packets):
+        """Act on every goto among the framed packets."""
+        for packet in packets:
+            target = self._decode_stellarium_goto_packet(packet)
+            if target is None:
+                continue
+
+            ra_hours, dec_degrees = target
+            log.info("Stellarium native goto: RA %.5fh DEC %.5fdeg", ra_hours, dec_degrees)
+            self.goto_radec(ra_hours, dec_degrees)
+
+    async def _receive_native_commands(self, conn, initial_bytes):
+        loop = asyncio.get_running_loop()
+        parser = NativeFrameParser()
+        self._consume_native_packets(parser.feed(initial_bytes))
+        while self._running:
+            count = await loop.sock_recv_into(conn, parser.writable())
+            if not count:
+                break
+            parser.commit(count)
+            self._consume_native_packets(parser.parse())
+
+    async def _serve_stellarium_native_client(self, conn, initial_bytes=b""):
+        tasks = {
+            asyncio.ensure_future(self._send_native_positions(conn)),
+            asyncio.ensure_future(self._receive_native_commands(conn, initial_bytes)),
+        }
+        # Either side finishing (peer closed, send failed) ends the session.
+        try:
+            done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+        for task in done:
+            task.result()
+
+    async def _detect_client_protocol(self, conn):
+        """Detect whether the connected client is LX200 ASCII or Stellarium native binary."""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + DETECT_TIMEOUT
+        buffer = b""
+
+        while self._running:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                chunk = await asyncio.wait_for(loop.sock_recv(conn, 1024), remaining)
+            except asyncio.TimeoutError:
+                break
+            except OSError:
+                return "closed", b""
+
+            if not chunk:
+                return "closed", b""
+
+            buffer += chunk
+            protocol = classify_protocol(buffer)
+            if protocol is not None:
+                return protocol, buffer
+
+        return classify_protocol(buffer, final=True), buffer
+
+    async def _handle_client(self, conn, addr):
+        log.info("Stellarium client connected: %s", addr)
+        try:
+            protocol, initial = await self._detect_client_protocol(conn)
+            if protocol == "closed":
+                log.info("Client disconnected before protocol detection")
+                return
+
+            if protocol == "lx200":
+                log.info("Using LX200 protocol")
+                await self._serve_lx200_client(conn, initial_bytes=initial)
+            else:
+                log.info("Using Stellarium native protocol stream")
+                await self._serve_stellarium_native_client(conn, initial_bytes=initial)
+            log.info("Stellarium client disconnected")
+        except OSError:
+            log.info("Stellarium client disconnected")
+        except Exception as exc:
+            log.warning("Stellarium client error: %s", exc)
+        finally:
+            conn.close()
+
+    async def _accept_clients(self, server):
+        loop = asyncio.get_running_loop()
+        while self._running:
+            try:
+                conn, addr = await loop.sock_accept(server)
+                conn.setblocking(False)
+            except OSError as exc:
+                # Out of descriptors or buffers: existing clients carry on, new ones wait.
+                if self._running:
+                    log.warning("Stellarium bridge accept failed: %s", exc)
+                    await asyncio.sleep(ACCEPT_RETRY_S)
+                continue
+            task = loop.create_task(self._handle_client(conn, addr))
+            self._clients.add(task)
+            task.add_done_callback(self._clients.discard)
+
+    async def _serve(self):
+        self._stopped = asyncio.Event()
+        if not self._running:
+            return
+        server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        try:
+            server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            server.bind((self.host, self.port))
+            server.listen(LISTEN_BACKLOG)
+            server.setblocking(False)
+        except OSError as exc:
+            log.error("Stellarium bridge stopped with error: %s", exc)
+            server.close()
+            self._running = False
+            return
+        self._sock = server
+        log.info("Stellarium LX200 bridge listening on %s:%s", self.host, self.port)
+
+        accept_task = asyncio.ensure_future(self._accept_clients(server))
+        stop_task = asyncio.ensure_future(self._stopped.wait())
+        try:
+            done, _ = await asyncio.wait({accept_task, stop_task}, return_when=asyncio.FIRST_COMPLETED)
+            if accept_task in done and self._running:
+                exc = accept_task.exception()
+                if exc is not None:
+                    log.error("Stellarium bridge stopped with error: %s", exc)
+        finally:
+            tasks = [accept_task, stop_task, *self._clients]
+            if self._motion_task is not None:
+                tasks.append(self._motion_task)
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            try:
+                server.close()
+            except OSError:
+                pass
+            self._sock = None
@@ -0,0 +1,176 @@
+import math
+import socket
+import struct
+import threading
+import time
+
+from .log import get_logger
+
+
+TELEMETRY_GROUP = "239.255.42.99"
+TELEMETRY_PORT = 10002
+TELEMETRY_MAGIC = b"NTLM"
+TELEMETRY_VERSION = 1
+
+FLAG_HEARTBEAT = 0x01
+
+# magic, version, flags, sequence, unix time (us), az, alt, ra hours, dec degrees
+PACKET = struct.Struct("<4sBBIqffff")
+
+log = get_logger("telemetry")
+
+
+def encode_packet(sequence, timestamp_us, azimuth, elevation, ra_hours, dec_degrees, flags=0):
+    return PACKET.pack(
+        TELEMETRY_MAGIC, TELEMETRY_VERSION, flags, sequence & 0xFFFFFFFF, timestamp_us,
+        azimuth, elevation, ra_hours, dec_degrees,
+    )
+
+
+def decode_packet(data):
+    """Return a dict for a telemetry datagram, or None if it is not one."""
+    if len(data) < PACKET.size:
+        return None
+    magic, version, flags, sequence, timestamp_us, az, alt, ra, dec = PACKET.unpack_from(data, 0)
+    if magic != TELEMETRY_MAGIC or version != TELEMETRY_VERSION:
+        return None
+    return {
+        "sequence": sequence,
+        "time": timestamp_us / 1e6,
+        "azimuth": az,
+        "elevation": alt,
+        "ra_hours": ra,
+        "dec_degrees": dec,
+        "heartbeat": bool(flags & FLAG_HEARTBEAT),
+    }
+
+
+def angular_change(az0, alt0, az1, alt1):
+    """Approximate sky distance in degrees between two alt/az pointings."""
+    daz = (az1 - az0 + 180.0) % 360.0 - 180.0
+    return math.hypot(daz * math.cos(math.radians((alt0 + alt1) / 2.0)), alt1 - alt0)
+
+
+class TelemetryPublisher:
+    """Push mount position over UDP multicast whenever it changes.
+
+    A packet goes out when the pointing has moved more than ``threshold_deg``
+    since the last one sent, never faster than ``max_rate_hz``, plus a heartbeat
+    every ``heartbeat_s`` so listeners can tell the publisher is alive. RA/Dec
+    come from the shared ``PositionCache``, so any number of listeners costs
+    one computation per packet.
+    """
+
+    def __init__(self, mount, positions, site, group=TELEMETRY_GROUP, port=TELEMETRY_PORT,
+                 max_rate_hz=10.0, threshold_deg=0.001, heartbeat_s=5.0, ttl=1):
+        self.mount = mount
+        self.positions = positions
+        self.site = site
+        self.group = group
+        self.port = port
+        self.max_rate_hz = max_rate_hz
+        self.threshold_deg = threshold_deg
+        self.heartbeat_s = heartbeat_s
+        self.ttl = ttl
+        self.sent = 0
+        self._sequence = 0
+        self._running = False
+        self._wake = threading.Event()
+        self._thread = None
+        self._sock = None
+
+    def start(self):
+        if self._running:
+            return
+        try:
+            sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_UDP)
+            sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_TTL, self.ttl)
+            sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_LOOP, 1)
+        except OSError as exc:
+            log.warning("Telemetry disabled: %s", exc)
+            return
+        self._sock = sock
+        self._running = True
+        self._wake.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        log.info("Telemetry publishing to %s:%s", self.group, self.port)
+
+    def stop(self):
+        self._running = False
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+
+    def _run(self):
+        last_version = None
+        last_pointing = None
+        last_sent = 0.0
+        while self._running:
+            interval = 1.0 / self.max_rate_hz if self.max_rate_hz > 0 else 0.1
+            self._wake.wait(interval)
+            if not self._running:
+                break
+
+            version, azimuth, elevation = self.mount.snapshot()
+            now = time.monotonic()
+            heartbeat = now - last_sent >= self.heartbeat_s
+            if version == last_version and not heartbeat:
+                continue
+            last_version = version
+            moved = last_pointing is None or angular_change(*last_pointing, azimuth, elevation) > self.threshold_deg
+            if not moved and not heartbeat:
+                continue
+
+            try:
+                lat, lon = self.site()
+                ra_hours, dec_degrees = self.positions.radec(lat, lon)
+                packet = encode_packet(
+                    self._sequence, int(self.positions.clock.now() * 1_000_000), azimuth, elevation, ra_hours, dec_degrees,
+                    flags=0 if moved else FLAG_HEARTBEAT,
+                )
+                self._sock.sendto(packet, (self.group, self.port))
+            except OSError as exc:
+                log.warning("Telemetry send failed: %s", exc)
+                continue
+            self._sequence += 1
+            self.sent += 1
+            last_pointing = (azimuth, elevation)
+            last_sent = now
+
+
+def listen(group=TELEMETRY_GROUP, port=TELEMETRY_PORT, interface="0.0.0.0"):
+    """Yield decoded telemetry packets received on the multicast group."""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_UDP)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind(("", port))
+    membership = struct.pack("4s4s", socket.inet_aton(group), socket.inet_aton(interface))
+    sock.setsockopt(socket.IPPROTO_IP, socket.IP_ADD_MEMBERSHIP, membership)
+    try:
+        while True:
+            data, _ = sock.recvfrom(256)
+            decoded = decode_packet(data)
+            if decoded is not None:
+                yield decoded
+    finally:
+        sock.close()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Print mount telemetry pushed by the telescope app.")
+    parser.add_argument("--group", default=TELEMETRY_GROUP)
+    parser.add_argument("--port", type=int, default=TELEMETRY_PORT)
+    args = parser.parse_args()
+
+    for update in listen(args.group, args.port):
+        tag = " (heartbeat)" if update["heartbeat"] else ""
+        print(
+            f"#{update['sequence']:<6} Az {update['azimuth']:8.3f}° Alt {update['elevation']:7.3f}°  "
+            f"RA {update['ra_hours']:8.5f}h Dec {update['dec_degrees']:+9.5f}°{tag}"
+        )
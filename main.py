@@ -1,32 +1,94 @@
+import time
+_STARTED = time.perf_counter()
+
 import sys
 import os
-import csv
-import gzip
 import math
 import random
-import socket
-import select
-import struct
-import time
-import urllib.request
-import urllib.error
 import threading
-import numpy as np
-from PyQt5.QtCore import Qt, QTimer
+from PyQt5.QtCore import Qt, QTimer, pyqtSignal
 from PyQt5.QtGui import QIcon
 from PyQt5.QtGui import QColor, QPainter
 from PyQt5.QtWidgets import QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QSpinBox, QCheckBox, QComboBox, QSizePolicy
 from PyQt5.QtWidgets import QOpenGLWidget
-from skyfield.api import Star, load, wgs84
-import geocoder
-from dotenv import load_dotenv
-try:
-    load_dotenv()
-except ImportError:
-    print("Note: python-dotenv not installed. Set OPENAI_API_KEY environment variable manually.")
 
 from loging import LoginWindow
-from ai import *
+from core.metrics import metrics, timed
+from core.startup import StartupProfiler
+
+# Enabled with --profile-startup; prints a per-phase breakdown once the login
+# window is up and again when the simulator window is ready.
+profiler = StartupProfiler(enabled="--profile-startup" in sys.argv, origin=_STARTED)
+profiler.mark("import Qt and login")
+# --metrics times the hot paths and serves them at http://127.0.0.1:9108/metrics;
+# --metrics-overlay also shows them over the sky map. Off, the timers cost one flag check.
+metrics.enable("--metrics" in sys.argv or "--metrics-overlay" in sys.argv)
+
+# numpy, skyfield and the core are bound by _import_simulator_modules() so the
+# login window does not wait for them; voice/AI (speech_recognition, pyttsx3,
+# openai) and geocoder load on first use.
+np = Star = None
+TLE_PATH = SkyCatalog = HYG_URL = HYG_PATH = Atmosphere = TelescopeCore = TICK_S = ephemeris = site = None
+LocationProvider = default_sources = None
+_simulator_modules_lock = threading.Lock()
+_ai_module = None
+
+
+def _import_simulator_modules():
+    global np, Star
+    global TLE_PATH, SkyCatalog, HYG_URL, HYG_PATH, Atmosphere, TelescopeCore, TICK_S, ephemeris, site
+    global LocationProvider, default_sources
+
+    with _simulator_modules_lock:
+        if TelescopeCore is not None:
+            return
+        with profiler.phase("import numpy/skyfield"):
+            import numpy as np
+            from skyfield.api import Star
+        with profiler.phase("import core"):
+            from core.satellites import TLE_PATH
+            from core.catalog import SkyCatalog, HYG_URL, HYG_PATH
+            from core.atmosphere import Atmosphere
+            from core.site import ephemeris, site
+            from core.location import LocationProvider, default_sources
+            from core.engine import TelescopeCore, TICK_S
+
+
+def _argv_option(name):
+    """Value of a ``--name=value`` command line option, or None."""
+    prefix = f"{name}="
+    for arg in sys.argv[1:]:
+        if arg.startswith(prefix):
+            return arg[len(prefix):]
+    return None
+
+
+def _ai():
+    """The voice/AI module, imported (and the OpenAI client created) on first use."""
+    global _ai_module
+    if _ai_module is None:
+        with profiler.phase("import voice/AI"):
+            try:
+                from dotenv import load_dotenv
+                load_dotenv()
+            except ImportError:
+                print("Note: python-dotenv not installed. Set OPENAI_API_KEY environment variable manually.")
+            import ai
+        _ai_module = ai
+    return _ai_module
+
+
+def speech(text):
+    _ai().speech(text)
+
+
+def _get_celestial_coordinates(object_name, latitude, longitude, when=None):
+    return _ai().get_celestial_coordinates(object_name, latitude, longitude, when)
+
+
+def _ask_ai(command):
+    ai = _ai()
+    return ai.ask_ai(command) if ai.client else None
 
 
 OPENGL_AVAILABLE = False
@@ -155,6 +217,7 @@ class StarryBackgroundWidget(QWidget):
         super().resizeEvent(event)
         self._regen_stars()
 
+    @timed("background_paint")
     def paintEvent(self, event):
         painter = QPainter(self)
         painter.setRenderHint(QPainter.Antialiasing, True)
@@ -174,481 +237,78 @@ class StarryBackgroundWidget(QWidget):
 
         painter.end()
 
-class MountSystem:
-    def __init__(self, azimuth=0, elevation=5, length=5):
-        self.azimuth = azimuth
-        self.elevation = elevation
-        self.length = length
-
-    def get_orientation_vector(self):
-        alt_rad = np.radians(self.elevation)
-        az_rad = np.radians(self.azimuth)
-        dx = self.length * np.cos(alt_rad) * np.cos(az_rad)
-        dy = self.length * np.cos(alt_rad) * np.sin(az_rad)
-        dz = self.length * np.sin(alt_rad)
-        return dx, dy, dz
-
-
-class StellariumLX200Bridge:
-    """Expose telescope state through a minimal LX200 TCP server for Stellarium."""
-
-    def __init__(self, app_ref, host="127.0.0.1", port=10001):
-        self.app_ref = app_ref
-        self.host = host
-        self.port = port
-        self.ts = load.timescale()
-        self.eph = load("de421.bsp")
-        self.earth = self.eph["earth"]
-        self._running = False
-        self._thread = None
-        self._sock = None
-        self._target_ra = None
-        self._target_dec = None
-
-    def start(self):
-        if self._running:
-            return
-        self._running = True
-        self._thread = threading.Thread(target=self._serve, daemon=True)
-        self._thread.start()
-
-    def stop(self):
-        self._running = False
-        if self._sock is not None:
-            try:
-                self._sock.close()
-            except OSError:
-                pass
-            self._sock = None
-
-    @staticmethod
-    def _format_ra(ra_hours):
-        total_seconds = int(round((ra_hours % 24.0) * 3600))
-        total_seconds %= 24 * 3600
-        hh = total_seconds // 3600
-        mm = (total_seconds % 3600) // 60
-        ss = total_seconds % 60
-        return f"{hh:02d}:{mm:02d}:{ss:02d}"
-
-    @staticmethod
-    def _format_dec(dec_degrees):
-        sign = "+" if dec_degrees >= 0 else "-"
-        abs_deg = abs(dec_degrees)
-        total_seconds = int(round(abs_deg * 3600))
-        dd = total_seconds // 3600
-        mm = (total_seconds % 3600) // 60
-        ss = total_seconds % 60
-        return f"{sign}{dd:02d}*{mm:02d}:{ss:02d}"
-
-    @staticmethod
-    def _parse_ra(text):
-        clean = text.strip()
-        parts = clean.split(":")
-        if len(parts) < 2:
-            raise ValueError("Invalid RA format")
-
-        hh = int(parts[0]) % 24
-        mm = float(parts[1])
-        ss = 0.0
-        if len(parts) >= 3 and parts[2] != "":
-            ss = float(parts[2])
-
-        return hh + (mm / 60.0) + (ss / 3600.0)
-
-    @staticmethod
-    def _parse_dec(text):
-        clean = text.strip()
-        sign = -1.0 if clean.startswith("-") else 1.0
-        clean = clean.lstrip("+-")
-        clean = clean.replace("*", ":")
-
-        parts = clean.split(":")
-        if len(parts) < 2:
-            raise ValueError("Invalid DEC format")
-
-        dd = int(parts[0])
-        mm = float(parts[1])
-        ss = 0.0
-        if len(parts) >= 3 and parts[2] != "":
-            ss = float(parts[2])
-
-        value = dd + (mm / 60.0) + (ss / 3600.0)
-        return sign * value
-
-    def _current_radec(self):
-        observer = wgs84.latlon(self.app_ref.device_lat, self.app_ref.device_lon)
-        t = self.ts.now()
-        apparent = observer.at(t).from_altaz(
-            alt_degrees=self.app_ref.mount.elevation,
-            az_degrees=self.app_ref.mount.azimuth,
-        )
-        ra, dec, _ = apparent.radec()
-        return ra.hours, dec.degrees
-
-    def _goto_radec(self, ra_hours, dec_degrees):
-        t = self.ts.now()
-        observer = wgs84.latlon(self.app_ref.device_lat, self.app_ref.device_lon)
-        target = Star(ra_hours=ra_hours, dec_degrees=dec_degrees)
-        alt, az, _ = (self.earth + observer).at(t).observe(target).apparent().altaz()
-
-        az_deg = az.degrees % 360.0
-        alt_deg = max(0.0, min(90.0, alt.degrees))
-
-        def apply_move():
-            self.app_ref.set_orientation(az_deg, alt_deg)
-            self.app_ref.plot_telescope()
-
-        QTimer.singleShot(0, apply_move)
-
-    def _handle_command(self, command):
-        if command == "GR":
-            ra_hours, _ = self._current_radec()
-            return self._format_ra(ra_hours) + "#"
-
-        if command == "GD":
-            _, dec_degrees = self._current_radec()
-            return self._format_dec(dec_degrees) + "#"
-
-        if command.startswith("Sr"):
-            try:
-                self._target_ra = self._parse_ra(command[2:])
-                return "1"
-            except Exception:
-                self._target_ra = None
-                return "0"
-
-        if command.startswith("Sd"):
-            try:
-                self._target_dec = self._parse_dec(command[2:])
-                return "1"
-            except Exception:
-                self._target_dec = None
-                return "0"
-
-        if command == "MS":
-            if self._target_ra is None or self._target_dec is None:
-                return "1"
-            self._goto_radec(self._target_ra, self._target_dec)
-            return "0"
-
-        if command in {"GVP", "GVN", "GVD"}:
-            return "NewtonianLX200#"
-
-        return "#"
-
-    def _encode_stellarium_packet(self):
-        """Build a Stellarium native telescope packet (24 bytes)."""
-        ra_hours, dec_degrees = self._current_radec()
-        ra_raw = int((ra_hours / 24.0) * 4294967296.0) & 0xFFFFFFFF
-        dec_raw = int((dec_degrees / 360.0) * 4294967296.0)
-        if dec_raw > 2147483647:
-            dec_raw -= 4294967296
-        if dec_raw < -2147483648:
-            dec_raw += 4294967296
-
-        return struct.pack(
-            "<hhqIii",
-            24,
-            0,
-            int(time.time() * 1_000_000),
-            ra_raw,
-            dec_raw,
-            0,
-        )
-
-    @staticmethod
-    def _decode_stellarium_goto_packet(packet):
-        """Decode Stellarium native packet and return (ra_hours, dec_degrees) for goto packets."""
-        if len(packet) < 20:
-            return None
-
-        packet_len, packet_type = struct.unpack_from("<hh", packet, 0)
-        if packet_type != 0 or packet_len < 20:
-            return None
-
-        if len(packet) < packet_len:
-            return None
-
-        _, _, _, ra_raw, dec_raw = struct.unpack_from("<hhqIi", packet, 0)
-        ra_hours = ((ra_raw & 0xFFFFFFFF) / 4294967296.0) * 24.0
-        dec_degrees = (dec_raw / 4294967296.0) * 360.0
-
-        # Declination outside physical sky bounds indicates a malformed packet.
-        if dec_degrees < -90.0 or dec_degrees > 90.0:
-            return None
-
-        return ra_hours, dec_degrees
-
-    def _serve_lx200_client(self, conn, initial_text=""):
-        conn.settimeout(0.5)
-        buffer = initial_text
-        while self._running:
-            try:
-                chunk = conn.recv(1024)
-            except socket.timeout:
-                continue
-            except OSError:
-                break
-            if not chunk:
-                break
-
-            buffer += chunk.decode("ascii", errors="ignore")
-            while "#" in buffer:
-                end = buffer.find("#")
-                raw_cmd = buffer[:end]
-                buffer = buffer[end + 1:]
-
-                cmd = raw_cmd.strip()
-                if not cmd:
-                    continue
-                if cmd.startswith(":"):
-                    cmd = cmd[1:]
-
-                if not cmd:
-                    continue
-
-                print(f"LX200 cmd: {cmd}")
-                response = self._handle_command(cmd)
-                if response:
-                    try:
-                        conn.sendall(response.encode("ascii"))
-                    except OSError:
-                        break
-
-    def _serve_stellarium_native_client(self, conn, initial_bytes=b""):
-        conn.settimeout(0.2)
-        inbound_buffer = initial_bytes or b""
-        next_tx = 0.0
-        while self._running:
-            now = time.monotonic()
-            if now >= next_tx:
-                try:
-                    conn.sendall(self._encode_stellarium_packet())
-                except OSError:
-                    break
-                next_tx = now + 0.3
-
-            try:
-                inbound = conn.recv(1024)
-                if inbound == b"":
-                    break
-                if inbound:
-                    inbound_buffer += inbound
-
-                    while len(inbound_buffer) >= 2:
-                        packet_len = struct.unpack_from("<h", inbound_buffer, 0)[0]
-
-                        if packet_len < 20 or packet_len > 256:
-                            inbound_buffer = inbound_buffer[1:]
-                            continue
-
-                        if len(inbound_buffer) < packet_len:
-                            break
-
-                        packet = inbound_buffer[:packet_len]
-                        inbound_buffer = inbound_buffer[packet_len:]
-
-                        target = self._decode_stellarium_goto_packet(packet)
-                        if target is None:
-                            continue
-
-                        ra_hours, dec_degrees = target
-                        print(
-                            "Stellarium native goto: "
-                            f"RA {ra_hours:.5f}h DEC {dec_degrees:.5f}deg"
-                        )
-                        self._goto_radec(ra_hours, dec_degrees)
-            except socket.timeout:
-                pass
-            except OSError:
-                break
-
-            time.sleep(0.05)
-
-    def _detect_client_protocol(self, conn):
-        """Detect whether the connected client is LX200 ASCII or Stellarium native binary."""
-        deadline = time.monotonic() + 1.5
-        buffer = b""
-        conn.settimeout(0.15)
-
-        while self._running and time.monotonic() < deadline:
-            try:
-                chunk = conn.recv(1024)
-            except socket.timeout:
-                continue
-            except OSError:
-                return "closed", b""
-
-            if chunk == b"":
-                return "closed", b""
-
-            if not chunk:
-                continue
-
-            buffer += chunk
-
-            # LX200 commands are plain ASCII and usually include ':' prefixes and '#' suffixes.
-            is_ascii = all((32 <= b <= 126) or b in (9, 10, 13) for b in buffer)
-            if is_ascii and (b":" in buffer or b"#" in buffer):
-                return "lx200", buffer
-
-            # Native Stellarium packets begin with little-endian packet length.
-            if len(buffer) >= 2:
-                packet_len = struct.unpack_from("<h", buffer, 0)[0]
-                if 20 <= packet_len <= 256:
-                    return "native", buffer
-
-            # Binary-looking payload is very likely native protocol.
-            if any((b < 32 and b not in (9, 10, 13)) or b > 126 for b in buffer):
-                return "native", buffer
-
-        if not buffer:
-            return "native", b""
-
-        try:
-            text = buffer.decode("ascii")
-            if ":" in text or "#" in text:
-                return "lx200", buffer
-        except UnicodeDecodeError:
-            pass
-
-        return "native", buffer
-
-    def _serve(self):
-        server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-        server.bind((self.host, self.port))
-        server.listen(1)
-        server.setblocking(False)
-        self._sock = server
-        print(f"Stellarium LX200 bridge listening on {self.host}:{self.port}")
-
-        try:
-            while self._running:
-                readable, _, _ = select.select([server], [], [], 0.25)
-                if not readable:
-                    continue
-                conn, addr = server.accept()
-                print(f"Stellarium client connected: {addr}")
-                with conn:
-                    protocol, initial = self._detect_client_protocol(conn)
-                    if protocol == "closed":
-                        print("Client disconnected before protocol detection")
-                        continue
-
-                    if protocol == "lx200":
-                        initial_text = initial.decode("ascii", errors="ignore")
-                        print("Using LX200 protocol")
-                        self._serve_lx200_client(conn, initial_text=initial_text)
-                    else:
-                        print("Using Stellarium native protocol stream")
-                        self._serve_stellarium_native_client(conn, initial_bytes=initial)
-                print("Stellarium client disconnected")
-        except OSError as exc:
-            if self._running:
-                print(f"Stellarium bridge stopped with error: {exc}")
-        finally:
-            try:
-                server.close()
-            except OSError:
-                pass
-            self._sock = None
-
-
-class SkyCatalog:
-    def __init__(self, url, cache_path, max_stars=5000, allow_download=True):
-        self.url = url
-        self.cache_path = cache_path
-        self.max_stars = max_stars
-        self.allow_download = allow_download
-        self.stars = []
-        self.ready = False
-        self.load()
-
-    def load(self):
-        os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
-        if not os.path.exists(self.cache_path):
-            if not self.allow_download:
-                return
-            try:
-                print(f"Downloading star catalog from {self.url}...")
-                urllib.request.urlretrieve(self.url, self.cache_path)
-                print("Star catalog downloaded successfully")
-            except (urllib.error.URLError, urllib.error.HTTPError) as exc:
-                print(f"Catalog download failed: {exc}")
-                print("Application will continue without star catalog")
-                return
-
-        try:
-            open_fn = gzip.open if self.cache_path.endswith(".gz") else open
-            with open_fn(self.cache_path, "rt", encoding="utf-8") as handle:
-                reader = csv.DictReader(handle)
-                stars = []
-                for row in reader:
-                    ra_raw = row.get("ra")
-                    dec_raw = row.get("dec")
-                    mag_raw = row.get("mag")
-                    if ra_raw is None or dec_raw is None or mag_raw is None:
-                        continue
-                    try:
-                        ra_val = float(ra_raw)
-                        dec_val = float(dec_raw)
-                        mag_val = float(mag_raw)
-                    except ValueError:
-                        continue
-
-                    ra_hours = ra_val / 15.0 if ra_val > 24 else ra_val
-                    name = row.get("proper") or row.get("bayer") or row.get("gl") or ""
-                    stars.append((ra_hours, dec_val, mag_val, name.strip()))
-
-                stars.sort(key=lambda s: s[2])
-                self.stars = stars[: self.max_stars]
-                self.ready = True
-        except OSError as exc:
-            print(f"Catalog load failed: {exc}")
-
-
 class SkyMapWidget(QWidget):
-    def __init__(self, catalog, on_pick=None, parent=None):
+    def __init__(self, catalog, on_pick=None, parent=None, atmosphere=None, clock=None):
         super().__init__(parent)
         self.catalog = catalog
+        self.clock = clock
         self.on_pick = on_pick
+        self.atmosphere = atmosphere or Atmosphere()
         self.lat = 0.0
         self.lon = 0.0
         self.visible = []
+        self.satellites = []
+        self.tracked_satellite = None
         self.selected = None
-        self.ts = load.timescale()
+        self.ts, self.eph = ephemeris()
 
         self.refresh_timer = QTimer(self)
         self.refresh_timer.timeout.connect(self.refresh_scene)
         self.refresh_timer.start(15000)
 
+    def follow_clock(self):
+        """Redraw now, and often enough that a warped clock moves the sky by at most 15 s per redraw."""
+        rate = 0.0 if self.clock.paused else abs(self.clock.rate)
+        self.refresh_timer.start(15000 if rate <= 1.0 else max(250, int(15000 / rate)))
+        self.refresh_scene()
+
     def set_location(self, lat, lon):
         self.lat = lat
         self.lon = lon
         self.refresh_scene()
 
+    def set_atmosphere(self, temperature_c=None, pressure_hpa=None, extinction_k=None, limiting_mag=None):
+        if temperature_c is not None:
+            self.atmosphere.temperature_c = temperature_c
+        if pressure_hpa is not None:
+            self.atmosphere.pressure_hpa = pressure_hpa
+        if extinction_k is not None:
+            self.atmosphere.extinction_k = extinction_k
+        if limiting_mag is not None:
+            self.atmosphere.limiting_mag = limiting_mag
+        self.refresh_scene()
+
+    def set_satellites(self, satellites, tracked=None):
+        self.satellites = satellites
+        self.tracked_satellite = tracked
+        self.update()
+
+    @timed("sky_map_refresh")
     def refresh_scene(self):
         if not self.catalog.ready:
             self.visible = []
             self.update()
             return
 
-        observer = wgs84.latlon(self.lat, self.lon)
-        t = self.ts.now()
+        t = self.clock.time(self.ts)
+        observer = site(self.lat, self.lon, self.eph).at(t)
 
-        visible = []
-        for ra_hours, dec_deg, mag, name in self.catalog.stars:
-            star = Star(ra_hours=ra_hours, dec_degrees=dec_deg)
-            alt, az, _ = observer.at(t).observe(star).apparent().altaz()
-            alt_deg = alt.degrees
-            if alt_deg <= 0:
-                continue
-            visible.append((az.degrees, alt_deg, mag, name))
+        # One vectorized Star for the whole catalog, positions carried to today's epoch.
+        ra_hours, dec_deg = self.catalog.positions_at(t)
+        stars = Star(ra_hours=ra_hours, dec_degrees=dec_deg)
+        alt, az, _ = observer.observe(stars).apparent().altaz()
+        az_deg = az.degrees
 
-        self.visible = visible
+        # Refraction lifts stars near the horizon; extinction dims them below the limit.
+        alt_deg, mags, shown = self.atmosphere.apply(alt.degrees, self.catalog.mag)
+
+        names = self.catalog.names
+        self.visible = [
+            (az_deg[i], alt_deg[i], mags[i], names[i]) for i in np.nonzero(shown)[0]
+        ]
         self.update()
 
+    @timed("sky_map_paint")
     def paintEvent(self, event):
         painter = QPainter(self)
         painter.setRenderHint(QPainter.Antialiasing, True)
@@ -710,6 +370,19 @@ class SkyMapWidget(QWidget):
             painter.setBrush(QColor(220, 220, 255, alpha))
             painter.drawEllipse(int(x - size / 2), int(y - size / 2), int(size), int(size))
 
+        for name, az_deg, alt_deg, _ in self.satellites:
+            az_rad = math.radians(az_deg)
+            r = (90.0 - alt_deg) / 90.0 * radius
+            x = cx + r * math.sin(az_rad)
+            y = cy - r * math.cos(az_rad)
+            tracked = name == self.tracked_satellite
+            painter.setPen(Qt.NoPen)
+            painter.setBrush(QColor(255, 120, 60, 230) if tracked else QColor(120, 255, 160, 170))
+            painter.drawRect(int(x - 2), int(y - 2), 4, 4)
+            if tracked:
+                painter.setPen(QColor(255, 160, 100, 230))
+                painter.drawText(int(x + 6), int(y - 4), name)
+
         if self.selected:
             az_deg, alt_deg = self.selected
             az_rad = math.radians(az_deg)
@@ -774,6 +447,7 @@ class OpenGLTelescopeWidget(QOpenGLWidget):
         glLoadIdentity()
         gluPerspective(45.0, float(w) / float(h), 0.1, 100.0)
 
+    @timed("telescope_paint_gl")
     def paintGL(self):
         if not self.opengl_ready:
             return
@@ -866,6 +540,9 @@ class OpenGLTelescopeWidget(QOpenGLWidget):
 
 
 class Newtonian_TelescopeApp(QMainWindow):
+    # Carries callables from worker threads (e.g. the Stellarium bridge) to the GUI thread.
+    gui_call = pyqtSignal(object)
+
     def __init__(self):
         super().__init__()
         self.setWindowTitle("Newtonian Telescope Simulator")
@@ -873,75 +550,144 @@ class Newtonian_TelescopeApp(QMainWindow):
         self.setMinimumSize(800, 600)
 
         self.fullscreen = False
-        self.device_lat, self.device_lon = 0.0, 0.0
 
-        catalog_url = "https://codeberg.org/astronexus/hyg/raw/branch/main/data/hyg/CURRENT/hyg_v42.csv.gz"
-        catalog_path = os.path.join(os.path.dirname(__file__), "data", "hyg_v42.csv.gz")
-        self.catalog = SkyCatalog(catalog_url, catalog_path, max_stars=5000, allow_download=False)
+        _import_simulator_modules()
+        catalog_url = HYG_URL
+        catalog_path = HYG_PATH
+        with profiler.phase("load star catalog"):
+            self.catalog = SkyCatalog(catalog_url, catalog_path, max_stars=5000, allow_download=False)
         self.catalog_url = catalog_url
         self.catalog_path = catalog_path
 
-        self.mount = MountSystem()
-        self.anim_timer = QTimer()
-        self.anim_timer.timeout.connect(self.animate_step)
-        self.animating = False
-        self.steps = 30
-        self.anim_epsilon = 1e-3
-
-        self.command_file = os.path.join(os.path.dirname(__file__), "p.txt")
-        self.last_external_command = ""
-        self.command_poll_timer = QTimer(self)
-        self.command_poll_timer.timeout.connect(self.poll_external_command)
-        self.command_poll_timer.start(800)
+        # State, motion and the device servers live in the core; the window mirrors it.
+        # Servers and commands from the local channel (see core.command_channel.send_commands)
+        # reach it through gui_call, so the core is only ever touched on this thread.
+        self.core = TelescopeCore(
+            dispatch=self.gui_call.emit,
+            resolver=_get_celestial_coordinates,
+            interpret=_ask_ai,
+            announce=speech,
+        )
+        # Last known site right away; GPS (--nmea=DEVICE), data/location.txt and the IP
+        # lookup report in the background and reach the core through gui_call.
+        self.location = LocationProvider(
+            lambda lat, lon, source: self.gui_call.emit(lambda: self.core.set_location(lat, lon)),
+            default_sources(nmea_device=_argv_option("--nmea")),
+        )
+        cached = self.location.cached()
+        if cached is not None:
+            self.core.set_location(cached[0], cached[1])
+        # --log=info,bridge=debug,console=warning sets per-subsystem log levels (see core.log).
+        if _argv_option("--log"):
+            from core.log import logs, parse_levels
+
+            logs.configure(*parse_levels(_argv_option("--log")))
+        # --time=2026-10-18T22:00Z and --rate=60 rehearse another night, faster.
+        if _argv_option("--time"):
+            self.core.clock.seek(_argv_option("--time"))
+        if _argv_option("--rate"):
+            self.core.clock.set_rate(float(_argv_option("--rate")))
+        self.core.state.subscribe(self.on_state_change)
+        self.mount = self.core.mount
+        self.core_timer = QTimer(self)
+        self.core_timer.timeout.connect(self.core.tick)
+        self._shown_orientation = None
+
+        self.satellite_overlay_timer = QTimer(self)
+        self.satellite_overlay_timer.timeout.connect(self.refresh_satellite_overlay)
+        self.clock_timer = QTimer(self)
+        self.clock_timer.timeout.connect(self.update_clock_label)
+        self.metrics_timer = QTimer(self)
+        self.metrics_timer.timeout.connect(self.update_metrics_overlay)
         
-        self.show_axes_val = True
-        self.show_point_val = True
         self.opengl_available = _setup_opengl_bindings()
-        self.stellarium_bridge = StellariumLX200Bridge(self, host="127.0.0.1", port=10001)
-
-        self.initUI()
+        self.gui_call.connect(self._run_gui_call)
 
-        self.apply_colorful_theme()
+        with profiler.phase("build window"):
+            self.initUI()
+            self.apply_colorful_theme()
 
-        self.sky_map.set_location(self.device_lat, self.device_lon)
+        self.sky_map.set_location(self.core.device_lat, self.core.device_lon)
+        if not self.core.clock.realtime:
+            self.sky_map.follow_clock()
+        self.satellite_overlay_timer.start(2000)
+        self.clock_timer.start(1000)
+        if "--metrics-overlay" in sys.argv:
+            self.metrics_timer.start(1000)
 
         self.apply_preset(1)
         self.plot_telescope()
-        self.stellarium_bridge.start()
+        with profiler.phase("start servers"):
+            self.core.start_services(metrics=metrics.enabled)
+        self.core_timer.start(int(TICK_S * 1000))
+
+        # --record=session.tsr logs the session; --replay=session.tsr [--replay-speed=10] plays one back.
+        if _argv_option("--record"):
+            self.core.start_recording(_argv_option("--record"))
+        if _argv_option("--replay"):
+            self.core.replay(_argv_option("--replay"), speed=float(_argv_option("--replay-speed") or 1.0))
 
         QTimer.singleShot(0, self.initialize_runtime_data)
 
+    def _run_gui_call(self, fn):
+        fn()
+
     def initialize_runtime_data(self):
-        self._refresh_location()
+        self.location.start()
         if not self.catalog.ready:
             threading.Thread(target=self._download_catalog_in_background, daemon=True).start()
-
-    def _refresh_location(self):
-        try:
-            g = geocoder.ip('me', timeout=2.0)
-            if g.ok and g.latlng and len(g.latlng) == 2:
-                self.device_lat, self.device_lon = g.latlng
-        except Exception as exc:
-            print(f"Geolocation lookup failed: {exc}")
-
-        if hasattr(self, "location_label"):
-            self.location_label.setText(
-                f"Device Location: Lat {self.device_lat:.6f}°, Lon {self.device_lon:.6f}°"
-            )
-
-        if hasattr(self, "sky_map"):
-            self.sky_map.set_location(self.device_lat, self.device_lon)
+        if os.path.exists(TLE_PATH):
+            threading.Thread(target=self.core.load_satellites, daemon=True).start()
 
     def _download_catalog_in_background(self):
         bg_catalog = SkyCatalog(self.catalog_url, self.catalog_path, max_stars=5000, allow_download=True)
         if not bg_catalog.ready:
             return
 
-        self.catalog.stars = bg_catalog.stars
-        self.catalog.ready = True
+        self.catalog.adopt(bg_catalog)
         
         QTimer.singleShot(0, self.sky_map.refresh_scene)
 
+    def refresh_satellite_overlay(self):
+        if self.core.satellite_catalog is None:
+            return
+        satellites = self.core.satellite_catalog.visible(self.core.device_lat, self.core.device_lon)
+        self.sky_map.set_satellites(satellites, tracked=self.core.tracked_satellite)
+
+    def on_state_change(self, changed):
+        """Mirror one frame of core state changes (the core flushes them once per tick)."""
+        state = self.core.state
+        if "target" in changed:
+            self._show_orientation(state.target_az, state.target_el)
+        if "point" in changed:
+            self.show_point_checkbox.setChecked(state.show_point)
+        if "axes" in changed:
+            self.show_axes_checkbox.setChecked(state.show_axes)
+        if "location" in changed:
+            self.location_label.setText(
+                f"Device Location: Lat {state.latitude:.6f}°, Lon {state.longitude:.6f}° "
+                f"({self.location.source or 'cached'})"
+            )
+            self.sky_map.set_location(state.latitude, state.longitude)
+        if "clock" in changed:
+            self.update_clock_label()
+            self.sky_map.follow_clock()
+        if changed & {"satellite", "clock"} and self.core.satellite_catalog is not None:
+            self.refresh_satellite_overlay()
+        if changed & {"mount", "point", "axes"}:
+            self.plot_telescope_final()
+
+    def update_clock_label(self):
+        self.clock_label.setText(f"Sky Time: {self.core.clock.describe()}")
+
+    def update_metrics_overlay(self):
+        rows = [f"{'section':<24}{'calls':>7}{'p50 ms':>9}{'p95 ms':>9}{'max ms':>9}"]
+        for section, count, p50, p95, largest in metrics.summary():
+            rows.append(f"{section:<24}{count:>7}{p50 * 1000:>9.2f}{p95 * 1000:>9.2f}{largest * 1000:>9.2f}")
+        self.metrics_overlay.setText("\n".join(rows))
+        self.metrics_overlay.adjustSize()
+        self.metrics_overlay.show()
+
     def apply_colorful_theme(self):
         self.setStyleSheet(
             """
@@ -987,7 +733,7 @@ class Newtonian_TelescopeApp(QMainWindow):
 
         view_layout = QHBoxLayout()
 
-        self.sky_map = SkyMapWidget(self.catalog, on_pick=self.on_sky_pick)
+        self.sky_map = SkyMapWidget(self.catalog, on_pick=self.on_sky_pick, clock=self.core.clock)
         self.sky_map.setSizePolicy(QSizePolicy.Preferred, QSizePolicy.Expanding)
         self.sky_map.setMinimumWidth(320)
 
@@ -1007,6 +753,14 @@ class Newtonian_TelescopeApp(QMainWindow):
             )
             self.gl_view.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
 
+        self.metrics_overlay = QLabel(self.sky_map)
+        self.metrics_overlay.setAttribute(Qt.WA_TransparentForMouseEvents)
+        self.metrics_overlay.setStyleSheet(
+            "color: #9ad0ff; background-color: rgba(0,0,0,160); font-family: monospace; font-size: 9px; padding: 3px;"
+        )
+        self.metrics_overlay.move(4, 4)
+        self.metrics_overlay.hide()
+
         view_layout.addWidget(self.sky_map, 1)
         view_layout.addWidget(self.gl_view, 2)
 
@@ -1015,11 +769,16 @@ class Newtonian_TelescopeApp(QMainWindow):
         bottom_layout = QHBoxLayout()
 
         self.location_label = QLabel(
-            f"Device Location: Lat {self.device_lat:.6f}°, Lon {self.device_lon:.6f}°"
+            f"Device Location: Lat {self.core.device_lat:.6f}°, Lon {self.core.device_lon:.6f}°"
         )
         self.location_label.setStyleSheet("color: white; font-size: 10px;")
         bottom_layout.addWidget(self.location_label, alignment=Qt.AlignLeft)
 
+        self.clock_label = QLabel()
+        self.clock_label.setStyleSheet("color: white; font-size: 10px;")
+        bottom_layout.addWidget(self.clock_label, alignment=Qt.AlignCenter)
+        self.update_clock_label()
+
         self.watermark_label = QLabel("Powered by Neutonians")
         self.watermark_label.setStyleSheet("color: white; font-size: 10px; font-style: italic; letter-spacing: 3px;")
         bottom_layout.addWidget(self.watermark_label, alignment=Qt.AlignRight)
@@ -1049,6 +808,7 @@ class Newtonian_TelescopeApp(QMainWindow):
         self.el_min.setValue(0)
 
         self.plot_button = QPushButton("Simulate")
+        self.plot_button.clicked.connect(self.core.stop_satellite_tracking)
         self.plot_button.clicked.connect(self.plot_telescope)
 
         self.show_axes_checkbox = QCheckBox("Show Axes")
@@ -1098,37 +858,33 @@ class Newtonian_TelescopeApp(QMainWindow):
 
         layout.addLayout(controls)
 
-    def update_and_plot(self):
-        az = self.az_deg.value() + self.az_min.value() / 60
-        el = self.el_deg.value() + self.el_min.value() / 60
-        self.mount.azimuth = az
-        self.mount.elevation = el
-        self.plot_telescope()
-
     def on_sky_pick(self, az, el):
-        self.set_orientation(az, el)
-        self.plot_telescope()
+        self.core.stop_satellite_tracking()
+        self.core.slew_to(az, el)
 
     def toggle_axes(self, state):
-        self.show_axes_val = bool(state)
-        if hasattr(self, "gl_view"):
-            self.gl_view.show_axes = self.show_axes_val
-            self.gl_view.update()
+        self.core.state.show_axes = bool(state)
 
     def toggle_point(self, state):
-        self.show_point_val = bool(state)
-        if hasattr(self, "gl_view"):
-            self.gl_view.show_point = self.show_point_val
-            self.gl_view.update()
-        self.plot_telescope()
+        if bool(state) != self.core.show_point:
+            self.core.set_show_point(bool(state))
 
     def set_orientation(self, az, el):
+        self.core.set_orientation(az, el)
+        self._show_orientation(az, el)
+
+    def _show_orientation(self, az, el):
         az_deg, az_min = divmod(int(az * 60), 60)
         el_deg, el_min = divmod(int(el * 60), 60)
         self.az_deg.setValue(az_deg)
         self.az_min.setValue(az_min)
         self.el_deg.setValue(el_deg)
         self.el_min.setValue(el_min)
+        # The boxes only hold whole arc minutes; keep the exact angles for plot_telescope.
+        self._shown_orientation = (self._entered_orientation(), (az, el))
+
+    def _entered_orientation(self):
+        return (self.az_deg.value(), self.az_min.value(), self.el_deg.value(), self.el_min.value())
 
     def apply_preset(self, index):
         if index == 1:   # Polaris
@@ -1150,7 +906,7 @@ class Newtonian_TelescopeApp(QMainWindow):
         self.voice_button.setEnabled(False)
         QApplication.processEvents()
         
-        command = takeCommand()
+        command = _ai().takeCommand()
         if command != "None":
             self.execute_text_command(command)
         
@@ -1159,101 +915,16 @@ class Newtonian_TelescopeApp(QMainWindow):
 
     def execute_text_command(self, command):
         """Execute a natural language command and apply telescope updates."""
-        result = parse_telescope_command(command, self.device_lat, self.device_lon)
-
-        if len(result) == 4:
-            cmd_type, az, el, obj_name = result
-        else:
-            cmd_type, az, el = result[:3]
-            obj_name = None
-
-        if cmd_type == "toggle_point":
-            # az carries the requested point visibility for toggle commands.
-            show_point = az
-            self.show_point_checkbox.setChecked(show_point)
-            if show_point:
-                speech("Point marker enabled")
-            else:
-                speech("Point marker disabled")
-            return True
-
-        if cmd_type in ["preset", "celestial"] and az is not None and el is not None:
-            self.set_orientation(az, el)
-            self.plot_telescope()
-            if cmd_type == "celestial" and obj_name:
-                print(f"Pointing to {obj_name} at Az={az:.2f}°, El={el:.2f}°")
-            return True
-
-        if cmd_type == "manual":
-            if az is not None:
-                self.az_deg.setValue(int(az))
-            if el is not None:
-                self.el_deg.setValue(int(el))
-            self.plot_telescope()
-            speech(f"Telescope positioned at azimuth {az} degrees, elevation {el} degrees")
-            return True
-
-        print(f"Could not interpret command: {command}")
-        speech("Could not interpret command. Please try again.")
-        return False
-
-    def poll_external_command(self):
-        """Read commands from p.txt so external tools (like Jupyter) can drive the UI."""
-        if not os.path.exists(self.command_file):
-            return
-
-        try:
-            with open(self.command_file, "r", encoding="utf-8") as handle:
-                raw_command = handle.read().strip()
-        except OSError:
-            return
-
-        if not raw_command:
-            return
-
-        if raw_command == self.last_external_command:
-            return
-
-        self.last_external_command = raw_command
-        print(f"External command received: {raw_command}")
-        self.execute_text_command(raw_command)
-
-        try:
-            with open(self.command_file, "w", encoding="utf-8") as handle:
-                handle.write("")
-        except OSError:
-            pass
+        return self.core.execute_command(command)
 
     def plot_telescope(self):
-        target_az = self.az_deg.value() + self.az_min.value() / 60
-        target_el = self.el_deg.value() + self.el_min.value() / 60
-
-        if (
-            abs(self.mount.azimuth - target_az) <= self.anim_epsilon
-            and abs(self.mount.elevation - target_el) <= self.anim_epsilon
-        ):
-            self.mount.azimuth = target_az
-            self.mount.elevation = target_el
-            self.plot_telescope_final()
-            return
-
-        if self.animating:
-            self.anim_timer.stop()
-            self.animating = False
-
-        self.start_az = self.mount.azimuth
-        self.start_el = self.mount.elevation
-        self.target_az = target_az
-        self.target_el = target_el
-
-        self.current_step = 0
-        self.animating = True
-        self.anim_timer.start(20)
-
-        if hasattr(self, "gl_view"):
-            self.gl_view.show_axes = self.show_axes_val
-            self.gl_view.show_point = self.show_point_val
-            self.gl_view.update()
+        """Slew to the angles entered in the spin boxes."""
+        entered = self._entered_orientation()
+        if self._shown_orientation is not None and self._shown_orientation[0] == entered:
+            self.core.set_orientation(*self._shown_orientation[1])
+        else:
+            self.core.set_orientation(entered[0] + entered[1] / 60, entered[2] + entered[3] / 60)
+        self.core.plot_telescope()
 
     def toggle_fullscreen(self, value=None):
         if value is None:
@@ -1266,50 +937,48 @@ class Newtonian_TelescopeApp(QMainWindow):
         else:
             self.showNormal()
 
-    def animate_step(self):
-        t = self.current_step / self.steps
-        t = t * t * (3-2*t)
-
-        az = self.start_az + (self.target_az - self.start_az) * t
-        el = self.start_el + (self.target_el - self.start_el) * t
-
-        self.mount.azimuth = az
-        self.mount.elevation = el
-
-        if hasattr(self, "gl_view"):
-            self.gl_view.show_axes = self.show_axes_val
-            self.gl_view.show_point = self.show_point_val
-            self.gl_view.update()
-
-        self.current_step += 1
-        if self.current_step > self.steps:
-            self.anim_timer.stop()
-            self.animating = False
-
-            self.mount.azimuth = self.target_az
-            self.mount.elevation = self.target_el
-            self.plot_telescope_final()
-    
     def plot_telescope_final(self):
         if hasattr(self, "gl_view"):
-            self.gl_view.show_axes = self.show_axes_val
-            self.gl_view.show_point = self.show_point_val
+            self.gl_view.show_axes = self.core.state.show_axes
+            self.gl_view.show_point = self.core.state.show_point
             self.gl_view.update()
 
     def closeEvent(self, event):
-        self.stellarium_bridge.stop()
+        self.location.stop()
+        self.core.stop_replay()
+        self.core.stop_recording()
+        self.core.stop_services()
         super().closeEvent(event)
 
-if __name__ == "__main__":
-    app = QApplication(sys.argv)
+def _login_on_screen():
+    profiler.mark("login on screen")
+    profiler.report("Startup profile: login window")
+    # Import the simulator while the user types; the window itself is built on login.
+    threading.Thread(target=_import_simulator_modules, name="preload", daemon=True).start()
+
+
+def _open_simulator(fullscreen):
+    global window
+    profiler.mark("login accepted")
     window = Newtonian_TelescopeApp()
     icon_path = os.path.join(os.path.dirname(__file__), 'Image', 'telescope.ico')
     if os.path.exists(icon_path):
         window.setWindowIcon(QIcon(icon_path))
+    window.showFullScreen() if fullscreen else window.show()
+    loging.close()
+    profiler.mark("simulator window shown")
+    profiler.report("Startup profile: simulator window")
+
+
+if __name__ == "__main__":
+    app = QApplication(sys.argv)
+    profiler.mark("QApplication")
     loging = LoginWindow()
+    profiler.mark("build login window")
     fullscreen_flag = "fullscreen" in sys.argv
-    loging.login_successful.connect(lambda f=fullscreen_flag: (window.showFullScreen() if f else window.show(), loging.close()))
+    loging.login_successful.connect(lambda f=fullscreen_flag: _open_simulator(f))
     loging.show()
+    QTimer.singleShot(0, _login_on_screen)
     #window.show()
     sys.exit(app.exec_())
 
@@ -0,0 +1,103 @@
+"""Alpaca polling throughput over keep-alive connections.
+
+Starts the Alpaca server in-process over a headless app (or targets --url) and
+has N client threads poll RA/Dec/Alt/Az getters on persistent HTTP/1.1
+connections, checking every reply and reporting requests/s and latency.
+
+    python tools/bench_alpaca_client.py --clients 8 --duration 5
+"""
+import http.client
+import json
+import os
+import sys
+import threading
+import time
+from urllib.parse import urlsplit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+GETTERS = ["rightascension", "declination", "altitude", "azimuth", "tracking", "slewing"]
+
+
+def poll(host, port, stop_at, latencies, errors, client_id):
+    conn = http.client.HTTPConnection(host, port, timeout=5)
+    transaction = 0
+    local = []
+    try:
+        while time.monotonic() < stop_at:
+            member = GETTERS[transaction % len(GETTERS)]
+            transaction += 1
+            started = time.perf_counter()
+            conn.request("GET", f"/api/v1/telescope/0/{member}?ClientID={client_id}&ClientTransactionID={transaction}")
+            response = conn.getresponse()
+            payload = json.loads(response.read())
+            local.append(time.perf_counter() - started)
+            if response.status != 200 or payload.get("ErrorNumber") or payload.get("ClientTransactionID") != transaction:
+                errors.append((member, response.status, payload))
+    except (OSError, http.client.HTTPException) as exc:
+        errors.append(("connection", 0, str(exc)))
+    finally:
+        conn.close()
+        latencies.extend(local)
+
+
+def start_local_server(port):
+    from loadtest_bridge import _HeadlessApp
+    from core.alpaca import AlpacaServer, AlpacaTelescope
+    from core.mount import MountDriver, PositionCache
+
+    app = _HeadlessApp(52.0, 21.0)
+    device = AlpacaTelescope(app, PositionCache(app.mount), MountDriver(app.mount), goto=lambda ra, dec: None)
+    server = AlpacaServer(device, port=port)
+    server.start()
+    return server
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark Alpaca getter polling.")
+    parser.add_argument("--clients", type=int, default=4)
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--port", type=int, default=11131)
+    parser.add_argument("--url", help="base URL of a running server, e.g. http://127.0.0.1:11111")
+    args = parser.parse_args()
+
+    server = None
+    if args.url:
+        parts = urlsplit(args.url)
+        host, port = parts.hostname, parts.port or 80
+    else:
+        host, port = "127.0.0.1", args.port
+        server = start_local_server(port)
+
+    latencies, errors = [], []
+    stop_at = time.monotonic() + args.duration
+    started = time.monotonic()
+    threads = [
+        threading.Thread(target=poll, args=(host, port, stop_at, latencies, errors, i + 1))
+        for i in range(args.clients)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.monotonic() - started
+    if server is not None:
+        server.stop()
+
+    values = np.array(latencies) * 1000.0
+    print(f"{args.clients} keep-alive clients for {args.duration:g}s: {len(values)} requests, {len(values) / wall:.0f} req/s")
+    if len(values):
+        p50, p90, p99 = np.percentile(values, [50, 90, 99])
+        print(f"latency p50 {p50:.2f} ms  p90 {p90:.2f} ms  p99 {p99:.2f} ms  max {values.max():.2f} ms")
+    print(f"errors: {len(errors)}")
+    for error in errors[:5]:
+        print(f"  {error}")
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,89 @@
+"""Throughput of the bridge frame parsers in MB/s, next to the original bytes/str versions.
+
+    python tools/bench_bridge_parsers.py --megabytes 8 --chunk 1024
+"""
+import os
+import struct
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.bridge_protocol import LX200FrameParser, NativeFrameParser
+from fuzz_bridge_parsers import reference_native
+
+
+def legacy_lx200(chunks):
+    """The bridge's original str-rebuilding '#' splitter."""
+    buffer = ""
+    count = 0
+    for chunk in chunks:
+        buffer += chunk.decode("ascii", errors="ignore")
+        while "#" in buffer:
+            end = buffer.find("#")
+            cmd = buffer[:end].strip()
+            buffer = buffer[end + 1:]
+            if cmd.startswith(":"):
+                cmd = cmd[1:]
+            if cmd:
+                count += 1
+    return count
+
+
+def drive(parser, chunks):
+    """Feed chunks the way the bridge does: recv into writable(), commit, parse."""
+    count = 0
+    for chunk in chunks:
+        view = memoryview(chunk)
+        while view:
+            target = parser.writable()
+            size = min(len(target), len(view))
+            target[:size] = view[:size]
+            parser.commit(size)
+            view = view[size:]
+            count += len(parser.parse())
+    return count
+
+
+def legacy_native(chunks):
+    return len(reference_native(chunks))
+
+
+def timed(label, fn, total_bytes):
+    started = time.perf_counter()
+    frames = fn()
+    elapsed = time.perf_counter() - started
+    print(f"{label:<34} {total_bytes / elapsed / 1e6:9.1f} MB/s  ({frames} frames)")
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark the bridge frame parsers.")
+    parser.add_argument("--megabytes", type=float, default=4.0)
+    parser.add_argument("--chunk", type=int, default=1024, help="bytes per simulated recv")
+    parser.add_argument("--skip-legacy", action="store_true", help="only time the new parsers")
+    args = parser.parse_args()
+
+    size = int(args.megabytes * 1e6)
+    chunk = args.chunk
+
+    goto = struct.pack("<hhqIi", 20, 0, 0, 0x40000000, 0x0E38E38E)
+    native = (goto * (size // len(goto) + 1))[:size]
+    garbage = bytes([0xFF, 0x7F]) * (size // 2)
+    lx200 = (b":GR#:GD#:Sr05:34:32#:Sd+22*00:52#:MS#" * (size // 36 + 1))[:size]
+
+    cases = [
+        ("native goto stream", native, NativeFrameParser, legacy_native),
+        ("native garbage (resync)", garbage, NativeFrameParser, legacy_native),
+        ("lx200 pipelined commands", lx200, LX200FrameParser, legacy_lx200),
+    ]
+    for label, data, parser_cls, legacy in cases:
+        chunks = [data[i:i + chunk] for i in range(0, len(data), chunk)]
+        timed(f"{label} [memoryview]", lambda: drive(parser_cls(), chunks), len(data))
+        if not args.skip_legacy:
+            timed(f"{label} [legacy]", lambda: legacy(chunks), len(data))
+
+
+if __name__ == "__main__":
+    main()
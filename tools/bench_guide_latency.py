@@ -0,0 +1,99 @@
+"""Latency from sending an LX200 guide command to the mount actually moving.
+
+Runs the bridge in-process with a headless app, sends pulse guides and
+continuous-move commands over TCP, and spins on ``mount.version`` to time when
+the change lands. Also times :GA#/:GZ# round trips.
+
+    python tools/bench_guide_latency.py --pulses 500
+"""
+import os
+import socket
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from loadtest_bridge import _HeadlessApp
+from core.stellarium_bridge import StellariumLX200Bridge
+
+
+def wait_for_change(mount, version, timeout=1.0):
+    deadline = time.perf_counter() + timeout
+    while mount.version == version:
+        if time.perf_counter() > deadline:
+            return None
+    return time.perf_counter()
+
+
+def read_until_hash(conn):
+    data = b""
+    while not data.endswith(b"#"):
+        data += conn.recv(64)
+    return data
+
+
+def summarize(label, samples):
+    values = np.array([s for s in samples if s is not None]) * 1000.0
+    lost = sum(1 for s in samples if s is None)
+    if not len(values):
+        print(f"{label:<22} no samples")
+        return
+    p50, p90, p99 = np.percentile(values, [50, 90, 99])
+    print(f"{label:<22} n={len(values):<5} p50 {p50:6.3f} ms  p90 {p90:6.3f} ms  p99 {p99:6.3f} ms  max {values.max():6.3f} ms"
+          + (f"  ({lost} never applied)" if lost else ""))
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark LX200 guide-pulse latency through the bridge.")
+    parser.add_argument("--pulses", type=int, default=300)
+    parser.add_argument("--port", type=int, default=10932)
+    args = parser.parse_args()
+
+    app = _HeadlessApp(52.0, 21.0)
+    sys.stdout, console = open(os.devnull, "w"), sys.stdout      # the bridge logs every command
+    bridge = StellariumLX200Bridge(app, host="127.0.0.1", port=args.port)
+    bridge.start()
+    time.sleep(0.5)
+
+    conn = socket.create_connection(("127.0.0.1", args.port))
+    conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    conn.sendall(b":GVP#")
+    read_until_hash(conn)
+
+    mount = app.mount
+    pulse, move, readout = [], [], []
+    directions = "nsew"
+    for i in range(args.pulses):
+        version = mount.version
+        started = time.perf_counter()
+        conn.sendall(f":Mg{directions[i % 4]}0020#".encode("ascii"))
+        applied = wait_for_change(mount, version)
+        pulse.append(None if applied is None else applied - started)
+
+        if i % 10 == 0:
+            version = mount.version
+            started = time.perf_counter()
+            conn.sendall(b":Me#")
+            applied = wait_for_change(mount, version)
+            move.append(None if applied is None else applied - started)
+            conn.sendall(b":Q#")
+
+        started = time.perf_counter()
+        conn.sendall(b":GA#" if i % 2 else b":GZ#")
+        read_until_hash(conn)
+        readout.append(time.perf_counter() - started)
+
+    conn.close()
+    bridge.stop()
+    sys.stdout = console
+    summarize("pulse guide -> mount", pulse)
+    summarize(":Me# -> first step", move)
+    summarize(":GA#/:GZ# round trip", readout)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,354 @@
+"""Reproducible benchmark suite for the catalog, sky map, bridge protocol and command parsing.
+
+Every case runs on fixed inputs: a seeded HYG-format snapshot written at start
+(or a real catalog with --catalog), a simulation clock frozen at FROZEN_TIME,
+and synthetic LX200/native socket streams. Each run is appended to a JSON
+lines history; a case is flagged when its best time is more than --threshold
+percent slower than the median of the previous --window runs on this machine
+with the same inputs, and the exit status is then 1.
+
+    python tools/benchmark.py
+    python tools/benchmark.py --only bridge --repeat 9 --threshold 10
+    python tools/benchmark.py --no-save --catalog data/hyg_v42.csv.gz
+
+Cases needing the ephemeris load de421.bsp from the working directory like the
+app does. The voice wrappers in ai.py (parse_telescope_command,
+get_celestial_coordinates) add only speech and OpenAI calls around
+core.commands, so the suite times parse_command and locate_object directly.
+"""
+import contextlib
+import datetime
+import gzip
+import json
+import math
+import os
+import platform
+import random
+import statistics
+import struct
+import subprocess
+import sys
+import tempfile
+import timeit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from bench_bridge_parsers import drive
+from loadtest_bridge import _HeadlessApp
+
+
+HISTORY_PATH = os.path.join(ROOT, "data", "benchmarks.jsonl")
+FROZEN_TIME = "2025-03-20T21:00:00Z"
+SITE = (52.2297, 21.0122)
+SNAPSHOT_SEED = 42
+HYG_COLUMNS = ["id", "proper", "bayer", "gl", "ra", "dec", "dist", "pmra", "pmdec", "rv", "mag"]
+GREEK = ["Alp", "Bet", "Gam", "Del", "Eps", "Zet", "Eta", "The"]
+
+LX200_STREAM = b":GR#:GD#:Sr05:34:32#:Sd+22*00:52#:MS#:GA#:GZ#:Mgn0500#:Q#"
+LX200_COMMANDS = ["GR", "GD", "Sr05:34:32", "Sd+22*00:52", "MS", "GA", "GZ", "Mgn0500", "Q", "GVP"]
+TEXT_COMMANDS = [
+    "point at polaris", "azimuth 120 elevation 35", "show point", "hide marker",
+    "satellite iss", "time warp 60", "set time 2025-03-20 21:00", "pause time",
+    "go to the moon", "track jupiter", "horizon south", "asteroid ceres", "what is that",
+]
+OBJECTS = ["moon", "sun", "mars", "jupiter", "saturn", "venus"]
+
+
+def write_snapshot(path, stars=120000, seed=SNAPSHOT_SEED):
+    """Write a deterministic HYG-format catalog (byte-identical for a given seed and size)."""
+    rng = random.Random(seed)
+    with open(path, "wb") as raw, gzip.GzipFile(fileobj=raw, mode="wb", mtime=0) as packed:
+        lines = [",".join(HYG_COLUMNS), "0,Sol,,,0.000000,0.000000,0.0000,0.00,0.00,0.0,-26.700"]
+        for index in range(1, stars + 1):
+            ra = rng.uniform(0.0, 24.0)
+            dec = math.degrees(math.asin(rng.uniform(-1.0, 1.0)))
+            # Star counts grow roughly 10**(0.35 m) towards faint magnitudes, like HYG's.
+            mag = min(21.0, 15.0 - rng.expovariate(0.8))
+            dist = 100000.0 if rng.random() < 0.05 else rng.uniform(1.3, 1000.0)
+            pmra = rng.gauss(0.0, 60.0)
+            pmdec = rng.gauss(0.0, 60.0)
+            rv = "" if rng.random() < 0.6 else f"{rng.gauss(0.0, 25.0):.1f}"
+            proper = f"Star {index}" if mag < 2.5 else ""
+            bayer = f"{GREEK[index % len(GREEK)]}{index % 88}" if mag < 5.0 else ""
+            gl = f"Gl {index}" if dist < 25.0 else ""
+            lines.append(f"{index},{proper},{bayer},{gl},{ra:.6f},{dec:.6f},{dist:.4f},"
+                         f"{pmra:.2f},{pmdec:.2f},{rv},{mag:.3f}")
+        packed.write(("\n".join(lines) + "\n").encode("utf-8"))
+
+
+def frozen_clock():
+    from core.clock import SimulationClock, parse_time
+
+    clock = SimulationClock(start=parse_time(FROZEN_TIME).timestamp())
+    clock.pause()
+    return clock
+
+
+def socket_chunks(pattern, size, chunk=1024):
+    """A recorded-looking byte stream: ``pattern`` repeated to ``size`` bytes, cut into recv() chunks."""
+    data = (pattern * (size // len(pattern) + 1))[:size]
+    return [data[i:i + chunk] for i in range(0, len(data), chunk)]
+
+
+# Each case takes the shared inputs and returns (fn, calls per fn() run); times are reported per call.
+
+def case_catalog_load(inputs):
+    from core.catalog import SkyCatalog
+
+    catalog = SkyCatalog("", inputs["catalog"], max_stars=5000, allow_download=False)
+    if not catalog.ready:
+        raise RuntimeError(f"catalog {inputs['catalog']} did not load")
+    return catalog.load, 1
+
+
+def case_sky_map_refresh(inputs):
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PyQt5.QtWidgets import QApplication
+    import main
+    from core.catalog import SkyCatalog
+
+    inputs["qt_app"] = QApplication.instance() or QApplication([sys.argv[0]])
+    main._import_simulator_modules()
+    catalog = SkyCatalog("", inputs["catalog"], max_stars=5000, allow_download=False)
+    widget = main.SkyMapWidget(catalog, clock=inputs["clock"])
+    widget.refresh_timer.stop()
+    widget.lat, widget.lon = SITE
+    widget.refresh_scene()          # propagates the catalog to the frozen epoch once, as the app does at start
+    return widget.refresh_scene, 1
+
+
+def _bridge(inputs):
+    if "bridge" not in inputs:
+        from core.stellarium_bridge import StellariumLX200Bridge
+
+        inputs["bridge"] = StellariumLX200Bridge(_HeadlessApp(*SITE), clock=inputs["clock"])
+    return inputs["bridge"]
+
+
+def case_bridge_lx200_parse(inputs):
+    from core.bridge_protocol import LX200FrameParser
+
+    chunks = socket_chunks(LX200_STREAM, 1 << 20)
+    frames = drive(LX200FrameParser(), chunks)
+    return (lambda: drive(LX200FrameParser(), chunks)), frames
+
+
+def case_bridge_native_parse(inputs):
+    from core.bridge_protocol import NativeFrameParser
+
+    goto = struct.pack("<hhqIi", 20, 0, 0, 0x40000000, 0x0E38E38E)
+    chunks = socket_chunks(goto, 1 << 20)
+    frames = drive(NativeFrameParser(), chunks)
+    return (lambda: drive(NativeFrameParser(), chunks)), frames
+
+
+def case_bridge_native_encode(inputs):
+    bridge = _bridge(inputs)
+
+    def run():
+        for _ in range(1000):
+            bridge._encode_stellarium_packet()
+    return run, 1000
+
+
+def case_bridge_native_decode(inputs):
+    bridge = _bridge(inputs)
+    rng = random.Random(SNAPSHOT_SEED)
+    packets = [struct.pack("<hhqIi", 20, 0, 0, rng.getrandbits(32), rng.randint(-2**30, 2**30))
+               for _ in range(1000)]
+
+    def run():
+        for packet in packets:
+            bridge._decode_stellarium_goto_packet(packet)
+    return run, len(packets)
+
+
+def case_bridge_lx200_commands(inputs):
+    bridge = _bridge(inputs)
+
+    def run():
+        session = {"ra": None, "dec": None}
+        for command in LX200_COMMANDS:
+            bridge._handle_command(command, session)
+    return run, len(LX200_COMMANDS)
+
+
+def case_parse_command(inputs):
+    from core.commands import parse_command
+
+    lat, lon = SITE
+
+    def resolver(name, latitude, longitude, when):
+        return (180.0, 45.0)
+
+    def run():
+        for text in TEXT_COMMANDS:
+            parse_command(text, lat, lon, inputs["when"], resolver=resolver)
+    return run, len(TEXT_COMMANDS)
+
+
+def case_locate_object(inputs):
+    from core.commands import locate_object
+
+    lat, lon = SITE
+    locate_object("moon", lat, lon, inputs["when"])
+
+    def run():
+        for name in OBJECTS:
+            locate_object(name, lat, lon, inputs["when"])
+    return run, len(OBJECTS)
+
+
+CASES = [
+    ("catalog_load", case_catalog_load),
+    ("sky_map_refresh", case_sky_map_refresh),
+    ("bridge_lx200_parse", case_bridge_lx200_parse),
+    ("bridge_native_parse", case_bridge_native_parse),
+    ("bridge_native_encode", case_bridge_native_encode),
+    ("bridge_native_decode", case_bridge_native_decode),
+    ("bridge_lx200_commands", case_bridge_lx200_commands),
+    ("parse_command", case_parse_command),
+    ("locate_object", case_locate_object),
+]
+
+
+def measure(fn, calls, repeat, min_time):
+    """(best, median) seconds per call over ``repeat`` samples of at least ``min_time`` each."""
+    timer = timeit.Timer(fn)
+    number = 1
+    while number < 1 << 20 and timer.timeit(number) < min_time:
+        number *= 2
+    samples = [elapsed / (number * calls) for elapsed in timer.repeat(repeat, number)]
+    return min(samples), statistics.median(samples)
+
+
+def load_history(path):
+    runs = []
+    if not os.path.exists(path):
+        return runs
+    with open(path, "r", encoding="utf-8") as handle:
+        for line in handle:
+            try:
+                runs.append(json.loads(line))
+            except ValueError:
+                continue
+    return runs
+
+
+def baselines(history, run, window):
+    """Per case, the median best time of the last ``window`` comparable runs."""
+    comparable = [past for past in history
+                  if past.get("machine") == run["machine"] and past.get("inputs") == run["inputs"]]
+    result = {}
+    for name in run["results"]:
+        values = [past["results"][name]["best_s"] for past in comparable if name in past.get("results", {})]
+        if values:
+            result[name] = statistics.median(values[-window:])
+    return result
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def _format_time(seconds):
+    if seconds is None:
+        return "-"
+    for unit, scale in (("s", 1.0), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.3f} {unit}"
+    return f"{seconds / 1e-9:.1f} ns"
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run the benchmark suite and compare against past runs.")
+    parser.add_argument("--only", action="append", default=[], help="run cases whose name contains this (repeatable)")
+    parser.add_argument("--repeat", type=int, default=5, help="samples per case")
+    parser.add_argument("--min-time", type=float, default=0.2, help="seconds per sample (calls are batched up to it)")
+    parser.add_argument("--threshold", type=float, default=15.0, help="percent slowdown flagged as a regression")
+    parser.add_argument("--window", type=int, default=5, help="past runs the baseline is the median of")
+    parser.add_argument("--history", default=HISTORY_PATH, help="JSON lines file runs are appended to")
+    parser.add_argument("--no-save", action="store_true", help="compare but do not append this run")
+    parser.add_argument("--stars", type=int, default=120000, help="rows in the generated HYG snapshot")
+    parser.add_argument("--catalog", help="benchmark this HYG file instead of the generated snapshot")
+    parser.add_argument("--list", action="store_true", help="list the cases and exit")
+    args = parser.parse_args()
+
+    if args.list:
+        for name, _ in CASES:
+            print(name)
+        return 0
+
+    selected = [(name, factory) for name, factory in CASES
+                if not args.only or any(part in name for part in args.only)]
+    workdir = tempfile.TemporaryDirectory(prefix="telescope-bench-")
+    if args.catalog:
+        catalog_path = os.path.abspath(args.catalog)
+        catalog_label = f"{os.path.basename(catalog_path)}:{os.path.getsize(catalog_path)}"
+    else:
+        catalog_path = os.path.join(workdir.name, "hyg_snapshot.csv.gz")
+        write_snapshot(catalog_path, args.stars)
+        catalog_label = f"synthetic:{SNAPSHOT_SEED}:{args.stars}"
+
+    clock = frozen_clock()
+    inputs = {"catalog": catalog_path, "clock": clock, "when": clock.time()}
+    run = {
+        "time": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "revision": git_revision(),
+        "machine": f"{platform.node()} {platform.machine()} {platform.python_version()}",
+        "inputs": {"catalog": catalog_label, "clock": FROZEN_TIME},
+        "results": {},
+    }
+
+    skipped = []
+    # The bridge and command parser log every call; keep that out of the timings and the table.
+    with open(os.devnull, "w") as devnull:
+        for name, factory in selected:
+            try:
+                with contextlib.redirect_stdout(devnull):
+                    fn, calls = factory(inputs)
+                    best, median = measure(fn, calls, args.repeat, args.min_time)
+            except Exception as exc:
+                skipped.append((name, exc))
+                continue
+            run["results"][name] = {"best_s": best, "median_s": median}
+    workdir.cleanup()
+
+    history = load_history(args.history)
+    reference = baselines(history, run, args.window)
+    regressions = []
+    print(f"{'case':<24} {'best':>12} {'median':>12} {'baseline':>12} {'change':>8}")
+    for name, result in run["results"].items():
+        baseline = reference.get(name)
+        change = ""
+        if baseline:
+            ratio = result["best_s"] / baseline - 1.0
+            change = f"{ratio * 100.0:+.1f}%"
+            if ratio * 100.0 > args.threshold:
+                regressions.append(name)
+                change += "  REGRESSION"
+        print(f"{name:<24} {_format_time(result['best_s']):>12} {_format_time(result['median_s']):>12} "
+              f"{_format_time(baseline):>12} {change:>8}")
+    for name, exc in skipped:
+        print(f"{name:<24} skipped: {exc}")
+
+    if not args.no_save and run["results"]:
+        os.makedirs(os.path.dirname(os.path.abspath(args.history)), exist_ok=True)
+        with open(args.history, "a", encoding="utf-8") as handle:
+            handle.write(json.dumps(run) + "\n")
+
+    if regressions:
+        print(f"{len(regressions)} case(s) slower than baseline by more than {args.threshold:g}%: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
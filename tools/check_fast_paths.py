@@ -0,0 +1,360 @@
+"""Accuracy and speed of the fast coordinate paths against the reference Skyfield pipeline.
+
+Random (time, site, target) cases are evaluated both ways and compared by the
+angle between the two directions. Each case reports its error distribution in
+arcseconds next to the time per evaluation of either path, and fails when its
+largest error exceeds the budget.
+
+    python tools/check_fast_paths.py
+    python tools/check_fast_paths.py --samples 500 --random-seed
+    python tools/check_fast_paths.py --only satellites --tle data/satellites.tle
+    python tools/check_fast_paths.py --budget satellites=10
+
+Cases:
+  star_projection   SkyCatalog.positions_at (vectorized space motion, epoch
+                    cached) fed to a motionless Star, as SkyMapWidget.refresh_scene
+                    does, against Star with proper motion, parallax and
+                    radial velocity.
+  bridge_radec      The RA/Dec the bridge reports (PositionCache, filled up to
+                    one quantum earlier), sent back through radec_to_altaz (the
+                    goto path), against the mount's actual pointing.
+  satellites        SatelliteCatalog.track_position (sgp4 + IAU-82 GMST) against
+                    skyfield's EarthSatellite, within two days of each TLE epoch.
+  minor_planets     MinorPlanetCatalog.altaz (two-body Kepler, one light-time
+                    step, first-order aberration) against skyfield's MPC orbits
+                    observed from the same site. Needs pandas.
+
+Run from a directory holding de421.bsp (as the app is). Cases run on seeded
+fixtures unless real data is given: the HYG snapshot from tools/benchmark.py
+(--catalog), generated TLEs (--tle) and a generated MPCORB.DAT (--mpcorb).
+The seed is fixed, so repeated runs check the same cases; a case that cannot
+run fails the check unless --allow-skip is given.
+"""
+import datetime
+import io
+import math
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from benchmark import write_snapshot
+from loadtest_bridge import _HeadlessApp
+
+
+# Largest tolerated error per case, in arcseconds.
+BUDGETS = {
+    "star_projection": 2.0,         # a sky map pixel is tens of arcseconds
+    "bridge_radec": 2.0,            # a goto read back must return the coordinates sent
+    "satellites": 30.0,             # a fast LEO crosses this in under 10 ms
+    "minor_planets": 2.0,
+}
+START_JD = 2451545.0                # J2000; random times fall within YEARS after it
+YEARS = 49.0                        # de421 ends in 2053
+SECONDS_PER_DAY = 86400.0
+UNIX_EPOCH_JD = 2440587.5
+DEFAULT_SEED = 20250320
+FIXTURE_EPOCH = datetime.datetime(2025, 3, 20, tzinfo=datetime.timezone.utc)
+GAUSS_DEG_PER_DAY = 0.9856076686    # mean motion of a 1 AU orbit
+
+
+def write_tle_fixture(path, count=500, seed=DEFAULT_SEED):
+    """Write ``count`` seeded TLEs from LEO to GEO, all with epoch FIXTURE_EPOCH."""
+    from sgp4.api import Satrec, WGS72
+    from sgp4.exporter import export_tle
+
+    rng = np.random.default_rng(seed)
+    epoch = (FIXTURE_EPOCH - datetime.datetime(1949, 12, 31, tzinfo=datetime.timezone.utc)).total_seconds() / 86400.0
+    lines = []
+    for number in range(1, count + 1):
+        satrec = Satrec()
+        satrec.sgp4init(
+            WGS72, "i", number, epoch,
+            float(rng.uniform(1e-5, 5e-4)), 0.0, 0.0,                  # bstar, ndot, nddot
+            float(rng.uniform(0.0, 0.02)),                             # eccentricity
+            math.radians(rng.uniform(0.0, 360.0)),                     # argument of perigee
+            math.radians(rng.uniform(0.0, 110.0)),                     # inclination
+            math.radians(rng.uniform(0.0, 360.0)),                     # mean anomaly
+            float(rng.choice([rng.uniform(11.0, 16.0), rng.uniform(1.9, 2.1), 1.0027])) * 2.0 * math.pi / 1440.0,
+            math.radians(rng.uniform(0.0, 360.0)),                     # right ascension of the node
+        )
+        line1, line2 = export_tle(satrec)
+        lines.extend([f"FIXTURE {number}", line1, line2])
+    with open(path, "w", encoding="ascii") as handle:
+        handle.write("\n".join(lines) + "\n")
+
+
+def write_mpcorb_fixture(path, count=2000, seed=DEFAULT_SEED):
+    """Write ``count`` seeded main-belt and near-Earth asteroids in MPCORB.DAT's fixed columns."""
+    rng = np.random.default_rng(seed)
+    lines = []
+    for number in range(1, count + 1):
+        a = float(rng.uniform(1.1, 3.5))
+        e = float(rng.uniform(0.0, 0.35 if a > 2.0 else 0.6))
+        mean_motion = GAUSS_DEG_PER_DAY / a ** 1.5
+        name = f"({number}) Fixture {number}"
+        lines.append(
+            f"{number:05d}   {rng.uniform(8.0, 20.0):5.2f} {0.15:5.2f} K2555 {rng.uniform(0.0, 360.0):9.5f}  "
+            f"{rng.uniform(0.0, 360.0):9.5f}  {rng.uniform(0.0, 360.0):9.5f}  {rng.uniform(0.0, 30.0):9.5f}  "
+            f"{e:9.7f} {mean_motion:11.8f} {a:11.7f}  0 E2024-V47  7330 125 1801-2024 0.80 M-v 30k "
+            f"MPCLINUX   0000 {name:<28}20241101"
+        )
+    with open(path, "w", encoding="ascii") as handle:
+        handle.write("\n".join(lines) + "\n")
+
+
+def unit(az_deg, alt_deg):
+    az = np.radians(az_deg)
+    alt = np.radians(alt_deg)
+    return np.stack([np.cos(alt) * np.cos(az), np.cos(alt) * np.sin(az), np.sin(alt)], axis=-1)
+
+
+def separation_arcsec(az1, alt1, az2, alt2):
+    dot = np.sum(unit(az1, alt1) * unit(az2, alt2), axis=-1)
+    return np.atleast_1d(np.degrees(np.arccos(np.clip(dot, -1.0, 1.0))) * 3600.0)
+
+
+def random_site(rng):
+    return float(rng.uniform(-80.0, 80.0)), float(rng.uniform(-180.0, 180.0))
+
+
+def unix_time(ts, unix):
+    # ts.utc(1970, 1, 1, 0, 0, unix) would count leap seconds that unix time does not.
+    return ts.from_datetime(datetime.datetime.fromtimestamp(unix, datetime.timezone.utc))
+
+
+class Stopwatch:
+    def __init__(self):
+        self.seconds = 0.0
+        self.calls = 0
+
+    def __call__(self, fn, *args, **kwargs):
+        started = time.perf_counter()
+        result = fn(*args, **kwargs)
+        self.seconds += time.perf_counter() - started
+        self.calls += 1
+        return result
+
+    @property
+    def per_call(self):
+        return self.seconds / self.calls if self.calls else None
+
+
+# Each case returns (errors in arcsec, fast Stopwatch, reference Stopwatch, evaluations per call).
+
+def case_star_projection(ctx, rng, samples):
+    from skyfield.api import Star, wgs84
+    from core.catalog import SkyCatalog, UNKNOWN_DISTANCE_PC
+
+    catalog = SkyCatalog("", ctx["catalog"], max_stars=5000, allow_download=False)
+    if not catalog.ready:
+        raise RuntimeError(f"catalog {ctx['catalog']} did not load")
+    ts, eph = ctx["ts"], ctx["eph"]
+    parallax = np.where(catalog.dist < UNKNOWN_DISTANCE_PC, 1000.0 / catalog.dist, 0.0)
+    reference_stars = Star(
+        ra_hours=catalog.ra_hours, dec_degrees=catalog.dec_deg,
+        ra_mas_per_year=np.nan_to_num(catalog.pmra), dec_mas_per_year=np.nan_to_num(catalog.pmdec),
+        parallax_mas=parallax, radial_km_per_s=np.nan_to_num(catalog.rv),
+    )
+
+    def fast(observer, t):
+        ra_hours, dec_deg = catalog.positions_at(t)
+        alt, az, _ = observer.observe(Star(ra_hours=ra_hours, dec_degrees=dec_deg)).apparent().altaz()
+        return az.degrees, alt.degrees
+
+    def reference(observer):
+        alt, az, _ = observer.observe(reference_stars).apparent().altaz()
+        return az.degrees, alt.degrees
+
+    errors = []
+    fast_watch, reference_watch = Stopwatch(), Stopwatch()
+    for _ in range(max(3, samples // 50)):
+        t = ts.tt_jd(START_JD + rng.uniform(0.0, YEARS) * 365.25)
+        observer = (eph["earth"] + wgs84.latlon(*random_site(rng))).at(t)
+        az, alt = fast_watch(fast, observer, t)
+        ref_az, ref_alt = reference_watch(reference, observer)
+        errors.append(separation_arcsec(az, alt, ref_az, ref_alt))
+    return np.concatenate(errors), fast_watch, reference_watch, len(catalog)
+
+
+def case_bridge_radec(ctx, rng, samples):
+    from core.clock import SimulationClock
+    from core.mount import PositionCache
+    from core.stellarium_bridge import StellariumLX200Bridge
+
+    clock = SimulationClock()
+    clock.pause()
+    app = _HeadlessApp(0.0, 0.0)
+    bridge = StellariumLX200Bridge(app, clock=clock)
+    exact = PositionCache(app.mount, bridge.ts, quantum_s=0.0, clock=clock)
+
+    errors = []
+    fast_watch, reference_watch = Stopwatch(), Stopwatch()
+    for _ in range(samples):
+        app.device_lat, app.device_lon = random_site(rng)
+        azimuth, elevation = rng.uniform(0.0, 360.0), rng.uniform(5.0, 85.0)
+        app.mount.set_position(azimuth, elevation)
+        # Fill the cache at the start of a quantum, then read it back up to one quantum later.
+        start = (START_JD - UNIX_EPOCH_JD + rng.uniform(0.0, YEARS) * 365.25) * SECONDS_PER_DAY
+        start -= start % bridge.positions.quantum_s
+        clock.seek(start)
+        bridge._current_radec()
+        clock.seek(start + rng.uniform(0.0, bridge.positions.quantum_s * 0.999))
+        ra_hours, dec_degrees = fast_watch(bridge._current_radec)
+        reference_watch(exact.radec, app.device_lat, app.device_lon)
+        goto_az, goto_el = bridge.radec_to_altaz(ra_hours, dec_degrees)
+        errors.append(separation_arcsec(goto_az, goto_el, azimuth, elevation))
+    return np.concatenate(errors), fast_watch, reference_watch, 1
+
+
+def case_satellites(ctx, rng, samples):
+    from skyfield.api import EarthSatellite, wgs84
+    from core.satellites import SatelliteCatalog
+
+    satellites = SatelliteCatalog(ctx["tle"])
+    if not satellites.ready:
+        raise RuntimeError(f"no satellites in {ctx['tle']}")
+    ts = ctx["ts"]
+
+    errors = []
+    fast_watch, reference_watch = Stopwatch(), Stopwatch()
+    for _ in range(samples):
+        index = int(rng.integers(len(satellites)))
+        satrec = satellites.satrecs[index]
+        epoch = (satrec.jdsatepoch + satrec.jdsatepochF - UNIX_EPOCH_JD) * SECONDS_PER_DAY
+        unix = epoch + rng.uniform(-2.0, 2.0) * SECONDS_PER_DAY
+        lat, lon = random_site(rng)
+        located = fast_watch(satellites.track_position, index, lat, lon, unix)
+        if located is None:
+            continue
+        topocentric = EarthSatellite.from_satrec(satrec, ts) - wgs84.latlon(lat, lon)
+        t = unix_time(ts, unix)
+        alt, az, _ = reference_watch(lambda: topocentric.at(t).altaz())
+        errors.append(separation_arcsec(located[0], located[1], az.degrees, alt.degrees))
+    return np.concatenate(errors), fast_watch, reference_watch, 1
+
+
+def case_minor_planets(ctx, rng, samples):
+    from skyfield.api import wgs84
+    from skyfield.constants import GM_SUN_Pitjeva_2005_km3_s2 as GM_SUN
+    from skyfield.data import mpc
+    from core.minor_planets import MinorPlanetCatalog
+
+    path = ctx["mpcorb"]
+    if not os.path.exists(path):
+        raise RuntimeError(f"{path} not found")
+    ts, eph = ctx["ts"], ctx["eph"]
+    catalog = MinorPlanetCatalog(path=path, comet_path=os.devnull,
+                                 cache_path=os.path.join(ctx["workdir"], "minor_planets.npz"), eph=eph)
+    # Asteroids keep MPCORB.DAT's row order; skyfield reads the same rows as the reference.
+    with open(path, "rb") as handle:
+        rows = [line for line in handle if line[:1].strip() and line[:1] not in b"-" and len(line) > 160]
+    rows = rows[:min(len(rows), 5000)]
+    frame = mpc.load_mpcorb_dataframe(io.BytesIO(b"".join(rows)))
+
+    errors = []
+    fast_watch, reference_watch = Stopwatch(), Stopwatch()
+    for _ in range(samples):
+        index = int(rng.integers(len(frame)))
+        t = ts.tt_jd(START_JD + rng.uniform(0.0, YEARS) * 365.25)
+        lat, lon = random_site(rng)
+        az, alt, _, _ = fast_watch(catalog.altaz, lat, lon, t, indices=[index])
+        body = eph["sun"] + mpc.mpcorb_orbit(frame.iloc[index], ts, GM_SUN)
+        observer = eph["earth"] + wgs84.latlon(lat, lon)
+        ref_alt, ref_az, _ = reference_watch(lambda: observer.at(t).observe(body).apparent().altaz())
+        errors.append(separation_arcsec(az[0], alt[0], ref_az.degrees, ref_alt.degrees))
+    return np.concatenate(errors), fast_watch, reference_watch, 1
+
+
+CASES = [
+    ("star_projection", case_star_projection),
+    ("bridge_radec", case_bridge_radec),
+    ("satellites", case_satellites),
+    ("minor_planets", case_minor_planets),
+]
+
+
+def _format_us(seconds):
+    return "-" if seconds is None else f"{seconds * 1e6:.1f}"
+
+
+def main():
+    import argparse
+    from core.commands import ephemeris
+    parser = argparse.ArgumentParser(description="Compare the fast coordinate paths with skyfield.")
+    parser.add_argument("--samples", type=int, default=200, help="random cases per check")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED, help="case generator seed (fixed by default)")
+    parser.add_argument("--random-seed", action="store_true", help="draw a fresh seed; it is printed for reruns")
+    parser.add_argument("--only", action="append", default=[], help="run cases whose name contains this")
+    parser.add_argument("--budget", action="append", default=[], metavar="CASE=ARCSEC",
+                        help="override a case's error budget")
+    parser.add_argument("--catalog", help="HYG file for the star case (default: the seeded snapshot)")
+    parser.add_argument("--tle", help="TLE file for the satellite case (default: generated fixture)")
+    parser.add_argument("--mpcorb", help="MPCORB.DAT for the minor planet case (default: generated fixture)")
+    parser.add_argument("--allow-skip", action="store_true", help="do not fail when a case cannot run")
+    args = parser.parse_args()
+
+    budgets = dict(BUDGETS)
+    for item in args.budget:
+        name, _, value = item.partition("=")
+        budgets[name] = float(value)
+
+    seed = int(np.random.SeedSequence().entropy % (1 << 30)) if args.random_seed else args.seed
+    rng = np.random.default_rng(seed)
+    workdir = tempfile.TemporaryDirectory(prefix="telescope-accuracy-")
+    catalog = args.catalog
+    if catalog is None:
+        catalog = os.path.join(workdir.name, "hyg_snapshot.csv.gz")
+        write_snapshot(catalog, 30000)
+    tle = args.tle
+    if tle is None:
+        tle = os.path.join(workdir.name, "fixture.tle")
+        write_tle_fixture(tle)
+    mpcorb = args.mpcorb
+    if mpcorb is None:
+        mpcorb = os.path.join(workdir.name, "MPCORB.DAT")
+        write_mpcorb_fixture(mpcorb)
+    ts, eph = ephemeris()
+    ctx = {"ts": ts, "eph": eph, "catalog": catalog, "tle": tle, "mpcorb": mpcorb,
+           "workdir": workdir.name}
+
+    failures = []
+    skipped = []
+    print(f"{'case':<16} {'n':>7} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>8} {'budget':>7}"
+          f" {'fast us':>9} {'ref us':>9} {'speedup':>8}")
+    for name, case in CASES:
+        if args.only and not any(part in name for part in args.only):
+            continue
+        try:
+            errors, fast, reference, per_call = case(ctx, rng, args.samples)
+        except Exception as exc:
+            print(f"{name:<16} SKIPPED: {exc}")
+            skipped.append(name)
+            continue
+        p50, p95, p99 = np.percentile(errors, [50, 95, 99])
+        largest = float(errors.max())
+        budget = budgets.get(name, float("inf"))
+        speedup = reference.per_call / fast.per_call if fast.per_call else float("nan")
+        status = "" if largest <= budget else "  OVER BUDGET"
+        if status:
+            failures.append(name)
+        # Vectorized cases evaluate many targets per call; times are per target.
+        print(f"{name:<16} {len(errors):>7} {p50:>8.3f} {p95:>8.3f} {p99:>8.3f} {largest:>8.3f} {budget:>7g}"
+              f" {_format_us(fast.per_call / per_call):>9} {_format_us(reference.per_call / per_call):>9}"
+              f" {speedup:>7.1f}x{status}")
+    workdir.cleanup()
+
+    print(f"seed {seed}: errors in arcseconds, {len(failures)} case(s) over budget"
+          + (f": {', '.join(failures)}" if failures else ""))
+    if skipped:
+        print(f"{len(skipped)} case(s) did not run: {', '.join(skipped)}"
+              + ("" if args.allow_skip else " (failing; pass --allow-skip to accept)"))
+    return 1 if failures or (skipped and not args.allow_skip) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,151 @@
+"""Randomized checks of the bridge frame parsers against straightforward reference parsers.
+
+Streams of valid frames, garbage and truncated frames are cut at random points
+and fed through both implementations; the frames produced must match exactly.
+
+    python tools/fuzz_bridge_parsers.py --iterations 2000 --seed 1
+"""
+import os
+import random
+import struct
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.bridge_protocol import LX200FrameParser, NativeFrameParser
+
+
+LX200_SAMPLES = [":GR#", ":GD#", ":GVP#", ":Sr05:34:32#", ":Sd+22*00:52#", ":MS#", "#", "  :GR  #", ":#"]
+
+
+def reference_native(chunks):
+    """The bridge's original bytes-concatenation framer."""
+    inbound_buffer = b""
+    packets = []
+    for chunk in chunks:
+        inbound_buffer += chunk
+        while len(inbound_buffer) >= 2:
+            packet_len = struct.unpack_from("<h", inbound_buffer, 0)[0]
+            if packet_len < 20 or packet_len > 256:
+                inbound_buffer = inbound_buffer[1:]
+                continue
+            if len(inbound_buffer) < packet_len:
+                break
+            packets.append(inbound_buffer[:packet_len])
+            inbound_buffer = inbound_buffer[packet_len:]
+    return packets
+
+
+def reference_lx200(chunks, max_command):
+    """Split on '#' over the whole stream, dropping commands longer than ``max_command`` bytes."""
+    commands = []
+    for raw in b"".join(chunks).split(b"#")[:-1]:
+        if len(raw) > max_command:
+            continue
+        cmd = raw.decode("ascii", errors="ignore").strip()
+        if cmd.startswith(":"):
+            cmd = cmd[1:]
+        if cmd:
+            commands.append(cmd)
+    return commands
+
+
+def native_stream(rng):
+    parts = []
+    for _ in range(rng.randint(0, 40)):
+        roll = rng.random()
+        if roll < 0.6:
+            length = rng.choice([20, 24, rng.randint(20, 256)])
+            body = bytes(rng.getrandbits(8) for _ in range(length - 4))
+            parts.append(struct.pack("<hh", length, rng.choice([0, 0, 1])) + body)
+        elif roll < 0.9:
+            parts.append(bytes(rng.getrandbits(8) for _ in range(rng.randint(1, 300))))
+        else:
+            # Plausible header followed by a truncated body.
+            parts.append(struct.pack("<h", rng.randint(20, 256)) + bytes(rng.randint(0, 10)))
+    return b"".join(parts)
+
+
+def lx200_stream(rng):
+    parts = []
+    for _ in range(rng.randint(0, 60)):
+        roll = rng.random()
+        if roll < 0.7:
+            parts.append(rng.choice(LX200_SAMPLES).encode("ascii"))
+        elif roll < 0.85:
+            parts.append(bytes(rng.getrandbits(8) for _ in range(rng.randint(1, 40))).replace(b"#", b""))
+        else:
+            parts.append(b"x" * rng.randint(100, 400))
+    return b"".join(parts)
+
+
+def random_chunks(rng, data):
+    chunks = []
+    i = 0
+    while i < len(data):
+        step = rng.choice([1, 2, 7, 64, 1024, 4096, rng.randint(1, 5000)])
+        chunks.append(data[i:i + step])
+        i += step
+    return chunks
+
+
+def run_native(parser, chunks):
+    packets = []
+    for chunk in chunks:
+        view = memoryview(chunk)
+        while view:
+            # Same path as the bridge: write into writable(), commit, parse.
+            target = parser.writable()
+            count = min(len(target), len(view))
+            target[:count] = view[:count]
+            parser.commit(count)
+            view = view[count:]
+            packets.extend(bytes(packet) for packet in parser.parse())
+    return packets
+
+
+def run_lx200(parser, chunks):
+    commands = []
+    for chunk in chunks:
+        commands.extend(parser.feed(chunk))
+    return commands
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Fuzz the bridge frame parsers.")
+    parser.add_argument("--iterations", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    seed = args.seed if args.seed is not None else random.randrange(1 << 30)
+    rng = random.Random(seed)
+    failures = 0
+    for i in range(args.iterations):
+        data = native_stream(rng)
+        chunks = random_chunks(rng, data)
+        expected = reference_native(chunks)
+        got = run_native(NativeFrameParser(), chunks)
+        if got != expected:
+            failures += 1
+            print(f"native mismatch at iteration {i}: {len(got)} packets vs {len(expected)} expected")
+
+        data = lx200_stream(rng)
+        chunks = random_chunks(rng, data)
+        lx200 = LX200FrameParser()
+        got = run_lx200(lx200, chunks)
+        expected = reference_lx200(chunks, lx200.max_command)
+        if got != expected:
+            failures += 1
+            print(f"lx200 mismatch at iteration {i}: {got[:5]} vs {expected[:5]}")
+        if len(lx200) > lx200.max_command:
+            failures += 1
+            print(f"lx200 buffer grew to {len(lx200)} bytes at iteration {i}")
+
+    print(f"seed {seed}: {args.iterations} iterations, {failures} failures")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
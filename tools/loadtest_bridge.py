@@ -0,0 +1,261 @@
+"""Load generator for the Stellarium/LX200 bridge.
+
+Opens N simulated clients against a bridge and reports per-command latency
+percentiles, native packet cadence jitter and server CPU. By default a headless
+bridge is started in a subprocess (so its CPU can be measured apart from the
+load generator); pass --connect to hit an already running app instead.
+
+    python tools/loadtest_bridge.py --lx200 20 --native 20 --idle 200 --duration 15
+    python tools/loadtest_bridge.py --connect 127.0.0.1:10001 --pid 12345
+"""
+import asyncio
+import os
+import random
+import struct
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import numpy as np
+
+
+NATIVE_PACKET = 24
+
+
+class _HeadlessApp:
+    """The few attributes of the telescope app the bridge reads and drives."""
+
+    def __init__(self, lat, lon):
+        from core.mount import MountSystem
+
+        self.device_lat = lat
+        self.device_lon = lon
+        self.mount = MountSystem(azimuth=120.0, elevation=45.0)
+
+    def set_orientation(self, azimuth, elevation):
+        self.mount.azimuth = azimuth
+        self.mount.elevation = elevation
+
+    def plot_telescope(self):
+        pass
+
+
+def serve(port, lat, lon):
+    """Child process: run a bridge and answer 'cpu' requests on stdin with CPU seconds used."""
+    from core.stellarium_bridge import StellariumLX200Bridge
+
+    channel = sys.stdout
+    sys.stdout = open(os.devnull, "w")      # keeps client connect log lines off the result channel
+    bridge = StellariumLX200Bridge(_HeadlessApp(lat, lon), host="127.0.0.1", port=port)
+    bridge.start()
+    time.sleep(0.5)
+    channel.write("ready\n")
+    channel.flush()
+    for line in sys.stdin:
+        if line.strip() == "cpu":
+            times = os.times()
+            channel.write(f"{times.user + times.system} {bridge.positions.hits} {bridge.positions.misses}\n")
+            channel.flush()
+    bridge.stop()
+
+
+def proc_cpu_seconds(pid):
+    """User + system CPU seconds of a process from /proc (Linux only)."""
+    with open(f"/proc/{pid}/stat") as handle:
+        fields = handle.read().rsplit(")", 1)[1].split()
+    return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+
+
+class Stats:
+    def __init__(self):
+        self.latency = {}
+        self.intervals = []
+        self.errors = 0
+        self.bytes_in = 0
+
+    def record(self, command, seconds):
+        self.latency.setdefault(command, []).append(seconds)
+
+
+async def lx200_client(host, port, stats, stop_at, think_s, rng):
+    reader, writer = await asyncio.open_connection(host, port)
+    # (command, reply is a single status character rather than '#'-terminated)
+    script = [("GR", False), ("GD", False), ("GVP", False)]
+    try:
+        while time.monotonic() < stop_at:
+            if rng.random() < 0.1:
+                ra = rng.uniform(0, 24)
+                dec = rng.uniform(-30, 80)
+                steps = [
+                    (f"Sr{int(ra):02d}:{int(ra * 60) % 60:02d}:{int(ra * 3600) % 60:02d}", True),
+                    (f"Sd{'+' if dec >= 0 else '-'}{int(abs(dec)):02d}*{int(abs(dec) * 60) % 60:02d}:00", True),
+                    ("MS", True),
+                ]
+            else:
+                steps = [rng.choice(script)]
+            for command, single in steps:
+                started = time.perf_counter()
+                writer.write(f":{command}#".encode("ascii"))
+                await writer.drain()
+                reply = await (reader.readexactly(1) if single else reader.readuntil(b"#"))
+                stats.record(command[:2] if command[:2] in ("Sr", "Sd") else command, time.perf_counter() - started)
+                stats.bytes_in += len(reply)
+            await asyncio.sleep(think_s)
+    except (OSError, asyncio.IncompleteReadError):
+        stats.errors += 1
+    finally:
+        writer.close()
+
+
+async def native_client(host, port, stats, stop_at, rng, goto_every_s):
+    reader, writer = await asyncio.open_connection(host, port)
+    # Native clients that never write are only classified after the detection
+    # timeout, so announce with a goto packet like Stellarium does on slews.
+    last = None
+    next_goto = time.monotonic()
+    try:
+        while time.monotonic() < stop_at:
+            now = time.monotonic()
+            if goto_every_s > 0 and now >= next_goto:
+                ra_raw = rng.getrandbits(32)
+                dec_raw = int(rng.uniform(-0.2, 0.2) * 4294967296.0)
+                writer.write(struct.pack("<hhqIi", 20, 0, 0, ra_raw, dec_raw))
+                await writer.drain()
+                next_goto = now + goto_every_s
+            remaining = stop_at - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                packet = await asyncio.wait_for(reader.readexactly(NATIVE_PACKET), remaining)
+            except asyncio.TimeoutError:
+                break
+            arrived = time.perf_counter()
+            stats.bytes_in += len(packet)
+            if last is not None:
+                stats.intervals.append(arrived - last)
+            last = arrived
+    except (OSError, asyncio.IncompleteReadError):
+        stats.errors += 1
+    finally:
+        writer.close()
+
+
+async def idle_client(host, port, stop_at):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        # Send nothing; after detection the bridge treats it as a native stream.
+        while time.monotonic() < stop_at:
+            try:
+                await asyncio.wait_for(reader.read(4096), stop_at - time.monotonic())
+            except asyncio.TimeoutError:
+                break
+    except OSError:
+        pass
+    finally:
+        writer.close()
+
+
+async def run_load(args, host, port):
+    rng = random.Random(args.seed)
+    stats = Stats()
+    stop_at = time.monotonic() + args.duration
+    tasks = [idle_client(host, port, stop_at) for _ in range(args.idle)]
+    tasks += [lx200_client(host, port, stats, stop_at, args.think, random.Random(rng.random())) for _ in range(args.lx200)]
+    tasks += [native_client(host, port, stats, stop_at, random.Random(rng.random()), args.goto_every) for _ in range(args.native)]
+    await asyncio.gather(*tasks, return_exceptions=True)
+    return stats
+
+
+def report(stats, wall_s, cpu_s):
+    print(f"{'command':<8}{'count':>8}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    total = 0
+    for command in sorted(stats.latency):
+        values = np.array(stats.latency[command]) * 1000.0
+        total += len(values)
+        p50, p90, p99 = np.percentile(values, [50, 90, 99])
+        print(f"{command:<8}{len(values):>8}{p50:>10.2f}{p90:>10.2f}{p99:>10.2f}{values.max():>10.2f}")
+    print(f"LX200 throughput: {total / wall_s:.0f} commands/s")
+
+    if stats.intervals:
+        intervals = np.array(stats.intervals) * 1000.0
+        p50, p99 = np.percentile(intervals, [50, 99])
+        print(
+            f"Native cadence: {len(intervals)} intervals, mean {intervals.mean():.1f} ms, "
+            f"jitter (std) {intervals.std():.1f} ms, p50 {p50:.1f} ms, p99 {p99:.1f} ms, max {intervals.max():.1f} ms"
+        )
+    print(f"Client errors: {stats.errors}, bytes received: {stats.bytes_in}")
+    if cpu_s is not None:
+        print(f"Server CPU: {cpu_s:.2f}s over {wall_s:.1f}s wall ({100.0 * cpu_s / wall_s:.1f}% of one core)")
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Load-test the Stellarium/LX200 bridge.")
+    parser.add_argument("--lx200", type=int, default=10, help="clients looping LX200 commands")
+    parser.add_argument("--native", type=int, default=10, help="clients reading native position packets")
+    parser.add_argument("--idle", type=int, default=0, help="clients that connect and stay silent")
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--think", type=float, default=0.02, help="seconds between LX200 commands per client")
+    parser.add_argument("--goto-every", type=float, default=5.0, help="seconds between native goto packets (0: never)")
+    parser.add_argument("--port", type=int, default=10931)
+    parser.add_argument("--lat", type=float, default=52.0)
+    parser.add_argument("--lon", type=float, default=21.0)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--connect", help="host:port of a running bridge instead of spawning one")
+    parser.add_argument("--pid", type=int, help="with --connect, process to sample CPU from")
+    parser.add_argument("--serve", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.port, args.lat, args.lon)
+        return
+
+    child = None
+    cache_stats = []
+    if args.connect:
+        host, port = args.connect.rsplit(":", 1)
+        port = int(port)
+        sample_cpu = (lambda: proc_cpu_seconds(args.pid)) if args.pid else None
+    else:
+        host, port = "127.0.0.1", args.port
+        child = subprocess.Popen(
+            [sys.executable, os.path.abspath(__file__), "--serve", "--port", str(port),
+             "--lat", str(args.lat), "--lon", str(args.lon)],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True, bufsize=1,
+        )
+        if child.stdout.readline().strip() != "ready":
+            print("Bridge subprocess failed to start")
+            child.kill()
+            return
+
+        def sample_cpu():
+            child.stdin.write("cpu\n")
+            child.stdin.flush()
+            cpu, hits, misses = child.stdout.readline().split()
+            cache_stats.append((int(hits), int(misses)))
+            return float(cpu)
+
+    try:
+        cpu_before = sample_cpu() if sample_cpu else None
+        started = time.monotonic()
+        stats = asyncio.run(run_load(args, host, port))
+        wall = time.monotonic() - started
+        cpu_used = sample_cpu() - cpu_before if sample_cpu else None
+        print(f"{args.lx200} LX200, {args.native} native, {args.idle} idle clients for {args.duration:g}s")
+        report(stats, wall, cpu_used)
+        if cache_stats:
+            hits = cache_stats[-1][0] - cache_stats[0][0]
+            misses = cache_stats[-1][1] - cache_stats[0][1]
+            print(f"Position cache: {hits} hits, {misses} computations")
+    finally:
+        if child is not None:
+            child.stdin.close()
+            child.wait(timeout=5)
+
+
+if __name__ == "__main__":
+    main()